@@ -0,0 +1,183 @@
+"""Read-through cache for user lookups."""
+import json
+import math
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+
+from app.auth.user import UserRecord
+from app.config.settings import settings
+
+
+class UserCache:
+    """
+    Caches users by id. Entries are always the public UserRecord: password
+    hashes stay in the database, and credential lookups, the only ones by
+    username or email, go there. Backends only implement the raw get/set/delete
+    of a key, and keep the read-your-writes markers apart from the entries so
+    they last ``write_window_seconds`` whatever gets evicted.
+    """
+
+    def __init__(self, ttl_seconds: int, write_window_seconds: float | None = None):
+        self.ttl_seconds = ttl_seconds
+        self.write_window_seconds = settings.db_read_your_writes_seconds if write_window_seconds is None else write_window_seconds
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, user_id) -> UserRecord | None:
+        user = await self._get(self._key("id", user_id))
+        if user is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._load(user)
+
+    async def set(self, user: UserRecord):
+        """Store the user without the password hash, whichever record is given."""
+        user = user.public()
+        await self._set(self._key("id", user.id), self._dump(user))
+
+    async def invalidate(self, user: UserRecord):
+        await self._delete(self._key("id", user.id))
+
+    async def record_write(self, user_id):
+        """Remember that the user just wrote, for read-your-writes routing."""
+        raise NotImplementedError
+
+    async def written_within_window(self, user_id) -> bool:
+        """Whether the user wrote within the last ``write_window_seconds``."""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    """
+    Backend hooks
+    """
+    async def _get(self, key: str):
+        raise NotImplementedError
+
+    async def _set(self, key: str, value):
+        raise NotImplementedError
+
+    async def _delete(self, *keys: str):
+        raise NotImplementedError
+
+    def _key(self, field: str, value) -> str:
+        return f"user:{field}:{value}"
+
+    def _dump(self, user: UserRecord):
+        return user
+
+    def _load(self, value) -> UserRecord:
+        return value
+
+
+class InMemoryUserCache(UserCache):
+    """
+    Per-process TTL + LRU cache. Invalidation only reaches the current worker,
+    so with several workers a stale entry can live for up to ``ttl_seconds``.
+    Write markers are per worker too: a read served by another worker does
+    not know about the write.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int, write_window_seconds: float | None = None):
+        super().__init__(ttl_seconds, write_window_seconds)
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        # user id -> monotonic time of the last write, oldest first
+        self._writes: OrderedDict[int, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def record_write(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            self._writes.pop(user_id, None)
+            self._writes[user_id] = now
+            while now - next(iter(self._writes.values())) >= self.write_window_seconds:
+                self._writes.popitem(last=False)
+
+    async def written_within_window(self, user_id) -> bool:
+        with self._lock:
+            written_at = self._writes.get(user_id)
+        return written_at is not None and time.monotonic() - written_at < self.write_window_seconds
+
+    async def _get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def _set(self, key: str, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    async def _delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+class RedisUserCache(UserCache):
+    """
+    Shared cache for multi-worker deployments. Accepts any client exposing the
+    redis.asyncio ``get``/``set(ex=)``/``delete`` coroutines.
+    """
+
+    def __init__(self, client, ttl_seconds: int, prefix: str = "algosensei:", write_window_seconds: float | None = None):
+        super().__init__(ttl_seconds, write_window_seconds)
+        self.client = client
+        self.prefix = prefix
+
+    async def record_write(self, user_id):
+        # Expires with the window rather than the user entries
+        await self.client.set(self._key("written", user_id), json.dumps(time.time()), ex=max(1, math.ceil(self.write_window_seconds)))
+
+    async def written_within_window(self, user_id) -> bool:
+        written_at = await self._get(self._key("written", user_id))
+        return written_at is not None and time.time() - written_at < self.write_window_seconds
+
+    async def _get(self, key: str):
+        value = await self.client.get(key)
+        return json.loads(value) if value is not None else None
+
+    async def _set(self, key: str, value):
+        await self.client.set(key, json.dumps(value), ex=self.ttl_seconds)
+
+    async def _delete(self, *keys: str):
+        await self.client.delete(*keys)
+
+    def _key(self, field: str, value) -> str:
+        return f"{self.prefix}user:{field}:{value}"
+
+    def _dump(self, user: UserRecord):
+        return asdict(user)
+
+    def _load(self, value) -> UserRecord:
+        return UserRecord(**value)
+
+
+def create_user_cache() -> UserCache:
+    """Build the cache backend selected by settings."""
+    if settings.user_cache_url:
+        try:
+            from redis.asyncio import from_url
+        except ImportError as e:
+            raise RuntimeError("USER_CACHE_URL requires the 'redis' package") from e
+        return RedisUserCache(from_url(settings.user_cache_url), settings.user_cache_ttl_seconds)
+    return InMemoryUserCache(settings.user_cache_size, settings.user_cache_ttl_seconds)
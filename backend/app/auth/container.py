@@ -0,0 +1,76 @@
+"""Process-wide holder for the stateless collaborators of the auth services."""
+import asyncio
+
+from app.auth.cache import UserCache, create_user_cache
+from app.auth.hashing import PasswordHasher
+from app.auth.revocation import DatabaseRevocationStore, TokenRevocation
+from app.auth.singleflight import SingleFlight
+from app.auth.token import TokenCodec
+from app.config.database import session_scope
+from app.config.settings import settings
+
+
+class AuthContainer:
+    """
+    Built once at lifespan startup and shared by every request. Only the
+    database session is bound per request, in get_auth_service.
+    """
+
+    def __init__(
+        self,
+        password_hasher: PasswordHasher | None = None,
+        token_codec: TokenCodec | None = None,
+        user_cache: UserCache | None = None,
+        token_revocation: TokenRevocation | None = None,
+        user_flights: SingleFlight | None = None,
+    ):
+        self.password_hasher = password_hasher or PasswordHasher()
+        self.token_codec = token_codec or TokenCodec()
+        self.user_cache = user_cache or create_user_cache()
+        self.token_revocation = token_revocation or TokenRevocation(DatabaseRevocationStore(session_scope))
+        # Shared by every request so concurrent reads of the same user can be coalesced
+        self.user_flights = user_flights
+        if self.user_flights is None and settings.user_lookup_coalescing:
+            self.user_flights = SingleFlight(settings.user_lookup_timeout_seconds)
+        self._tasks: set[asyncio.Task] = set()
+
+    def spawn(self, coro) -> asyncio.Task:
+        """
+        Run follow-up work after the response, e.g. a password rehash. The
+        task is referenced until it finishes so it cannot be collected midway.
+        """
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def shutdown(self, timeout: float = 5.0):
+        """
+        Give follow-up tasks up to ``timeout`` seconds to finish and cancel the
+        rest, so none is left using the hasher or the engines once they are gone.
+        """
+        if self._tasks:
+            _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        self.password_hasher.shutdown()
+
+
+_container: AuthContainer | None = None
+
+def init_container() -> AuthContainer:
+    global _container
+    if _container is None:
+        _container = AuthContainer()
+    return _container
+
+def get_container() -> AuthContainer:
+    """Return the shared container, creating it when used outside the app lifespan."""
+    return _container or init_container()
+
+async def shutdown_container():
+    global _container
+    if _container is not None:
+        await _container.shutdown()
+        _container = None
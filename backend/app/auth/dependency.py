@@ -1,17 +1,36 @@
 from fastapi import Depends, Request
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.service import AuthService 
+from app.auth.container import get_container
 from app.auth.user import User
-from app.config.database import get_db
+from app.config.database import replica_configured, session_scope
 from app.utils.exceptions import UnauthorizedException
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
 
-def get_auth_service(db: Session = Depends(get_db)) -> AuthService:
-    """Dependency to get AuthService instance with a Database Session."""
-    authService = AuthService(db)
+READ_METHODS = frozenset({"GET", "HEAD"})
+
+async def get_routed_db(request: Request):
+    """
+    Database session whose reads go to the replica for GET requests, unless the
+    requesting user wrote within DB_READ_YOUR_WRITES_SECONDS. Write requests and
+    apps without a replica get a plain primary session. Writes are remembered
+    by the user cache, so with several workers this needs USER_CACHE_URL.
+    """
+    use_replica = replica_configured() and request.method in READ_METHODS
+    if use_replica:
+        user_id = getattr(request.state, "user_id", None)
+        if user_id is not None:
+            use_replica = not await get_container().user_cache.written_within_window(user_id)
+    async with session_scope(use_replica=use_replica) as db:
+        yield db
+
+def get_auth_service(db: AsyncSession = Depends(get_routed_db)) -> AuthService:
+    """Dependency to get AuthService instance with a Database Session.
+    Shared collaborators come from the process-wide container; only the session is per request."""
+    authService = AuthService(db, get_container())
     return authService
 
 def get_current_user_id(request: Request) -> int:
@@ -19,4 +38,11 @@ def get_current_user_id(request: Request) -> int:
     user_id = getattr(request.state, "user_id", None)
     if user_id is None:
         raise UnauthorizedException("Not authenticated")
-    return user_id
\ No newline at end of file
+    return user_id
+
+def get_current_token_claims(request: Request) -> dict:
+    """Dependency to get the verified claims of the current access token from middleware."""
+    claims = getattr(request.state, "token_claims", None)
+    if claims is None:
+        raise UnauthorizedException("Not authenticated")
+    return claims
\ No newline at end of file
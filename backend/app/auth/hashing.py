@@ -0,0 +1,246 @@
+"""Bounded worker pool that keeps Argon2 password hashing off the event loop."""
+import os
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+
+from argon2 import Type, extract_parameters
+from argon2.exceptions import InvalidHashError
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from app.config.metrics import HASH_BUCKETS, Histogram
+from app.config.settings import settings
+from app.utils.exceptions import ServiceUnavailableException
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class Argon2Profile:
+    memory_cost: int  # KiB
+    time_cost: int    # Passes over memory
+    parallelism: int  # Lanes
+
+    def password_hash(self) -> PasswordHash:
+        return PasswordHash((
+            Argon2Hasher(time_cost=self.time_cost, memory_cost=self.memory_cost, parallelism=self.parallelism),
+        ))
+
+
+"""
+Named Argon2id cost profiles. ``minimum`` is the OWASP floor, ``default`` is
+what PasswordHash.recommended() used, so hashes stored so far stay current.
+"""
+PROFILES = {
+    "minimum": Argon2Profile(memory_cost=19456, time_cost=2, parallelism=1),
+    "default": Argon2Profile(memory_cost=65536, time_cost=3, parallelism=4),
+    "high": Argon2Profile(memory_cost=131072, time_cost=4, parallelism=4),
+}
+
+
+def _time_hash(profile: Argon2Profile) -> float:
+    password_hash = profile.password_hash()
+    start = time.perf_counter()
+    password_hash.hash("calibration-password")
+    return time.perf_counter() - start
+
+
+def calibrate_profile(
+    target_seconds: float,
+    memory_cost: int = PROFILES["default"].memory_cost,
+    parallelism: int = PROFILES["default"].parallelism,
+    max_time_cost: int = 10,
+) -> Argon2Profile:
+    """
+    Highest time cost at ``memory_cost`` whose hash fits ``target_seconds`` on
+    this host. Argon2 time grows linearly with time_cost, so one pass is timed
+    and extrapolated, then the estimate is checked and stepped down if needed.
+    Memory is never set below the minimum profile; if even one pass is over
+    budget, one pass is used.
+    """
+    memory_cost = max(memory_cost, PROFILES["minimum"].memory_cost)
+    one_pass = _time_hash(Argon2Profile(memory_cost, 1, parallelism))
+    profile = Argon2Profile(memory_cost, max(1, min(max_time_cost, int(target_seconds / one_pass))), parallelism)
+    while profile.time_cost > 1 and _time_hash(profile) > target_seconds:
+        profile = replace(profile, time_cost=profile.time_cost - 1)
+    return profile
+
+
+def resolve_profile() -> Argon2Profile:
+    """The profile selected by settings, with any explicit cost overrides applied."""
+    if settings.hash_profile == "auto":
+        default = PROFILES["default"]
+        profile = calibrate_profile(
+            settings.hash_target_ms / 1000,
+            memory_cost=settings.hash_memory_kib or default.memory_cost,
+            parallelism=settings.hash_parallelism or default.parallelism,
+        )
+        logger.info(f"Calibrated Argon2 profile for {settings.hash_target_ms:.0f} ms: {profile}")
+    else:
+        profile = PROFILES[settings.hash_profile]
+    overrides = {
+        "memory_cost": settings.hash_memory_kib,
+        "time_cost": settings.hash_time_cost,
+        "parallelism": settings.hash_parallelism,
+    }
+    return replace(profile, **{key: value for key, value in overrides.items() if value})
+
+
+class HashingMetrics:
+    """Counters for the hashing pool, safe to update from worker threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+        self.running = 0
+        self.pending = 0
+        self.total_hash_seconds = 0.0
+        self.max_hash_seconds = 0.0
+        self.total_wait_seconds = 0.0
+        self.hash_seconds = Histogram(HASH_BUCKETS)
+
+    def record(self, hash_seconds: float, wait_seconds: float):
+        with self._lock:
+            self.completed += 1
+            self.total_hash_seconds += hash_seconds
+            self.total_wait_seconds += wait_seconds
+            self.hash_seconds.observe(hash_seconds)
+            if hash_seconds > self.max_hash_seconds:
+                self.max_hash_seconds = hash_seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "running": self.running,
+                "queue_depth": max(self.pending - self.running, 0),
+                "avg_hash_seconds": self.total_hash_seconds / completed,
+                "max_hash_seconds": self.max_hash_seconds,
+                "avg_wait_seconds": self.total_wait_seconds / completed,
+            }
+
+
+class PasswordHasher:
+    """
+    Run pwdlib hashing and verification on a dedicated thread pool.
+
+    argon2-cffi releases the GIL while hashing, so threads give real parallelism
+    without the pickling cost of a process pool. Work beyond
+    ``max_workers + max_queue`` outstanding calls is rejected with a 503 instead
+    of piling up behind the pool.
+    """
+
+    def __init__(
+        self,
+        password_hash: PasswordHash | None = None,
+        max_workers: int | None = None,
+        max_queue: int | None = None,
+        profile: Argon2Profile | None = None,
+    ):
+        # An explicit password_hash without a profile is never reported as stale
+        self.profile = profile or (None if password_hash is not None else resolve_profile())
+        self.password_hash = password_hash or self.profile.password_hash()
+        self.max_workers = max_workers or settings.hash_workers or os.cpu_count() or 1
+        self.max_queue = settings.hash_queue_size if max_queue is None else max_queue
+        self.metrics = HashingMetrics()
+        self._executor: ThreadPoolExecutor | None = None
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(self.password_hash.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(self.password_hash.verify, password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """
+        Whether a stored hash was made with other parameters than the current
+        profile. With the auto profile every worker calibrates on its own, so
+        only weaker hashes count as stale; otherwise workers that landed on
+        different costs would keep rehashing each other's output.
+        """
+        if self.profile is None:
+            return False
+        try:
+            stored = extract_parameters(hashed_password)
+        except InvalidHashError:
+            return True
+        if stored.type is not Type.ID:
+            return True
+        current = (self.profile.memory_cost, self.profile.time_cost, self.profile.parallelism)
+        found = (stored.memory_cost, stored.time_cost, stored.parallelism)
+        if settings.hash_profile == "auto":
+            return any(have < want for have, want in zip(found, current))
+        return found != current
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    """
+    Helper Functions
+    """
+    async def _submit(self, fn, *args):
+        metrics = self.metrics
+        with metrics._lock:
+            if metrics.pending >= self.max_workers + self.max_queue:
+                metrics.rejected += 1
+                raise ServiceUnavailableException("Password hashing is at capacity, please retry")
+            metrics.pending += 1
+
+        try:
+            future = self._get_executor().submit(self._run, fn, time.perf_counter(), *args)
+        except BaseException:
+            self._release()
+            raise
+        # Released when the job finishes or is cancelled before starting, not when
+        # the caller stops waiting: a started job keeps its thread until it is done
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future=None):
+        with self.metrics._lock:
+            self.metrics.pending -= 1
+
+    def _run(self, fn, queued_at: float, *args):
+        metrics = self.metrics
+        started_at = time.perf_counter()
+        with metrics._lock:
+            metrics.running += 1
+        try:
+            return fn(*args)
+        finally:
+            finished_at = time.perf_counter()
+            with metrics._lock:
+                metrics.running -= 1
+            metrics.record(finished_at - started_at, started_at - queued_at)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="argon2",
+            )
+        return self._executor
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Calibrate an Argon2 profile for this host")
+    parser.add_argument("--target-ms", type=float, default=settings.hash_target_ms)
+    parser.add_argument("--memory-kib", type=int, default=PROFILES["default"].memory_cost)
+    parser.add_argument("--parallelism", type=int, default=PROFILES["default"].parallelism)
+    args = parser.parse_args()
+
+    profile = calibrate_profile(args.target_ms / 1000, args.memory_kib, args.parallelism)
+    print(f"{profile} hashes in {_time_hash(profile) * 1000:.0f} ms on this host. To pin it:")
+    print(f"HASH_MEMORY_KIB={profile.memory_cost}\nHASH_TIME_COST={profile.time_cost}\nHASH_PARALLELISM={profile.parallelism}")
+
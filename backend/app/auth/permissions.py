@@ -0,0 +1,39 @@
+"""Declarative roles and permissions for the API routes."""
+from enum import Enum
+
+from fastapi import Depends
+
+
+class Permission(str, Enum):
+    READ_OWN_ACCOUNT = "account:read"
+    UPDATE_OWN_ACCOUNT = "account:update"
+    DELETE_OWN_ACCOUNT = "account:delete"
+    LOGOUT = "session:logout"
+    READ_PROBLEMS = "problems:read"
+    WRITE_PROBLEMS = "problems:write"
+    REQUEST_HINTS = "hints:request"
+
+
+DEFAULT_ROLE = "user"
+
+ROLE_PERMISSIONS: dict[str, frozenset[Permission]] = {
+    "user": frozenset(Permission),
+    "admin": frozenset(Permission),
+}
+
+
+def roles_with(permission: Permission) -> frozenset[str]:
+    return frozenset(role for role, granted in ROLE_PERMISSIONS.items() if permission in granted)
+
+
+def requires(permission: Permission):
+    """
+    Declare the permission a route needs, e.g. ``dependencies=[requires(...)]``.
+    The check itself runs in AuthorizationMiddleware from a table compiled at
+    startup, so this dependency does nothing at request time.
+    """
+    def permission_marker():
+        return None
+
+    permission_marker.permission = permission
+    return Depends(permission_marker)
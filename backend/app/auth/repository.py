@@ -1,45 +1,201 @@
 """Repository for authentication-related database operations."""
 
+from sqlalchemy import or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
-from app.auth.user import User
+from app.auth.cache import UserCache
+from app.auth.singleflight import SingleFlight
+from app.auth.user import User, UserCredentials, UserRecord
+
+"""
+Reads select these columns straight into UserRecord / UserCredentials instead of
+loading User entities, so rows skip the identity map and the password hash is
+only fetched by the paths that verify it.
+"""
+PUBLIC_COLUMNS = (User.id, User.username, User.email, User.is_active, User.role, User.version)
+CREDENTIAL_COLUMNS = PUBLIC_COLUMNS + (User.password,)
+
+# Dialects whose insert() supports ON CONFLICT DO NOTHING ... RETURNING
+INSERT_BY_DIALECT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
 
 class AuthRepository:
-    def __init__(self, db):
+    """
+    Works on an AsyncSession, or on a sync Session wrapped in ThreadedSession
+    when the sync engine is selected.
+
+    Lookups return detached records and read through the user cache when one is
+    given. Lookups that need the password hash skip the cache and query the
+    database. Cache misses for the same key that overlap share one query when
+    ``flights`` is given. Every write invalidates the cached entry of the user
+    it touches and records the write, so that user's next reads skip the
+    replica for a while.
+    """
+    def __init__(self, db, cache: UserCache | None = None, flights: SingleFlight | None = None):
         self.db = db
+        self.cache = cache
+        self.flights = flights
+
+    async def create_user(self, username, email, hashed_password):
+        """
+        Insert in one round trip with INSERT ... ON CONFLICT DO NOTHING RETURNING.
+        The unique indexes on username and email decide conflicts, so no lookup
+        is needed first. Returns None when either is taken.
+        """
+        insert = INSERT_BY_DIALECT.get(self.db.get_bind().dialect.name)
+        if insert is None:
+            return await self._create_user_with_orm(username, email, hashed_password)
+
+        row = (await self.db.execute(
+            insert(User)
+            .values(username=username, email=email, password=hashed_password)
+            .on_conflict_do_nothing()
+            .returning(*CREDENTIAL_COLUMNS)
+        )).first()
+        await self.db.commit()
+        if row is None:
+            return None
+        user = UserCredentials(**row._mapping)
+        self._forget_flights(user)
+        if self.cache is not None:
+            await self.cache.record_write(user.id)
+        return user
+
+    async def get_user_by_id(self, id: int) -> UserRecord | None:
+        """Public columns only, for read paths that never need the password hash."""
+        return await self._get_user("id", User.id, id, credentials=False)
+
+    async def get_credentials_by_id(self, id: int) -> UserCredentials | None:
+        return await self._get_user("id", User.id, id, credentials=True)
+
+    async def get_user_by_username(self, username: str) -> UserCredentials | None:
+        return await self._get_user("username", User.username, username, credentials=True)
+
+    async def get_user_by_email(self, email: str) -> UserCredentials | None:
+        return await self._get_user("email", User.email, email, credentials=True)
+
+    async def get_users_by_email_or_username(self, email: str | None, username: str | None):
+        """Active users matching the email or the username, fetched in one query."""
+        lookups = [(field, value) for field, value in (("email", email), ("username", username)) if value]
+        if not lookups:
+            return []
+
+        columns = {"email": User.email, "username": User.username}
+        users = (await self.db.execute(
+            select(*CREDENTIAL_COLUMNS).where(or_(*(columns[field] == value for field, value in lookups)), User.is_active)
+        )).all()
+        records = [UserCredentials(**row._mapping) for row in users]
+        if self.cache is not None:
+            for record in records:
+                await self.cache.set(record)
+        return records
+
+    async def get_user_version(self, id: int) -> int | None:
+        """
+        Version of an active user, for conditional requests: from the cache when
+        the user is there, otherwise a lookup of that single column.
+        """
+        if self.cache is not None:
+            cached = await self.cache.get(id)
+            if cached is not None:
+                return cached.version
+        return (await self.db.execute(select(User.version).where(User.id == id, User.is_active))).scalar()
 
-    def create_user(self, username, email, hashed_password):
+    async def update_user(self, user_id: str, **kwargs) -> UserRecord | None:
+        """Apply the update, bump the version and read back the new row in one UPDATE ... RETURNING."""
+        row = (await self.db.execute(
+            update(User)
+            .where(User.id == user_id, User.is_active)
+            .values(**kwargs, version=User.version + 1)
+            .returning(*PUBLIC_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )).first()
+        await self.db.commit()
+        if row is None:
+            return None
+
+        user = UserRecord(**row._mapping)
+        self._forget_flights(user)
+        if self.cache is not None:
+            await self.cache.invalidate(user)
+            await self.cache.record_write(user.id)
+        return user
+
+    async def replace_password_hash(self, user_id: int, old_hash: str, new_hash: str) -> bool:
+        """
+        Swap in a rehashed password only while ``old_hash`` is still stored, so a
+        password change that lands first is never overwritten. Not recorded as a
+        user write: the user did not change anything they could read back.
+        """
+        row = (await self.db.execute(
+            update(User)
+            .where(User.id == user_id, User.password == old_hash)
+            .values(password=new_hash)
+            .returning(*PUBLIC_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )).first()
+        await self.db.commit()
+        if row is None:
+            return False
+        user = UserRecord(**row._mapping)
+        self._forget_flights(user)
+        if self.cache is not None:
+            await self.cache.invalidate(user)
+        return True
+
+    async def delete_user(self, id: str):
+        user = await self.update_user(id, is_active=False)
+        return user
+
+    """
+    Helper Functions
+    """
+    async def _create_user_with_orm(self, username, email, hashed_password):
         new_user = User(username=username, email=email, password=hashed_password)
         try:
             self.db.add(new_user)
-            self.db.commit()
-            self.db.refresh(new_user)
-            return new_user
+            await self.db.commit()
+            await self.db.refresh(new_user)
+            self._forget_flights(new_user)
+            return UserCredentials(
+                id=new_user.id,
+                username=new_user.username,
+                email=new_user.email,
+                is_active=new_user.is_active,
+                role=new_user.role,
+                version=new_user.version,
+                password=hashed_password,
+            )
         except IntegrityError:
-            self.db.rollback()
+            await self.db.rollback()
             return None
-    
-    def get_user_by_id(self, id: int):
-        return self.db.query(User).filter(User.id == id, User.is_active).first()
-    
-    def get_user_by_username(self, username: str):
-        return self.db.query(User).filter(User.username == username, User.is_active).first()
-    
-    def get_user_by_email(self, email: str):
-        return self.db.query(User).filter(User.email == email, User.is_active).first()
-    
-    def update_user(self, user_id: str, **kwargs):
-        user = self.get_user_by_id(user_id)
-        if not user:
+
+    async def _get_user(self, field: str, column, value, credentials: bool):
+        # The cache is keyed by id and never holds password hashes, credential lookups always query
+        if self.cache is not None and field == "id" and not credentials:
+            cached = await self.cache.get(value)
+            if cached is not None:
+                return cached
+
+        if self.flights is not None:
+            return await self.flights.do((field, value, credentials), self._load_user, column, value, credentials)
+        return await self._load_user(column, value, credentials)
+
+    async def _load_user(self, column, value, credentials: bool):
+        row = (await self.db.execute(
+            select(*(CREDENTIAL_COLUMNS if credentials else PUBLIC_COLUMNS)).where(column == value, User.is_active)
+        )).first()
+        if row is None:
             return None
-        for key, value in kwargs.items():
-            setattr(user, key, value)
-        self.db.commit()
-        self.db.refresh(user)
-        return user
-    
-    def delete_user(self, id: str):        
-        user = self.update_user(id, is_active=False)
-        return user
-        
 
-    
\ No newline at end of file
+        record = (UserCredentials if credentials else UserRecord)(**row._mapping)
+        if self.cache is not None:
+            await self.cache.set(record)
+        return record
+
+    def _forget_flights(self, user):
+        """Reads already in flight for a user that just changed may return the old row."""
+        if self.flights is None:
+            return
+        for field in ("id", "username", "email"):
+            value = getattr(user, field)
+            self.flights.forget((field, value, False), (field, value, True))
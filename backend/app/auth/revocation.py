@@ -0,0 +1,163 @@
+"""Revocation of access tokens, with a Bloom filter in front of the revoked_tokens table."""
+import math
+import time
+import asyncio
+import logging
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+
+from app.auth.user import RevokedToken
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over token ids. A negative answer is exact; a
+    positive one has to be confirmed against the authoritative store.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def add(self, key: str):
+        value = hash(key)
+        step = (value >> 32) | 1
+        for i in range(self.hash_count):
+            position = (value + i * step) % self.size
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        # Double hashing over the built-in str hash. It is salted per process, which
+        # is fine because every worker builds its own filter, and CPython caches it
+        # on the string, so a jti held in the token cache is never rehashed.
+        # The first probe is checked on its own: most negatives stop there.
+        value = hash(key)
+        bits, size = self.bits, self.size
+        position = value % size
+        if not bits[position >> 3] & (1 << (position & 7)):
+            return False
+        step = (value >> 32) | 1
+        for i in range(1, self.hash_count):
+            position = (value + i * step) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class DatabaseRevocationStore:
+    """Authoritative record of revoked token ids in the revoked_tokens table."""
+
+    def __init__(self, session_scope):
+        self.session_scope = session_scope
+
+    async def revoke(self, jti: str, expires_at: int):
+        async with self.session_scope() as db:
+            db.add(RevokedToken(jti=jti, expires_at=expires_at))
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Already revoked, e.g. a repeated logout
+                await db.rollback()
+
+    async def is_revoked(self, jti: str) -> bool:
+        async with self.session_scope() as db:
+            found = await db.scalar(
+                select(RevokedToken.id).where(RevokedToken.jti == jti, RevokedToken.expires_at > int(time.time()))
+            )
+            return found is not None
+
+    async def revoked_since(self, cursor: int) -> tuple[list[str], int]:
+        """Return unexpired ids revoked after ``cursor`` and the new cursor."""
+        async with self.session_scope() as db:
+            rows = (await db.execute(
+                select(RevokedToken.id, RevokedToken.jti)
+                .where(RevokedToken.id > cursor, RevokedToken.expires_at > int(time.time()))
+                .order_by(RevokedToken.id)
+            )).all()
+        return [jti for _, jti in rows], rows[-1][0] if rows else cursor
+
+    async def sweep(self) -> int:
+        async with self.session_scope() as db:
+            result = await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= int(time.time())))
+            await db.commit()
+            return result.rowcount
+
+
+class TokenRevocation:
+    """
+    Checks and records revoked tokens. Every worker keeps its own Bloom filter
+    and pulls new revocations from the store every ``sync_seconds``, so a token
+    revoked on one worker is rejected by the others within that window.
+    The filter is rebuilt from the store on each sweep to drop expired ids.
+    """
+
+    def __init__(
+        self,
+        store,
+        capacity: int | None = None,
+        sync_seconds: float | None = None,
+        sweep_seconds: float | None = None,
+    ):
+        self.store = store
+        self.capacity = capacity or settings.revocation_bloom_capacity
+        self.sync_seconds = sync_seconds or settings.revocation_sync_seconds
+        self.sweep_seconds = sweep_seconds or settings.revocation_sweep_seconds
+        self.bloom = BloomFilter(self.capacity)
+        self.cursor = 0
+        self.filter_positives = 0
+        self.confirmed = 0
+
+    def might_be_revoked(self, claims: dict) -> bool:
+        """Cheap, synchronous pre-check. False is final, True needs is_revoked."""
+        jti = claims.get("jti")
+        return jti is not None and jti in self.bloom
+
+    async def is_revoked(self, claims: dict) -> bool:
+        if not self.might_be_revoked(claims):
+            return False
+        self.filter_positives += 1
+        revoked = await self.store.is_revoked(claims["jti"])
+        if revoked:
+            self.confirmed += 1
+        return revoked
+
+    async def revoke(self, claims: dict):
+        jti = claims.get("jti")
+        if jti is None:
+            return
+        await self.store.revoke(jti, int(claims["exp"]))
+        self.bloom.add(jti)
+
+    async def sync(self):
+        """Add revocations recorded by any worker since the last sync."""
+        jtis, self.cursor = await self.store.revoked_since(self.cursor)
+        for jti in jtis:
+            self.bloom.add(jti)
+
+    async def rebuild(self):
+        """Sweep expired ids from the store and rebuild the filter from the rest."""
+        await self.store.sweep()
+        jtis, cursor = await self.store.revoked_since(0)
+        bloom = BloomFilter(self.capacity)
+        for jti in jtis:
+            bloom.add(jti)
+        self.bloom, self.cursor = bloom, cursor
+
+    async def run(self):
+        """Background loop started from the application lifespan."""
+        last_rebuild = time.monotonic()
+        while True:
+            await asyncio.sleep(self.sync_seconds)
+            try:
+                if time.monotonic() - last_rebuild >= self.sweep_seconds:
+                    await self.rebuild()
+                    last_rebuild = time.monotonic()
+                else:
+                    await self.sync()
+            except Exception as e:
+                logger.error(f"Token revocation sync failed: {e}")
@@ -1,26 +1,54 @@
 """Router definitions for authentication-related endpoints."""
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, Response, status
+from fastapi.responses import ORJSONResponse
 
 from app.auth.service import AuthService 
-from app.auth.schemas import UserCreateRequestSchema, UserLoginRequestSchema, UserChangePasswordRequestSchema
-from app.auth.dependency import get_auth_service, get_current_user_id
+from app.auth.schemas import (
+    UserCreateRequestSchema,
+    UserLoginRequestSchema,
+    UserChangePasswordRequestSchema,
+    UserResponseSchema,
+    TokenResponseSchema,
+)
+from app.auth.dependency import get_auth_service, get_current_user_id, get_current_token_claims
+from app.auth.permissions import Permission, requires
+from app.utils.etag import etag_matches, version_etag
 
 router = APIRouter(
     prefix="/users", 
-    tags=["auth"]
+    tags=["auth"],
+    default_response_class=ORJSONResponse,
 )
 
-@router.get("/me", status_code=status.HTTP_200_OK)
+# Clients may keep the body but must revalidate it, with If-None-Match, before reuse
+REVALIDATE = "private, no-cache"
+
+@router.get("/me", response_model=UserResponseSchema, status_code=status.HTTP_200_OK, dependencies=[requires(Permission.READ_OWN_ACCOUNT)])
 async def get_current_user(
     user_id: Annotated[int, Depends(get_current_user_id)],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
-    """Get current authenticated user information."""
-    return await auth_service.get_user_by_id(user_id)
+    """
+    Get current authenticated user information. Carries an ETag; a request
+    whose If-None-Match still matches gets a 304 after a version-only lookup.
+    """
+    if if_none_match is not None:
+        version = await auth_service.get_user_version(user_id)
+        if version is not None:
+            etag = version_etag("user", user_id, version)
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": REVALIDATE})
+
+    user = await auth_service.get_user_by_id(user_id)
+    response.headers["ETag"] = version_etag("user", user.id, user.version)
+    response.headers["Cache-Control"] = REVALIDATE
+    return user
 
-@router.post("/login", status_code=status.HTTP_200_OK)
+@router.post("/login", response_model=TokenResponseSchema, status_code=status.HTTP_200_OK)
 async def login_with_email_and_password(
     user_data: UserLoginRequestSchema,
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
@@ -28,7 +56,7 @@ async def login_with_email_and_password(
     """Authenticate user and return access token."""
     return await auth_service.login_with_email_and_password(user_data)
 
-@router.post("/register", status_code=status.HTTP_201_CREATED)
+@router.post("/register", response_model=UserResponseSchema, status_code=status.HTTP_201_CREATED)
 async def register_user(
     user_data: UserCreateRequestSchema,
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
@@ -36,16 +64,16 @@ async def register_user(
     """Register a new user account."""
     return await auth_service.register_user(user_data)
 
-@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+@router.post("/logout", response_model=None, status_code=status.HTTP_204_NO_CONTENT, dependencies=[requires(Permission.LOGOUT)])
 async def logout_user(
     user_id: Annotated[int, Depends(get_current_user_id)],
+    token_claims: Annotated[dict, Depends(get_current_token_claims)],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
 ):
     """Logout current user and invalidate token."""
-    await auth_service.logout_user(user_id)
-    return {"msg": "User logged out successfully"}
+    await auth_service.logout_user(user_id, token_claims)
 
-@router.put("/change-password", status_code=status.HTTP_200_OK)
+@router.put("/change-password", response_model=UserResponseSchema, status_code=status.HTTP_200_OK, dependencies=[requires(Permission.UPDATE_OWN_ACCOUNT)])
 async def change_password(
     change_password_data: UserChangePasswordRequestSchema,
     user_id: Annotated[int, Depends(get_current_user_id)],
@@ -53,7 +81,7 @@ async def change_password(
 ):
     return await auth_service.change_password(user_id, change_password_data)
 
-@router.delete("/delete", status_code=status.HTTP_200_OK)
+@router.delete("/delete", response_model=UserResponseSchema, status_code=status.HTTP_200_OK, dependencies=[requires(Permission.DELETE_OWN_ACCOUNT)])
 async def delete_account(
     user_id: Annotated[int, Depends(get_current_user_id)],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
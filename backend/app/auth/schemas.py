@@ -1,6 +1,6 @@
 """Request and response schemas for authentication routes."""
 from typing import Optional
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 
 class UserCreateRequestSchema(BaseModel):
     username: str
@@ -16,13 +16,22 @@ class UserChangePasswordRequestSchema(BaseModel):
     old_password: str
     new_password: str
 
+"""
+Response schemas. They are declared as response_model on the routes, so FastAPI
+validates and dumps the handler result through pydantic-core instead of walking
+it with jsonable_encoder. Handlers return UserRecord dataclasses, read through
+from_attributes. The email is a plain str here: it was validated on the way in,
+and EmailStr would run email-validator again on every response.
+"""
 class UserResponseSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     username: str
-    email: EmailStr
+    email: str
     is_active: bool
-    
-
-    
+    role: str = "user"
 
-    
\ No newline at end of file
+class TokenResponseSchema(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
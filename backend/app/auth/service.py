@@ -1,23 +1,29 @@
 """Service layer that handle logic for authentication-related operations."""
-from datetime import datetime, timedelta, timezone
+import logging
+from datetime import timedelta
 
-import jwt
-from fastapi.security import OAuth2PasswordBearer
-from pwdlib import PasswordHash
 from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
 
-from app.config.settings import settings
-from app.utils.exceptions import AlreadyExistsException, UnauthorizedException
+from app.utils.exceptions import AlreadyExistsException, NotFoundException, UnauthorizedException
 from app.auth.schemas import UserCreateRequestSchema, UserLoginRequestSchema, UserChangePasswordRequestSchema
 from app.auth.repository import AuthRepository
+from app.auth.container import AuthContainer, get_container
+from app.config.database import session_scope
+
+logger = logging.getLogger(__name__)
 
 
 class AuthService:
     
-    def __init__(self, db):
-        self.authRepository = AuthRepository(db)
-        self.password_hash = PasswordHash.recommended()
-        self.oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+    def __init__(self, db, container: AuthContainer | None = None):
+        container = container or get_container()
+        self.authRepository = AuthRepository(db, container.user_cache, container.user_flights)
+        self.user_cache = container.user_cache
+        self.user_flights = container.user_flights
+        self.spawn = container.spawn
+        self.password_hash = container.password_hasher
+        self.token_codec = container.token_codec
+        self.token_revocation = container.token_revocation
         
     async def authenticate_user(self, token: str):
         user = await self.get_current_user(token)
@@ -25,13 +31,15 @@ class AuthService:
 
     async def get_current_user(self, token: str):
         try:
-            payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+            payload = self.token_codec.decode(token)
+            if await self.token_revocation.is_revoked(payload):
+                raise UnauthorizedException("Token has been revoked")
             user_id: str = payload.get("sub")
             
             if user_id is None:
                 raise UnauthorizedException("Could not validate credentials")
             
-            user = self.authRepository.get_user_by_id(int(user_id))   
+            user = await self.authRepository.get_user_by_id(int(user_id))   
             if user is None:
                 raise UnauthorizedException("Could not validate credentials")
              
@@ -43,16 +51,22 @@ class AuthService:
         except InvalidTokenError:
             raise UnauthorizedException("Invalid token")
 
-    async def login_with_email_and_password(self, user_data: UserLoginRequestSchema):
-        # Find user by email and/or username
-        user_by_email = None
-        user_by_username = None
+    async def get_user_by_id(self, user_id: int):
+        user = await self.authRepository.get_user_by_id(user_id)
+        if user is None:
+            raise NotFoundException("User not found")
         
-        if user_data.email:
-            user_by_email = self.authRepository.get_user_by_email(user_data.email)
-        
-        if user_data.username:
-            user_by_username = self.authRepository.get_user_by_username(user_data.username)
+        return user.public()
+
+    async def get_user_version(self, user_id: int) -> int | None:
+        """Current version of the user, without loading the row when it can be avoided."""
+        return await self.authRepository.get_user_version(user_id)
+
+    async def login_with_email_and_password(self, user_data: UserLoginRequestSchema):
+        # Find user by email and/or username in a single query
+        candidates = await self.authRepository.get_users_by_email_or_username(user_data.email, user_data.username)
+        user_by_email = next((u for u in candidates if user_data.email and u.email == user_data.email), None)
+        user_by_username = next((u for u in candidates if user_data.username and u.username == user_data.username), None)
         
         # If both provided, they must match the same user
         if user_by_email and user_by_username:
@@ -63,60 +77,70 @@ class AuthService:
             user = user_by_email or user_by_username
         
         # Check if user exists and password is correct
-        if not user or not self.verify_password(user_data.password, user.password):
+        if not user or not await self.verify_password(user_data.password, user.password):
             raise UnauthorizedException("Incorrect email/username or password")
+
+        # Only a successful login knows the plaintext, so that is where old cost parameters get upgraded
+        if self.password_hash.needs_rehash(user.password):
+            self.spawn(self._upgrade_password_hash(user.id, user.password, user_data.password))
          
-        access_token = self.create_access_token(data={"sub": str(user.id)})
+        # The role travels in the token so authorization needs no database lookup
+        access_token = self.create_access_token(data={"sub": str(user.id), "role": user.role})
         return {"access_token": access_token, "token_type": "bearer"}
     
     async def register_user(self, user_data: UserCreateRequestSchema):
-        hashed_password = self.get_password_hash(user_data.password)
-        if self.authRepository.get_user_by_username(user_data.username) or self.authRepository.get_user_by_email(user_data.email):
-            raise AlreadyExistsException("User with given username or email already exists.") 
-        
-        user = self.authRepository.create_user(
+        # Uniqueness is enforced by the insert itself, see AuthRepository.create_user
+        hashed_password = await self.get_password_hash(user_data.password)
+        user = await self.authRepository.create_user(
             username=user_data.username,
             email=user_data.email,
             hashed_password=hashed_password
         )
+        if user is None:
+            raise AlreadyExistsException("User with given username or email already exists.")
         
-        del user.password
-        return user
+        return user.public()
     
-    async def logout_user(self, user_id):
-        pass
+    async def logout_user(self, user_id, token_claims: dict):
+        await self.token_revocation.revoke(token_claims)
     
     async def change_password(self, user_id, change_password_data: UserChangePasswordRequestSchema):
-        user = self.authRepository.get_user_by_id(user_id)
+        user = await self.authRepository.get_credentials_by_id(user_id)
+        if user is None:
+            raise NotFoundException("User not found")
                 
-        if not self.verify_password(change_password_data.old_password, user.password):
+        if not await self.verify_password(change_password_data.old_password, user.password):
             raise UnauthorizedException("Old password is incorrect")
         
-        new_hashed_password = self.get_password_hash(change_password_data.new_password)
-        updated_user = self.authRepository.update_user(user_id, password=new_hashed_password)
+        new_hashed_password = await self.get_password_hash(change_password_data.new_password)
+        updated_user = await self.authRepository.update_user(user_id, password=new_hashed_password)
         
-        del updated_user.password
-        return updated_user
+        return updated_user.public()
     
     async def delete_user(self, user_id):
-        user = self.authRepository.delete_user(user_id)
+        user = await self.authRepository.delete_user(user_id)
+        if user is None:
+            raise NotFoundException("User not found")
+        
         return user
     
     """
     Helper Functions
     """
-    def get_password_hash(self, password: str) -> str: 
-        return self.password_hash.hash(password)
+    async def get_password_hash(self, password: str) -> str: 
+        return await self.password_hash.hash(password)
     
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return self.password_hash.verify(plain_password, hashed_password)
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.password_hash.verify(plain_password, hashed_password)
     
     def create_access_token(self, data: dict, expire_delta: timedelta | None = None) -> str:
-        to_encode = data.copy()
-        if expire_delta:
-            expire_delta = datetime.now(timezone.utc) + expire_delta
-        else:
-            expire = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expire_minutes)
-        to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
-        return encoded_jwt
+        return self.token_codec.encode(data, expire_delta)
+
+    async def _upgrade_password_hash(self, user_id: int, old_hash: str, password: str):
+        """Runs after the login response, on its own session since the request's is closed by then."""
+        try:
+            new_hash = await self.password_hash.hash(password)
+            async with session_scope() as db:
+                await AuthRepository(db, self.user_cache, self.user_flights).replace_password_hash(user_id, old_hash, new_hash)
+        except Exception:
+            logger.warning(f"Upgrading the password hash of user {user_id} failed", exc_info=True)
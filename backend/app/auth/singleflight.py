@@ -0,0 +1,94 @@
+"""Coalescing of concurrent identical lookups into one in-flight call."""
+import asyncio
+
+from app.utils.exceptions import ServiceUnavailableException
+
+
+class SingleFlight:
+    """
+    Concurrent calls for the same key share one execution: the first caller
+    runs the lookup and later callers await its outcome, result or exception.
+    Nothing is remembered once the call finishes; caching is UserCache's job.
+
+    Every call waits at most ``timeout`` seconds, the first caller included,
+    and gets a 503 when it runs out. A first caller that is cancelled (its
+    client went away) cancels only itself: the callers that joined it start
+    a new flight instead of failing.
+
+    Only used from the event loop, so the counters need no lock.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.flights: dict[object, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    async def do(self, key, fn, *args):
+        """Return ``await fn(*args)``, sharing it with concurrent calls for ``key``."""
+        while True:
+            flight = self.flights.get(key)
+            if flight is None:
+                return await self._lead(key, fn, *args)
+
+            self.coalesced += 1
+            try:
+                return await self._wait(asyncio.shield(flight))
+            except asyncio.CancelledError:
+                # The leader was cancelled, not us: run the lookup again
+                if flight.cancelled() and not asyncio.current_task().cancelling():
+                    continue
+                raise
+
+    def forget(self, *keys):
+        """
+        Let the next call for ``keys`` start a new flight, for use after a write:
+        a flight started before it may still return the old row.
+        """
+        for key in keys:
+            self.flights.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "in_flight": len(self.flights),
+        }
+
+    """
+    Helper Functions
+    """
+    async def _lead(self, key, fn, *args):
+        flight = asyncio.get_running_loop().create_future()
+        self.flights[key] = flight
+        self.leaders += 1
+        try:
+            result = await self._wait(fn(*args))
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as e:
+            # A timeout of our own wait is counted in timeouts, not as a failed query
+            if not isinstance(e.__cause__, TimeoutError):
+                self.errors += 1
+            flight.set_exception(e)
+            # Retrieved so an exception nobody joined is not reported as never retrieved
+            flight.exception()
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            if self.flights.get(key) is flight:
+                del self.flights[key]
+
+    async def _wait(self, awaitable):
+        try:
+            return await asyncio.wait_for(awaitable, self.timeout)
+        except TimeoutError as e:
+            self.timeouts += 1
+            raise ServiceUnavailableException("User lookup timed out, please retry") from e
@@ -0,0 +1,95 @@
+"""Encoding and verification of JWT access tokens."""
+import time
+import uuid
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+import jwt
+
+from app.config.settings import settings
+
+
+class TokenCache:
+    """
+    Size-capped LRU of verified token claims, keyed by the token's SHA-256 digest.
+    Each entry is dropped once the token's ``exp`` passes, so a hit never outlives
+    the signature check it replaces. Cached claims are shared, treat them as read-only.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, claims = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims
+
+    def put(self, key: bytes, claims: dict):
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)) or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (expires_at, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class TokenCodec:
+    """Holds the settings-derived signing key and algorithm for access tokens."""
+
+    def __init__(
+        self,
+        secret_key: str | None = None,
+        algorithm: str | None = None,
+        expire_minutes: int | None = None,
+        cache: TokenCache | None = None,
+    ):
+        self.secret_key = secret_key or settings.secret_key
+        self.algorithm = algorithm or settings.algorithm
+        self.algorithms = [self.algorithm]
+        self.expire_delta = timedelta(minutes=expire_minutes or settings.access_token_expire_minutes)
+        self.cache = cache or TokenCache(settings.token_cache_size)
+
+    def encode(self, data: dict, expire_delta: timedelta | None = None) -> str:
+        to_encode = data.copy()
+        expire = datetime.now(timezone.utc) + (expire_delta or self.expire_delta)
+        to_encode.update({"exp": expire})
+        to_encode.setdefault("jti", uuid.uuid4().hex)
+        return jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        """Verify the token and return its claims. Raises jwt.InvalidTokenError."""
+        key = hashlib.sha256(token.encode()).digest()
+        claims = self.cache.get(key)
+        if claims is None:
+            claims = jwt.decode(token, self.secret_key, algorithms=self.algorithms)
+            self.cache.put(key, claims)
+        return claims
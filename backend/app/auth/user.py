@@ -1,6 +1,7 @@
 """Model definitions for authentication-related database tables."""
+from dataclasses import dataclass
 
-from sqlalchemy import String, Boolean
+from sqlalchemy import String, Boolean, BigInteger, Integer
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.config.database import Base
@@ -11,12 +12,50 @@ class User(Base):
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     username: Mapped[str] = mapped_column(String(30), unique=True, index=True)
     email: Mapped[str] = mapped_column(String(100), unique=True, index=True)
-    password: Mapped[str] = mapped_column(String(255))
+    # Deferred: only credential checks need the hash, see AuthRepository
+    password: Mapped[str] = mapped_column(String(255), deferred=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    role: Mapped[str] = mapped_column(String(20), default="user", server_default="user")
+    # Bumped by every update, the ETag of the user's representation
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1")
     
     def __repr__(self) -> str:
         return f"<User(id={self.id}, username={self.username}, email={self.email})>"
     
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+    
+    # Monotonic id doubles as the cursor workers use to pick up new revocations
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    jti: Mapped[str] = mapped_column(String(64), unique=True)
+    expires_at: Mapped[int] = mapped_column(BigInteger, index=True)  # Unix seconds, the token's exp
+    
+    def __repr__(self) -> str:
+        return f"<RevokedToken(jti={self.jti}, expires_at={self.expires_at})>"
+    
+
+"""
+Detached, read-only snapshots of a user row. Unlike User instances they are not
+bound to a session, so they can be cached and shared between requests.
+"""
+@dataclass(frozen=True, slots=True)
+class UserRecord:
+    id: int
+    username: str
+    email: str
+    is_active: bool = True
+    role: str = "user"
+    version: int = 1
 
+    def public(self) -> "UserRecord":
+        return self
 
+@dataclass(frozen=True, slots=True)
+class UserCredentials(UserRecord):
+    password: str = ""
 
+    def public(self) -> UserRecord:
+        """The same user without the password hash, safe to return from routes."""
+        return UserRecord(
+            id=self.id, username=self.username, email=self.email, is_active=self.is_active, role=self.role, version=self.version,
+        )
@@ -1,26 +1,50 @@
 import os
+import asyncio
 import logging
+import threading
+from contextlib import asynccontextmanager
+from functools import partial
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from sqlalchemy.orm import sessionmaker
-from google.cloud.sql.connector import Connector
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 
 from app.config.settings import settings
+from app.config.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_pool
 
 """
-Initialize Cloud SQL Python Connector
+Nothing here connects, starts threads or touches the environment at import
+time. The Cloud SQL connectors and both engines are built by the factories
+below on first use, normally from the application lifespan, and torn down by
+dispose_engines(). The connector package itself is only imported then.
 """
 
 logger = logging.getLogger(__name__)
 
-os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = settings.google_application_credentials or ""
+connector = None
+async_connector = None
+# getconn runs on pool worker threads, two of them may open the first connections
+_connector_lock = threading.Lock()
+# The pool opens its first connections concurrently, and each would build a connector
+_async_connector_lock = asyncio.Lock()
 
-connector = Connector()
+def _export_credentials():
+    if settings.google_application_credentials:
+        os.environ.setdefault("GOOGLE_APPLICATION_CREDENTIALS", settings.google_application_credentials)
 
 def getconn():
     """Create a connection to Cloud SQL PostgreSQL."""
+    global connector
     try:
+        if connector is None:
+            with _connector_lock:
+                if connector is None:
+                    from google.cloud.sql.connector import Connector
+                    _export_credentials()
+                    connector = Connector()
         conn = connector.connect(
             settings.instance_connection_name,
             "pg8000",
@@ -34,24 +58,224 @@ def getconn():
         logger.error(f"Failed to connect to database: {e}")
         raise
 
+async def getconn_async():
+    """Create an asyncpg connection to Cloud SQL PostgreSQL."""
+    global async_connector
+    try:
+        if async_connector is None:
+            async with _async_connector_lock:
+                if async_connector is None:
+                    # Binds itself to the running event loop, so it can only be created here
+                    from google.cloud.sql.connector import create_async_connector
+                    _export_credentials()
+                    async_connector = await create_async_connector()
+        conn = await async_connector.connect_async(
+            settings.instance_connection_name,
+            "asyncpg",
+            user=settings.db_user,
+            password=settings.db_pass,
+            db=settings.db_name,
+        )
+        logger.info(f"Successfully connected to database: {settings.db_name}")
+        return conn
+    except Exception as e:
+        logger.error(f"Failed to connect to database: {e}")
+        raise
+
+async def close_connectors():
+    global connector, async_connector, _async_connector_lock
+    if async_connector is not None:
+        await async_connector.close_async()
+        async_connector = None
+    # A lock waited on once is bound to that event loop; the next connector may live on another
+    _async_connector_lock = asyncio.Lock()
+    if connector is not None:
+        connector.close()
+        connector = None
+
 """
 Create the database engine, which is the connection interface to the database
 Mangese the connection pool and handles communication within the database.
+
+DB_BACKEND picks how connections are opened:
+- connector: through the Cloud SQL Python connector (TLS + IAM handshake)
+- dsn: straight to DB_HOST:DB_PORT, or to DATABASE_URL when it is set
+- unix_socket: through the socket Cloud Run mounts under DB_SOCKET_DIR
+The dsn and unix_socket backends use psycopg2 for the sync engine and asyncpg
+for the async one.
+"""
+BACKENDS = ("connector", "dsn", "unix_socket")
+
+"""
+Sync drivers matching the async ones a DATABASE_URL may name, so both engines
+point at the same local database.
 """
-engine = create_engine(
-    "postgresql+pg8000://",
-    creator=getconn,
-    pool_size=5,
-    max_overflow=2,
-    pool_timeout=30,
-    pool_recycle=1800,
-)
+SYNC_DRIVERS = {"asyncpg": "psycopg2", "aiosqlite": "pysqlite", "psycopg": "psycopg"}
+
+def database_backend() -> str:
+    if settings.db_backend:
+        return settings.db_backend
+    return "dsn" if settings.database_url else "connector"
+
+def pool_options() -> dict:
+    return dict(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+
+def _sync_url(url: URL) -> URL:
+    driver = SYNC_DRIVERS.get(url.get_driver_name(), url.get_driver_name())
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}")
+
+def database_url(async_driver: bool) -> URL:
+    """URL of the dsn and unix_socket backends."""
+    if settings.database_url:
+        url = make_url(settings.database_url)
+        return url if async_driver else _sync_url(url)
+
+    host, port, query = settings.db_host, int(settings.db_port or 5432), {}
+    if database_backend() == "unix_socket":
+        socket_dir = settings.db_socket_dir
+        if settings.instance_connection_name:
+            socket_dir = f"{socket_dir.rstrip('/')}/{settings.instance_connection_name}"
+        host, port, query = None, None, {"host": socket_dir}
+    return URL.create(
+        "postgresql+asyncpg" if async_driver else "postgresql+psycopg2",
+        username=settings.db_user,
+        password=settings.db_pass,
+        host=host,
+        port=port,
+        database=settings.db_name,
+        query=query,
+    )
+
+_engine = None
+_async_engine = None
+
+# Kept across dispose_engines(), a rebuilt engine keeps counting where the old one stopped
+pool_metrics = {}
+
+def get_engine():
+    """The sync engine, created on first use."""
+    global _engine
+    if _engine is None:
+        if database_backend() == "connector":
+            _engine = create_engine(
+                "postgresql+pg8000://",
+                creator=getconn,
+                poolclass=InstrumentedQueuePool,
+                **pool_options(),
+            )
+        else:
+            _engine = create_engine(database_url(async_driver=False), poolclass=InstrumentedQueuePool, **pool_options())
+        pool_metrics["sync"] = instrument_pool(_engine, "sync", pool_metrics.get("sync"))
+    return _engine
+
+def get_async_engine():
+    """
+    Async counterpart of the engine above, created on first use. Queries awaited
+    on this engine yield the event loop while waiting on the database instead
+    of blocking it.
+    """
+    global _async_engine
+    if _async_engine is None:
+        if database_backend() == "connector":
+            _async_engine = create_async_engine(
+                "postgresql+asyncpg://",
+                async_creator=getconn_async,
+                poolclass=InstrumentedAsyncQueuePool,
+                **pool_options(),
+            )
+        else:
+            _async_engine = create_async_engine(
+                database_url(async_driver=True),
+                poolclass=InstrumentedAsyncQueuePool,
+                **pool_options(),
+            )
+        pool_metrics["async"] = instrument_pool(_async_engine.sync_engine, "async", pool_metrics.get("async"))
+    return _async_engine
+
+"""
+Optional read replica, given as DB_REPLICA_URL (an async SQLAlchemy URL). Only
+sessions opened with use_replica=True read from it, see ReplicaRoutingSession.
+"""
+_replica_engine = None
+_async_replica_engine = None
+
+def replica_configured() -> bool:
+    return bool(settings.db_replica_url)
+
+def get_replica_engine():
+    global _replica_engine
+    if _replica_engine is None and replica_configured():
+        _replica_engine = create_engine(
+            _sync_url(make_url(settings.db_replica_url)),
+            poolclass=InstrumentedQueuePool,
+            **pool_options(),
+        )
+        pool_metrics["sync_replica"] = instrument_pool(_replica_engine, "sync_replica", pool_metrics.get("sync_replica"))
+    return _replica_engine
+
+def get_async_replica_engine():
+    global _async_replica_engine
+    if _async_replica_engine is None and replica_configured():
+        _async_replica_engine = create_async_engine(
+            settings.db_replica_url,
+            poolclass=InstrumentedAsyncQueuePool,
+            **pool_options(),
+        )
+        pool_metrics["async_replica"] = instrument_pool(_async_replica_engine.sync_engine, "async_replica", pool_metrics.get("async_replica"))
+    return _async_replica_engine
+
+def get_selected_engine():
+    """The engine requests use, as picked by DB_ASYNC."""
+    return get_async_engine() if settings.db_async else get_engine()
+
+async def dispose_engines():
+    """Close every pooled connection and the connectors. Engines are rebuilt on next use."""
+    global _engine, _async_engine, _replica_engine, _async_replica_engine
+    for async_engine in (_async_engine, _async_replica_engine):
+        if async_engine is not None:
+            await async_engine.dispose()
+    for engine in (_engine, _replica_engine):
+        if engine is not None:
+            engine.dispose()
+    _engine = _async_engine = _replica_engine = _async_replica_engine = None
+    await close_connectors()
+
+def pool_stats() -> dict:
+    return {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
+
+class ReplicaRoutingSession(Session):
+    """
+    Session that reads from ``replica`` when one is given. SELECTs go to the
+    replica until the session writes anything (a flush or any non-SELECT
+    statement); from then on every statement uses the primary bind, so the
+    session reads its own writes.
+    """
+
+    def __init__(self, *args, replica=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+        self.wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.replica is not None and not self.wrote:
+            if not self._flushing and getattr(clause, "is_select", False):
+                return self.replica
+            self.wrote = True
+        return super().get_bind(mapper, clause=clause, **kwargs)
 
 """
 Create a session factory that produces database sessions. A session manages the operations
 for ORM-mapped objects, including querying, persisting, and transactions.
 """
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=ReplicaRoutingSession, autocommit=False, autoflush=False)
+
+AsyncSessionLocal = async_sessionmaker(sync_session_class=ReplicaRoutingSession, autoflush=False, expire_on_commit=False)
 
 """
 Create a base class for declarative class definitions. All ORM-mapped classes will
@@ -59,15 +283,99 @@ inherit from this base class.
 """
 Base = declarative_base()
 
+class ThreadedSession:
+    """
+    Expose a sync Session through the awaitable subset of the AsyncSession API.
+    Each blocking call runs in the threadpool, so repositories can be written once
+    against AsyncSession and still serve the sync engine.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def get_bind(self, *args, **kwargs):
+        return self.sync_session.get_bind(*args, **kwargs)
+
+    async def execute(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, instance, *args, **kwargs):
+        await run_in_threadpool(self.sync_session.refresh, instance, *args, **kwargs)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+class LazySession:
+    """
+    Stand-in that builds the real session on first attribute access. Requests
+    that are answered from a cache, or fail before querying, never create one;
+    the session in turn only checks a connection out of the pool on its first
+    statement.
+    """
+
+    __slots__ = ("_factory", "_session")
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._session = None
+
+    def __getattr__(self, name):
+        if self._session is None:
+            self._session = self._factory()
+        return getattr(self._session, name)
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+def _new_session(use_replica: bool = False):
+    if settings.db_async:
+        replica = get_async_replica_engine() if use_replica else None
+        return AsyncSessionLocal(bind=get_async_engine(), replica=replica.sync_engine if replica is not None else None)
+    return ThreadedSession(SessionLocal(bind=get_engine(), replica=get_replica_engine() if use_replica else None))
+
 """
-Dependency that provides a database session for each request.
-Ensures that the session is properly closed after use.
+Open a session outside of a request, e.g. from middleware or background tasks.
+Yields an AsyncSession by default; with DB_ASYNC=false the sync engine is used
+through ThreadedSession instead. Either way it is created lazily.
+With use_replica=True, reads go to the replica when one is configured.
 """
-def get_db():
-    db = SessionLocal()
+@asynccontextmanager
+async def session_scope(use_replica: bool = False):
+    db = LazySession(partial(_new_session, use_replica))
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
 
+"""
+Dependency that provides a database session for each request.
+Ensures that the session is properly closed after use.
+"""
+async def get_db():
+    async with session_scope() as db:
+        yield db
 
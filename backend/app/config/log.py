@@ -0,0 +1,136 @@
+"""Structured JSON log formatting and queued log handling."""
+import logging
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
+
+from app.config.settings import settings
+
+# Everything else found on a record was passed through ``extra=`` and becomes a JSON field
+RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line. Fields passed with ``extra=`` are written as
+    top-level keys, so access records can be queried by status or path.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = record.stack_info
+        return orjson.dumps(entry, default=str).decode()
+
+
+class _RouteQueueHandler(QueueHandler):
+    """
+    Stands in for the handlers of one logger. Records are queued as they are:
+    the message is only merged with its args, and formatted, on the listener
+    thread. A full queue drops the record instead of blocking the caller.
+    """
+
+    def __init__(self, owner: "QueuedLogging", route: int):
+        super().__init__(owner.queue)
+        self.owner = owner
+        self.route = route
+
+    def prepare(self, record: logging.LogRecord):
+        # The same record is handed to every logger it propagates through, so the
+        # route travels next to it rather than on it
+        return self.route, record
+
+    def enqueue(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.owner.dropped += 1
+
+
+class _RouteQueueListener(QueueListener):
+    """Single background thread that hands each record to the handlers of the logger it came from."""
+
+    def __init__(self, log_queue: queue.Queue, routes: dict[int, list[logging.Handler]]):
+        super().__init__(log_queue)
+        self.routes = routes
+
+    def handle(self, item):
+        route, record = item
+        for handler in self.routes[route]:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def enqueue_sentinel(self):
+        # Called from stop(): wait for room so a full queue still shuts down
+        self.queue.put(self._sentinel)
+
+
+class QueuedLogging:
+    """
+    Moves the handlers of every configured logger (as set up by the uvicorn
+    --log-config file) behind QueueHandlers that feed one listener thread.
+    Logging calls on the event loop then only append to a queue; formatting and
+    stream writes happen on the listener thread. stop() drains the queue and
+    puts the original handlers back.
+    """
+
+    def __init__(self, max_size: int | None = None):
+        self.queue = queue.Queue(max_size or settings.log_queue_size)
+        self.dropped = 0
+        self._listener = None
+        self._original: dict[logging.Logger, list[logging.Handler]] = {}
+
+    def start(self):
+        if self._listener is not None:
+            return
+        loggers = [logging.getLogger()] + [
+            logger for logger in logging.Logger.manager.loggerDict.values() if isinstance(logger, logging.Logger)
+        ]
+        routes = {}
+        for route, logger in enumerate(loggers):
+            if not logger.handlers:
+                continue
+            self._original[logger] = routes[route] = list(logger.handlers)
+            logger.handlers = [_RouteQueueHandler(self, route)]
+        self._listener = _RouteQueueListener(self.queue, routes)
+        self._listener.start()
+
+    def stop(self):
+        if self._listener is None:
+            return
+        self._listener.stop()
+        self._listener = None
+        for logger, handlers in self._original.items():
+            logger.handlers = handlers
+        self._original.clear()
+
+
+_queued_logging: QueuedLogging | None = None
+
+def start_queued_logging() -> QueuedLogging:
+    """Called from the application lifespan once logging has been configured."""
+    global _queued_logging
+    if _queued_logging is None:
+        _queued_logging = QueuedLogging()
+        _queued_logging.start()
+    return _queued_logging
+
+def stop_queued_logging():
+    global _queued_logging
+    if _queued_logging is not None:
+        _queued_logging.stop()
+        _queued_logging = None
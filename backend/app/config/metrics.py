@@ -0,0 +1,219 @@
+"""Request, connection pool, password hashing, lookup coalescing and hint stream metrics in the Prometheus text format."""
+from bisect import bisect_left
+
+from fastapi.routing import APIRoute
+from starlette.routing import Match, Route
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+STREAM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Counts are kept per bucket and only made cumulative
+    when rendered, so an observation is one bisect and two additions.
+    """
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # The last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+class RouteMetrics:
+    """Every series of one (method, route template), allocated once at startup."""
+
+    __slots__ = ("method", "route", "latency", "statuses", "request_bytes", "response_bytes", "in_flight")
+
+    def __init__(self, method: str, route: str):
+        self.method = method
+        self.route = route
+        self.latency = Histogram()
+        self.statuses = [0] * 5  # 1xx .. 5xx
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.in_flight = 0
+
+
+class RequestMetrics:
+    """
+    Metrics for every route of the app, resolved like the authorization table:
+    a dict for static paths and a short list of templated routes matched in
+    order. Requests that match no route share one series, so unknown paths
+    cannot grow the label set.
+
+    Only the event loop thread records into it, so nothing is locked. Counts are
+    per worker process.
+    """
+
+    def __init__(self):
+        self.static: dict[tuple[str, str], RouteMetrics] = {}
+        self.templated: list[tuple[Route, dict[str, RouteMetrics]]] = []
+        self.unmatched = RouteMetrics("", "unmatched")
+        self.series: list[RouteMetrics] = [self.unmatched]
+
+    def compile(self, routes):
+        for route in routes:
+            if not isinstance(route, (APIRoute, Route)) or not route.methods:
+                continue
+            by_method = {}
+            for method in sorted(route.methods):
+                by_method[method] = RouteMetrics(method, route.path)
+                self.series.append(by_method[method])
+            if route.param_convertors:
+                self.templated.append((route, by_method))
+            else:
+                for method, metrics in by_method.items():
+                    self.static[(method, route.path)] = metrics
+
+    def resolve(self, scope) -> RouteMetrics:
+        metrics = self.static.get((scope["method"], scope["path"]))
+        if metrics is not None:
+            return metrics
+        for route, by_method in self.templated:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return by_method.get(scope["method"], self.unmatched)
+        return self.unmatched
+
+
+"""
+Pool and hashing snapshots are exported key by key: (snapshot key, metric name,
+type, help).
+"""
+POOL_SERIES = (
+    ("pool_size", "db_pool_size", "gauge", "Connections the pool keeps open."),
+    ("checked_out", "db_pool_checked_out", "gauge", "Connections currently checked out."),
+    ("overflow", "db_pool_overflow", "gauge", "Connections open beyond pool_size."),
+    ("checkouts", "db_pool_checkouts_total", "counter", "Connection checkouts."),
+    ("connections_created", "db_pool_connections_created_total", "counter", "New database connections."),
+    ("timeouts", "db_pool_timeouts_total", "counter", "Checkouts that timed out waiting for a connection."),
+    ("avg_wait_seconds", "db_pool_wait_seconds_avg", "gauge", "Average checkout wait."),
+    ("max_wait_seconds", "db_pool_wait_seconds_max", "gauge", "Longest checkout wait."),
+)
+
+HASHING_SERIES = (
+    ("completed", "password_hash_completed_total", "counter", "Password hashes and verifications completed."),
+    ("rejected", "password_hash_rejected_total", "counter", "Hashing calls rejected because the pool was full."),
+    ("running", "password_hash_running", "gauge", "Hashing calls running on a worker."),
+    ("queue_depth", "password_hash_queue_depth", "gauge", "Hashing calls waiting for a worker."),
+    ("avg_wait_seconds", "password_hash_wait_seconds_avg", "gauge", "Average wait for a hashing worker."),
+)
+
+COALESCING_SERIES = (
+    ("leaders", "user_lookup_flights_total", "counter", "User lookups that ran a query of their own."),
+    ("coalesced", "user_lookup_coalesced_total", "counter", "User lookups that shared an in-flight query."),
+    ("timeouts", "user_lookup_timeouts_total", "counter", "User lookups that timed out."),
+    ("errors", "user_lookup_errors_total", "counter", "User lookup queries that failed."),
+    ("in_flight", "user_lookup_in_flight", "gauge", "User lookup queries in flight."),
+)
+
+HINT_SERIES = (
+    ("started", "hint_streams_started_total", "counter", "Hint streams opened."),
+    ("completed", "hint_streams_completed_total", "counter", "Hint streams that sent their last chunk."),
+    ("cancelled", "hint_streams_cancelled_total", "counter", "Hint streams stopped because the client disconnected."),
+    ("failed", "hint_streams_failed_total", "counter", "Hint streams whose generator raised."),
+    ("timeouts", "hint_streams_timeouts_total", "counter", "Hint streams stopped at the generation time limit."),
+    ("rejected", "hint_streams_rejected_total", "counter", "Hint requests refused by the per-user or total stream cap."),
+    ("chunks", "hint_chunks_total", "counter", "Hint chunks sent."),
+    ("active", "hint_streams_active", "gauge", "Hint streams open."),
+)
+
+
+def _header(lines: list[str], name: str, kind: str, help: str):
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _histogram(lines: list[str], name: str, labels: str, histogram: Histogram):
+    prefix = f"{labels}," if labels else ""
+    for bound, total in histogram.cumulative():
+        le = "+Inf" if bound == float("inf") else repr(bound)
+        lines.append(f'{name}_bucket{{{prefix}le="{le}"}} {total}')
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {histogram.sum}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+
+
+def render_metrics(requests: RequestMetrics, pools: dict | None = None, hashing=None, coalescing=None, hints=None) -> str:
+    """
+    Render the text exposition format. ``pools`` maps a pool name to its
+    PoolMetrics, ``hashing`` is the HashingMetrics of the password hasher,
+    ``coalescing`` the SingleFlight of user lookups and ``hints`` the
+    HintMetrics of hint streams.
+    """
+    lines: list[str] = []
+    series = [(metrics, f'method="{metrics.method}",route="{metrics.route}"') for metrics in requests.series]
+
+    _header(lines, "http_request_duration_seconds", "histogram", "Request latency by route template.")
+    for metrics, labels in series:
+        _histogram(lines, "http_request_duration_seconds", labels, metrics.latency)
+
+    _header(lines, "http_requests_total", "counter", "Completed requests by route and status class.")
+    for metrics, labels in series:
+        for index, count in enumerate(metrics.statuses):
+            if count:
+                lines.append(f'http_requests_total{{{labels},status="{index + 1}xx"}} {count}')
+
+    _header(lines, "http_request_size_bytes_total", "counter", "Request body bytes received.")
+    for metrics, labels in series:
+        lines.append(f"http_request_size_bytes_total{{{labels}}} {metrics.request_bytes}")
+
+    _header(lines, "http_response_size_bytes_total", "counter", "Response body bytes sent.")
+    for metrics, labels in series:
+        lines.append(f"http_response_size_bytes_total{{{labels}}} {metrics.response_bytes}")
+
+    _header(lines, "http_requests_in_flight", "gauge", "Requests being served.")
+    for metrics, labels in series:
+        lines.append(f"http_requests_in_flight{{{labels}}} {metrics.in_flight}")
+
+    if pools:
+        snapshots = {name: metrics.snapshot() for name, metrics in pools.items()}
+        for key, name, kind, help in POOL_SERIES:
+            _header(lines, name, kind, help)
+            for pool, snapshot in snapshots.items():
+                lines.append(f'{name}{{pool="{pool}"}} {snapshot[key]}')
+
+    if hashing is not None:
+        snapshot = hashing.snapshot()
+        for key, name, kind, help in HASHING_SERIES:
+            _header(lines, name, kind, help)
+            lines.append(f"{name} {snapshot[key]}")
+        _header(lines, "password_hash_duration_seconds", "histogram", "Time spent in Argon2 hash and verify calls.")
+        _histogram(lines, "password_hash_duration_seconds", "", hashing.hash_seconds)
+
+    if coalescing is not None:
+        snapshot = coalescing.stats()
+        for key, name, kind, help in COALESCING_SERIES:
+            _header(lines, name, kind, help)
+            lines.append(f"{name} {snapshot[key]}")
+
+    if hints is not None:
+        snapshot = hints.snapshot()
+        for key, name, kind, help in HINT_SERIES:
+            _header(lines, name, kind, help)
+            lines.append(f"{name} {snapshot[key]}")
+        _header(lines, "hint_first_chunk_seconds", "histogram", "Time from the hint request to its first chunk.")
+        _histogram(lines, "hint_first_chunk_seconds", "", hints.ttfb_seconds)
+        _header(lines, "hint_stream_duration_seconds", "histogram", "Time from the hint request to the stream closing.")
+        _histogram(lines, "hint_stream_duration_seconds", "", hints.duration_seconds)
+
+    lines.append("")
+    return "\n".join(lines)
@@ -0,0 +1,104 @@
+"""Connection pool classes that record checkout, overflow and wait metrics."""
+import time
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    """
+    Counters for one engine's pool. ``snapshot`` adds the live pool state. Waits
+    that time out count towards the wait totals, so the average shows them.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connections_created = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.total_wait_seconds += seconds
+            if seconds > self.max_wait_seconds:
+                self.max_wait_seconds = seconds
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            return {
+                "pool_size": pool.size() if pool is not None else 0,
+                "checked_out": pool.checkedout() if pool is not None else 0,
+                "overflow": max(pool.overflow(), 0) if pool is not None else 0,
+                "checkouts": self.checkouts,
+                "connections_created": self.connections_created,
+                "timeouts": self.timeouts,
+                # Timed-out waits are in the total, so they count as waits here too
+                "avg_wait_seconds": self.total_wait_seconds / waits if waits else 0.0,
+                "max_wait_seconds": self.max_wait_seconds,
+            }
+
+
+class InstrumentedPoolMixin:
+    """Times every checkout, including waits for a free slot and new connections."""
+
+    metrics: PoolMetrics | None = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_wait(time.perf_counter() - start)
+        return entry
+
+    def recreate(self):
+        # engine.dispose() replaces the pool, the counters carry over
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        if self.metrics is not None:
+            self.metrics.pool = pool
+        return pool
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_pool(engine, name: str, metrics: PoolMetrics | None = None) -> PoolMetrics:
+    """
+    Attach PoolMetrics to an engine created with one of the pool classes above.
+    Pass the metrics of the engine this one replaces so its counters carry on.
+    """
+    metrics = metrics or PoolMetrics(name)
+    metrics.pool = engine.pool
+    engine.pool.metrics = metrics
+
+    @event.listens_for(engine.pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        with metrics._lock:
+            metrics.checkouts += 1
+
+    @event.listens_for(engine.pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        with metrics._lock:
+            metrics.connections_created += 1
+
+    return metrics
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Literal, Optional
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
@@ -7,15 +7,76 @@ class Settings(BaseSettings):
     # Database
     google_application_credentials: Optional[str] = None
     instance_connection_name: Optional[str] = None
+    db_backend: Optional[Literal["connector", "dsn", "unix_socket"]] = None  # Defaults to dsn when DATABASE_URL is set, else connector
+    db_host: str = "localhost"  # dsn backend
     db_port: Optional[str] = "5432"
+    db_socket_dir: str = "/cloudsql"  # unix_socket backend, the instance connection name is appended when set
     db_name: Optional[str] = None
     db_user: Optional[str] = None
     db_pass: Optional[str] = None
+    db_async: bool = True
+    database_url: Optional[str] = None  # SQLAlchemy async URL that bypasses the Cloud SQL connector, e.g. for local load tests
+    db_replica_url: Optional[str] = None  # Async SQLAlchemy URL of a read replica for GET requests
+    db_read_your_writes_seconds: float = 5.0  # After a write, that user's reads stay on the primary this long
+    db_migrate_on_startup: bool = False  # Create missing tables on boot instead of running `python -m app.migrate`
+    db_pool_size: int = 5
+    db_max_overflow: int = 2
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = False  # Test connections on checkout, one extra round trip each
     
     # Security
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    token_cache_size: int = 10000  # Verified tokens kept in memory, 0 disables
+    revocation_bloom_capacity: int = 100000
+    revocation_sync_seconds: float = 2.0  # How quickly other workers see a logout
+    revocation_sweep_seconds: float = 300.0
+    
+    # Password hashing
+    hash_workers: Optional[int] = None  # Defaults to the host CPU count
+    hash_queue_size: int = 64
+    hash_profile: Literal["minimum", "default", "high", "auto"] = "default"  # auto calibrates to hash_target_ms at startup
+    hash_target_ms: float = 250.0
+    hash_memory_kib: Optional[int] = None  # Explicit costs override the profile
+    hash_time_cost: Optional[int] = None
+    hash_parallelism: Optional[int] = None
+    
+    # User cache
+    user_cache_url: Optional[str] = None  # redis:// URL for a cache shared across workers
+    user_cache_size: int = 10000
+    user_cache_ttl_seconds: int = 60
+    user_lookup_coalescing: bool = True  # Concurrent cache misses for the same user share one query
+    user_lookup_timeout_seconds: float = 5.0
+    
+    # Rate limiting
+    rate_limit_enabled: bool = True
+    rate_limit_url: Optional[str] = None  # redis:// URL for buckets shared across workers
+    rate_limit_ip_per_second: float = 20.0
+    rate_limit_ip_burst: int = 40
+    rate_limit_user_per_second: float = 10.0
+    rate_limit_user_burst: int = 20
+    forwarded_allow_ips: Optional[str] = None  # Proxies trusted for X-Forwarded-For, e.g. "*" on Cloud Run
+    
+    # Problem ingest
+    problem_storage: Literal["database", "local", "gcs"] = "database"  # Where the compressed problem blobs live
+    problem_storage_dir: str = "./data/problems"  # local storage, a stand-in for the bucket
+    problem_storage_bucket: Optional[str] = None  # gcs storage
+    problem_compression: Literal["zlib", "zstd"] = "zlib"  # zstd needs the 'zstandard' package
+    problem_max_bytes: int = 262144  # Largest problem or console text accepted, in UTF-8 bytes
+    problem_cache_size: int = 256  # Decompressed problems kept in memory; content-addressed, so never stale
+    
+    # Hint streaming
+    hint_generator: str = "stub"  # A registered generator or an import path module:Class
+    hint_max_streams_per_user: int = 2  # Concurrent hint streams per user, more get a 429
+    hint_max_streams: int = 200  # Concurrent hint streams per worker process
+    hint_max_seconds: float = 120.0  # A generation running longer is stopped with an error event
+    hint_stub_chunk_delay_ms: float = 30.0  # Pause between chunks of the stub generator
+    
+    # Logging
+    log_queue_size: int = 10000  # Records waiting for the log thread; more are dropped
+    log_access_sample_rate: float = 1.0  # Share of 2xx access lines kept, errors are always logged
     
     # Application
     app_name: str = "AlgoSensei"
@@ -0,0 +1,22 @@
+"""Process-wide state of hint streaming: the generator, the stream slots and their metrics."""
+from app.config.settings import settings
+from app.hints.generator import HintGenerator, create_hint_generator
+from app.hints.stream import HintMetrics, StreamSlots
+
+
+class HintContainer:
+
+    def __init__(self, generator: HintGenerator | None = None, slots: StreamSlots | None = None, metrics: HintMetrics | None = None):
+        self.generator = generator or create_hint_generator()
+        # Counted per worker process, like the rate limit buckets
+        self.slots = slots or StreamSlots(settings.hint_max_streams_per_user, settings.hint_max_streams)
+        self.metrics = metrics or HintMetrics()
+
+
+_container: HintContainer | None = None
+
+def get_hint_container() -> HintContainer:
+    global _container
+    if _container is None:
+        _container = HintContainer()
+    return _container
@@ -0,0 +1,6 @@
+from app.hints.container import get_hint_container
+from app.hints.service import HintService
+
+def get_hint_service() -> HintService:
+    """HintService on the process-wide generator and stream slots. It opens its own short session."""
+    return HintService(get_hint_container())
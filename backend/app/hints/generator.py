@@ -0,0 +1,95 @@
+"""Pluggable backends that generate hints as a stream of text chunks."""
+import re
+import asyncio
+import importlib
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from app.config.settings import settings
+
+
+"""
+Everything a generator gets to work with, loaded before the stream starts so
+no database session is held while it runs.
+"""
+@dataclass(frozen=True, slots=True)
+class HintRequest:
+    problem: str
+    console: str | None = None  # Latest console snapshot of the user, with test results
+    code: str | None = None
+    level: int = 1  # 1 nudges, 3 all but gives the approach away
+
+
+class HintGenerator:
+    """
+    Yields a hint piece by piece. The stream pulls the next chunk only once
+    the previous one was handed to the client, so a slow reader slows the
+    generator down instead of growing a buffer. When the client goes away the
+    task driving the generator is cancelled and the generator closed, so
+    implementations should keep their work inside the iteration and clean up
+    in ``finally``.
+    """
+
+    name: str
+
+    def stream(self, request: HintRequest) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+
+HINTS = (
+    "Restate the task in your own words before writing code: {summary}",
+    "Work through the first example by hand and note what you had to remember at each step; "
+    "that is the state your loop needs to carry.",
+    "Ask which lookup you repeat inside the loop. A hash map or a sorted structure usually turns "
+    "that repeated scan into a constant or logarithmic step.",
+)
+
+CONSOLE_HINT = "Your output was {current} where {expected} was expected. Trace the failing case line by line and find the first step where they differ."
+
+
+class StubHintGenerator(HintGenerator):
+    """
+    Deterministic hints built from the problem text and console results,
+    a few words per chunk with an optional pause between chunks. Stands in
+    for a model in development, tests and benchmarks.
+    """
+
+    name = "stub"
+
+    def __init__(self, chunk_delay: float | None = None, words_per_chunk: int = 3):
+        self.chunk_delay = settings.hint_stub_chunk_delay_ms / 1000 if chunk_delay is None else chunk_delay
+        self.words_per_chunk = words_per_chunk
+
+    async def stream(self, request: HintRequest) -> AsyncIterator[str]:
+        words = self.hint_text(request).split(" ")
+        for start in range(0, len(words), self.words_per_chunk):
+            # Also the cancellation point: a pause of 0 still yields to the event loop
+            await asyncio.sleep(self.chunk_delay)
+            chunk = " ".join(words[start:start + self.words_per_chunk])
+            yield chunk if start == 0 else " " + chunk
+
+    def hint_text(self, request: HintRequest) -> str:
+        summary = " ".join(request.problem.split()[:24])
+        hints = [hint.format(summary=summary) for hint in HINTS[:request.level]]
+        if request.console:
+            current = re.search(r"Current Output: (.*)", request.console)
+            expected = re.search(r"Expected Output: (.*)", request.console)
+            if current and expected and current.group(1) != expected.group(1):
+                hints.insert(0, CONSOLE_HINT.format(current=current.group(1).strip(), expected=expected.group(1).strip()))
+        return " ".join(hints)
+
+
+GENERATORS = {"stub": StubHintGenerator}
+
+def create_hint_generator() -> HintGenerator:
+    """
+    The generator named by HINT_GENERATOR: a registered name, or an import path
+    ``package.module:ClassName`` of a HintGenerator built without arguments.
+    """
+    name = settings.hint_generator
+    if name in GENERATORS:
+        return GENERATORS[name]()
+    module, _, attribute = name.partition(":")
+    if not attribute:
+        raise RuntimeError(f"Unknown HINT_GENERATOR {name!r}, expected one of {sorted(GENERATORS)} or 'module:Class'")
+    return getattr(importlib.import_module(module), attribute)()
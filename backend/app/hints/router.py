@@ -0,0 +1,42 @@
+"""Router definitions for streamed hint endpoints."""
+import time
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.responses import ORJSONResponse
+
+from app.auth.dependency import get_current_user_id
+from app.auth.permissions import Permission, requires
+from app.hints.dependency import get_hint_service
+from app.hints.schemas import HintStreamRequestSchema
+from app.hints.service import HintService
+from app.hints.stream import EventStreamResponse
+
+router = APIRouter(
+    prefix="/hints",
+    tags=["hints"],
+    default_response_class=ORJSONResponse,
+)
+
+@router.post(
+    "/stream",
+    response_class=EventStreamResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[requires(Permission.REQUEST_HINTS)],
+    responses={404: {"description": "Problem not found"}, 429: {"description": "Too many hint streams open"}},
+)
+async def stream_hint(
+    request: Request,
+    hint_data: HintStreamRequestSchema,
+    user_id: Annotated[int, Depends(get_current_user_id)],
+    hint_service: Annotated[HintService, Depends(get_hint_service)],
+):
+    """
+    Stream a hint for a stored problem as Server-Sent Events: ``hint`` events
+    carrying text chunks, then ``done``, or ``error`` if generation fails.
+    Closing the connection stops the generation.
+    """
+    # Set by ProcessTimeMiddleware; without it, timing starts here
+    started = getattr(request.state, "request_start", None) or time.perf_counter()
+    stream = await hint_service.open_stream(user_id, hint_data.content_id, hint_data.code, hint_data.level, started)
+    return EventStreamResponse(stream.events(), on_close=stream.close)
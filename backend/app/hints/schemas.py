@@ -0,0 +1,11 @@
+"""Request schemas for hint routes."""
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from app.config.settings import settings
+
+class HintStreamRequestSchema(BaseModel):
+    content_id: str = Field(pattern="^[0-9a-f]{64}$")  # Of a problem stored through /problems
+    code: Optional[str] = Field(default=None, max_length=settings.problem_max_bytes)
+    level: int = Field(default=1, ge=1, le=3)
@@ -0,0 +1,57 @@
+"""Service layer for streamed hints."""
+from functools import partial
+
+from app.config.database import session_scope
+from app.config.settings import settings
+from app.hints.container import HintContainer, get_hint_container
+from app.hints.generator import HintRequest
+from app.hints.stream import HintStream
+from app.problems.container import ProblemContainer, get_problem_container
+from app.problems.service import ProblemService
+from app.utils.exceptions import NotFoundException, TooManyRequestsException
+
+
+class HintService:
+    """
+    Opens hint streams. Everything the generator needs is read up front on a
+    session of its own, closed before the first chunk, so a stream that runs
+    for a minute does not keep a pooled connection checked out.
+    """
+
+    def __init__(self, container: HintContainer | None = None, problem_container: ProblemContainer | None = None, session_factory=session_scope):
+        container = container or get_hint_container()
+        self.generator = container.generator
+        self.slots = container.slots
+        self.metrics = container.metrics
+        self.problem_container = problem_container
+        self.session_factory = session_factory
+
+    async def open_stream(
+        self, user_id: int, content_id: str, code: str | None = None, level: int = 1, started: float | None = None,
+    ) -> HintStream:
+        """
+        Take one of the user's stream slots, 429 when they are all in use, and
+        load the hint request. ``started`` is the perf_counter() of the request's arrival.
+        """
+        if not self.slots.acquire(user_id):
+            self.metrics.rejected += 1
+            raise TooManyRequestsException("Too many hint streams open, wait for one to finish")
+        try:
+            request = await self._load_request(user_id, content_id, code, level)
+        except BaseException:
+            self.slots.release(user_id)
+            raise
+        return HintStream(self.generator, request, self.metrics, partial(self.slots.release, user_id), settings.hint_max_seconds, started)
+
+    """
+    Helper Functions
+    """
+    async def _load_request(self, user_id: int, content_id: str, code: str | None, level: int) -> HintRequest:
+        async with self.session_factory() as db:
+            problems = ProblemService(db, self.problem_container or get_problem_container())
+            problem = await problems.get_problem_text(content_id)
+            try:
+                console = (await problems.get_latest_snapshot(user_id, content_id))["console"]
+            except NotFoundException:
+                console = None
+        return HintRequest(problem=problem, console=console, code=code, level=level)
@@ -0,0 +1,200 @@
+"""Server-Sent Events streaming of hints, with per-user stream caps and stream metrics."""
+import time
+import asyncio
+import logging
+from typing import AsyncIterator, Callable
+
+import orjson
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.config.metrics import LATENCY_BUCKETS, STREAM_BUCKETS, Histogram
+from app.hints.generator import HintGenerator, HintRequest
+
+logger = logging.getLogger(__name__)
+
+
+def sse_event(event: str, data: dict) -> bytes:
+    """One event in the text/event-stream format. orjson never emits a newline, so data fits one line."""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+class HintMetrics:
+    """
+    Time to the first hint chunk is kept apart from the whole stream's
+    duration: the first is what the user waits on, the second how long a
+    slot stays taken. Only touched from the event loop, so nothing is locked.
+    """
+
+    def __init__(self):
+        self.ttfb_seconds = Histogram(LATENCY_BUCKETS)
+        self.duration_seconds = Histogram(STREAM_BUCKETS)
+        self.started = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.chunks = 0
+        self.active = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "started": self.started,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "chunks": self.chunks,
+            "active": self.active,
+        }
+
+
+class StreamSlots:
+    """
+    Counts open streams per user and in total. A generation holds model or
+    CPU time for its whole length, so one user opening tabs in a loop must
+    not crowd everyone else out. Only used from the event loop, so an acquire
+    is a check and an increment with no lock.
+    """
+
+    def __init__(self, per_user: int, total: int):
+        self.per_user = per_user
+        self.total = total
+        self.active: dict[int, int] = {}
+        self.open = 0
+
+    def acquire(self, user_id: int) -> bool:
+        held = self.active.get(user_id, 0)
+        if held >= self.per_user or self.open >= self.total:
+            return False
+        self.active[user_id] = held + 1
+        self.open += 1
+        return True
+
+    def release(self, user_id: int):
+        held = self.active.get(user_id, 0) - 1
+        if held > 0:
+            self.active[user_id] = held
+        else:
+            self.active.pop(user_id, None)
+        self.open -= 1
+
+
+class HintStream:
+    """
+    One hint generation turned into SSE events: ``hint`` per chunk, then
+    ``done``, or ``error`` when the generator fails or runs past
+    ``max_seconds``. ``close`` is called exactly once by the response,
+    however the stream ended, and gives the slot back. Time to first chunk
+    and duration are measured from ``started``.
+    """
+
+    def __init__(
+        self,
+        generator: HintGenerator,
+        request: HintRequest,
+        metrics: HintMetrics,
+        release: Callable[[], None],
+        max_seconds: float,
+        started: float | None = None,
+    ):
+        self.generator = generator
+        self.request = request
+        self.metrics = metrics
+        self.release = release
+        self.max_seconds = max_seconds
+        # perf_counter() at request arrival, so loading the problem counts towards both timings
+        self.started = time.perf_counter() if started is None else started
+        self.outcome: str | None = None
+        self.closed = False
+        metrics.started += 1
+        metrics.active += 1
+
+    async def events(self) -> AsyncIterator[bytes]:
+        chunks = self.generator.stream(self.request)
+        deadline = asyncio.get_running_loop().time() + self.max_seconds
+        count = 0
+        try:
+            while True:
+                try:
+                    # The deadline only covers the generator, never a send to a slow client
+                    async with asyncio.timeout_at(deadline):
+                        chunk = await anext(chunks, None)
+                except TimeoutError:
+                    self.outcome = "timeouts"
+                    yield sse_event("error", {"detail": "Hint generation timed out"})
+                    return
+                except Exception:
+                    logger.exception("Hint generation failed")
+                    self.outcome = "failed"
+                    yield sse_event("error", {"detail": "Hint generation failed"})
+                    return
+                if chunk is None:
+                    break
+                if count == 0:
+                    self.metrics.ttfb_seconds.observe(time.perf_counter() - self.started)
+                count += 1
+                yield sse_event("hint", {"text": chunk})
+            self.outcome = "completed"
+            yield sse_event("done", {"chunks": count})
+        finally:
+            self.metrics.chunks += count
+            # Stops the generator right away, also when we were closed at a yield
+            aclose = getattr(chunks, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.release()
+        metrics = self.metrics
+        metrics.active -= 1
+        metrics.duration_seconds.observe(time.perf_counter() - self.started)
+        # A stream closed before its last event means the client went away
+        outcome = self.outcome or "cancelled"
+        setattr(metrics, outcome, getattr(metrics, outcome) + 1)
+
+
+class EventStreamResponse(StreamingResponse):
+    """
+    StreamingResponse that always watches for the client going away. Starlette
+    only listens for http.disconnect under ASGI spec versions before 2.4 and
+    otherwise waits for a send to fail, which for a generator paused between
+    chunks can be much later. Here a disconnect cancels the sending task and
+    closes the body iterator at once, then ``on_close`` runs.
+    """
+
+    media_type = "text/event-stream"
+
+    def __init__(self, content: AsyncIterator[bytes], on_close: Callable[[], None] | None = None, headers: dict | None = None):
+        super().__init__(
+            content,
+            # Proxies must pass every event through as it is written
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **(headers or {})},
+        )
+        self.on_close = on_close
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        streaming = asyncio.create_task(self.stream_response(send))
+        listening = asyncio.create_task(self.listen_for_disconnect(receive))
+        try:
+            await asyncio.wait((streaming, listening), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            streaming.cancel()
+            listening.cancel()
+            await asyncio.wait((streaming, listening))
+            try:
+                await self.body_iterator.aclose()
+            finally:
+                if self.on_close is not None:
+                    self.on_close()
+
+        if not streaming.cancelled():
+            error = streaming.exception()
+            # A failed send is the server telling us the client is gone
+            if error is not None and not isinstance(error, OSError):
+                raise error
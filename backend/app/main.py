@@ -1,82 +1,94 @@
-import time
+import asyncio
 import logging
-from sqlalchemy import text
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.requests import Request
-from app.config.database import engine, Base
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+from app.config.database import dispose_engines, pool_metrics, replica_configured
+from app.config.metrics import RequestMetrics, render_metrics
+from app.config.settings import settings
+from app.config.log import start_queued_logging, stop_queued_logging
 from app.middlewares.cors import setup_cors
 from app.middlewares.authentication import AuthenticationMiddleware
+from app.middlewares.timing import ProcessTimeMiddleware
+from app.middlewares.rate_limit import RateLimitMiddleware
+from app.middlewares.authorization import AuthorizationMiddleware
+from app.middlewares.metrics import MetricsMiddleware
 from app.auth.router import router as auth_router
+from app.problems.router import router as problems_router
+from app.hints.router import router as hints_router
+from app.hints.container import get_hint_container
+from app.auth.container import get_container, init_container, shutdown_container
+from app.migrate import create_schema
 
 logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifespan events."""
+    start_queued_logging()
+    container = init_container()
+    if replica_configured() and not settings.user_cache_url:
+        logger.warning("DB_REPLICA_URL without USER_CACHE_URL: each worker only knows its own users' writes, "
+                       "so with several workers a read right after a write can still hit the replica")
     try:
-        with engine.connect() as connection:
-            connection.execute(text("SELECT 1"))
+        if settings.db_migrate_on_startup:
+            await create_schema()
+        # First query of the process, so it also checks the database is reachable
+        await container.token_revocation.rebuild()
         logger.info("✅ Database connection successful!")
-        
-        Base.metadata.create_all(bind=engine)
-        logger.info("📊 Database tables created/verified")
-        
     except Exception as e:
         logger.error(f"❌ Database connection failed: {e}")
         raise
     
+    revocation_task = asyncio.create_task(container.token_revocation.run())
+    
     yield
     
     logger.info("Shutting down...")
+    revocation_task.cancel()
+    # Before the engines go, pending rehashes may still be writing
+    await shutdown_container()
+    await dispose_engines()
+    stop_queued_logging()
 
 app = FastAPI(
     title="AlgoSensei API",
     description="Backend API for AlgoSensei platform",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
-# Global Middleware
+# Global Middleware (the last one added runs first)
+app.add_middleware(AuthorizationMiddleware, routes=app.routes)
+app.add_middleware(RateLimitMiddleware)
+if settings.forwarded_allow_ips:
+    # Puts the client address from X-Forwarded-For in scope before the per-IP buckets read it
+    app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=settings.forwarded_allow_ips)
 setup_cors(app)
 app.add_middleware(AuthenticationMiddleware)
-
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    start_time = time.perf_counter()
-    response = await call_next(request)
-    process_time = time.perf_counter() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    
-    # Color code status codes
-    status_code = response.status_code
-    if 200 <= status_code < 300:
-        status_color = "\033[92m"
-    elif 300 <= status_code < 400:
-        status_color = "\033[96m"
-    elif 400 <= status_code < 500:
-        status_color = "\033[93m"
-    else:
-        status_color = "\033[91m"
-    reset_color = "\033[0m"
-    
-    logger.info(
-        f"{request.client.host} - {request.method} {request.url.path} - "
-        f"{status_color}{status_code}{reset_color} - "
-        f"{process_time:.4f}s"
-    )
-    
-    return response
+app.add_middleware(ProcessTimeMiddleware)
+request_metrics = RequestMetrics()
+app.add_middleware(MetricsMiddleware, metrics=request_metrics, routes=app.routes)
 
 # Include routers
 app.include_router(auth_router)
+app.include_router(problems_router)
+app.include_router(hints_router)
 
-@app.get("/")
+@app.get("/", response_model=dict[str, str])
 async def root():
     """Health check endpoint."""
     return {"message": "Welcome to AlgoSensei API", "status": "healthy"}
 
-@app.get("/health")
+@app.get("/health", response_model=dict[str, str])
 async def health():
     """Health check endpoint."""
     return {"status": "ok"}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint. Counts are per worker process."""
+    container = get_container()
+    return render_metrics(request_metrics, pool_metrics, container.password_hasher.metrics, container.user_flights, get_hint_container().metrics)
@@ -1,29 +1,52 @@
 """Authentication middleware for extracting user_id from JWT token."""
-import jwt
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from app.config.settings import settings
-
-"""Middleware to extract user_id from JWT token and store in request.state"""
-class AuthenticationMiddleware(BaseHTTPMiddleware):
-        
-    async def dispatch(self, request: Request, call_next):
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.auth.container import get_container
+
+"""
+Pure ASGI middleware to extract user_id from JWT token and store in request.state.
+It reads the Authorization header straight from scope["headers"] and passes
+receive/send through untouched, so streaming responses are not buffered.
+"""
+class AuthenticationMiddleware:
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+        claims = await self.get_token_claims(scope)
+        state["user_id"] = int(claims["sub"]) if claims else None
+        state["token_claims"] = claims
+        await self.app(scope, receive, send)
+
+    async def get_token_claims(self, scope: Scope) -> dict | None:
+        """Claims of a valid, unrevoked token whose subject is a user id, otherwise None."""
         # Extract token from Authorization header
-        auth_header = request.headers.get("Authorization")
-        
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.replace("Bearer ", "")
-            try:
-                # Decode token and extract user_id
-                payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-                user_id = payload.get("sub")
-                if user_id:
-                    request.state.user_id = int(user_id)
-            except:
-                # If token is invalid, set user_id to None
-                request.state.user_id = None
-        else:
-            request.state.user_id = None
-        
-        response = await call_next(request)
-        return response
\ No newline at end of file
+        token = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                if value.startswith(b"Bearer "):
+                    token = value[7:].decode("latin-1")
+                break
+
+        if not token:
+            return None
+        container = get_container()
+        try:
+            # Decode token and extract user_id
+            claims = container.token_codec.decode(token)
+            int(claims["sub"])
+        except Exception:
+            # If token is invalid, set user_id to None
+            return None
+
+        # The Bloom filter answers almost every request; only its positives reach the store
+        revocation = container.token_revocation
+        if revocation.might_be_revoked(claims) and await revocation.is_revoked(claims):
+            return None
+        return claims
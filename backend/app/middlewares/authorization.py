@@ -0,0 +1,76 @@
+"""Authorization middleware that enforces route permissions from a precompiled table."""
+from fastapi.routing import APIRoute
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.auth.permissions import DEFAULT_ROLE, roles_with
+
+
+def compile_route_policies(routes) -> tuple[dict, list]:
+    """
+    Turn the permissions declared with ``requires`` into lookup tables of allowed
+    roles. Static paths go into a dict keyed by (method, path); templated paths
+    are kept in a short list that is matched in order.
+    """
+    static, templated = {}, []
+    for route in routes:
+        if not isinstance(route, APIRoute):
+            continue
+        permissions = [
+            dependency.dependency.permission
+            for dependency in route.dependencies
+            if hasattr(dependency.dependency, "permission")
+        ]
+        if not permissions:
+            continue
+        allowed = frozenset.intersection(*(roles_with(permission) for permission in permissions))
+        if route.param_convertors:
+            templated.append((route, allowed))
+        else:
+            for method in route.methods:
+                static[(method, route.path)] = allowed
+    return static, templated
+
+
+"""
+Pure ASGI middleware that rejects requests before they reach the route, so no
+dependency runs and no database session is opened for them. Roles come from the
+token claims that AuthenticationMiddleware put in scope state.
+"""
+class AuthorizationMiddleware:
+
+    def __init__(self, app: ASGIApp, routes):
+        self.app = app
+        # The middleware stack is built on the first ASGI event, i.e. at lifespan
+        # startup, when every router has been included.
+        self.static_policies, self.templated_policies = compile_route_policies(routes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        allowed = self.static_policies.get((scope["method"], scope["path"]))
+        if allowed is None and self.templated_policies:
+            allowed = self.match_templated(scope)
+        if allowed is None:
+            await self.app(scope, receive, send)
+            return
+
+        claims = scope.get("state", {}).get("token_claims")
+        if claims is None:
+            response = JSONResponse({"detail": "Not authenticated"}, status_code=401)
+        elif claims.get("role", DEFAULT_ROLE) not in allowed:
+            response = JSONResponse({"detail": "Permission denied"}, status_code=403)
+        else:
+            await self.app(scope, receive, send)
+            return
+        await response(scope, receive, send)
+
+    def match_templated(self, scope: Scope):
+        for route, allowed in self.templated_policies:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return allowed
+        return None
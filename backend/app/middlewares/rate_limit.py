@@ -0,0 +1,204 @@
+"""Token-bucket rate limiting per client IP and per authenticated user."""
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config.settings import settings
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimit:
+    rate: float  # Tokens refilled per second
+    burst: int   # Bucket capacity
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitPolicy:
+    per_ip: RateLimit | None = None
+    per_user: RateLimit | None = None
+
+
+"""
+Policies for (method, path). Login and registration trigger Argon2 work, so they
+get tight per-IP buckets of their own; every other route shares the default.
+"""
+ROUTE_POLICIES = {
+    ("POST", "/users/login"): RateLimitPolicy(per_ip=RateLimit(rate=10 / 60, burst=10)),
+    ("POST", "/users/register"): RateLimitPolicy(per_ip=RateLimit(rate=5 / 60, burst=5)),
+    ("PUT", "/users/change-password"): RateLimitPolicy(
+        per_ip=RateLimit(rate=10 / 60, burst=10),
+        per_user=RateLimit(rate=5 / 60, burst=5),
+    ),
+}
+
+DEFAULT_POLICY = RateLimitPolicy(
+    per_ip=RateLimit(rate=settings.rate_limit_ip_per_second, burst=settings.rate_limit_ip_burst),
+    per_user=RateLimit(rate=settings.rate_limit_user_per_second, burst=settings.rate_limit_user_burst),
+)
+
+
+class LocalBucketStore:
+    """
+    In-process buckets split over shards, each an LRU capped at ``max_per_shard``.
+    Every acquire is O(1) and has no await, so it runs atomically on the event loop
+    without locks. Evicting an idle bucket only forgets a mostly refilled budget.
+    """
+
+    shared = False
+
+    def __init__(self, shards: int = 16, max_per_shard: int = 4096, clock=time.monotonic):
+        self.mask = shards - 1
+        assert shards & self.mask == 0, "shards must be a power of two"
+        self.shards = [OrderedDict() for _ in range(shards)]
+        self.max_per_shard = max_per_shard
+        self.clock = clock
+
+    def acquire(self, key: tuple, limit: RateLimit) -> float:
+        """Take one token. Returns 0 when allowed, otherwise seconds until one is available."""
+        shard = self.shards[hash(key) & self.mask]
+        now = self.clock()
+        bucket = shard.get(key)
+        if bucket is None:
+            bucket = shard[key] = [float(limit.burst), now]
+            if len(shard) > self.max_per_shard:
+                shard.popitem(last=False)
+        else:
+            shard.move_to_end(key)
+            tokens = bucket[0] + (now - bucket[1]) * limit.rate
+            bucket[0] = tokens if tokens < limit.burst else float(limit.burst)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / limit.rate
+
+    def refund(self, key: tuple, limit: RateLimit):
+        """Give back a token taken for a request that a later check rejected."""
+        bucket = self.shards[hash(key) & self.mask].get(key)
+        if bucket is not None:
+            bucket[0] = min(bucket[0] + 1, float(limit.burst))
+
+
+class RedisBucketStore:
+    """
+    Buckets kept in Redis so every worker draws from the same budget. The refill
+    and take run in one Lua script, timed by the Redis server clock.
+    """
+
+    shared = True
+
+    SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local burst = tonumber(ARGV[2])
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or burst
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(burst, tokens + (now - ts) * rate)
+    local retry_after = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        retry_after = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return tostring(retry_after)
+    """
+
+    REFUND_SCRIPT = """
+    local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+    if tokens then
+        redis.call('HSET', KEYS[1], 'tokens', math.min(tonumber(ARGV[1]), tokens + 1))
+    end
+    return 0
+    """
+
+    def __init__(self, client, prefix: str = "algosensei:ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def acquire(self, key: tuple, limit: RateLimit) -> float:
+        return float(await self.client.eval(self.SCRIPT, 1, self._key(key), limit.rate, limit.burst))
+
+    async def refund(self, key: tuple, limit: RateLimit):
+        await self.client.eval(self.REFUND_SCRIPT, 1, self._key(key), limit.burst)
+
+    def _key(self, key: tuple) -> str:
+        return self.prefix + ":".join(str(part) for part in key)
+
+
+def create_bucket_store():
+    """Build the bucket store selected by settings."""
+    if settings.rate_limit_url:
+        try:
+            from redis.asyncio import from_url
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_URL requires the 'redis' package") from e
+        return RedisBucketStore(from_url(settings.rate_limit_url))
+    return LocalBucketStore()
+
+
+"""
+Pure ASGI middleware. It has to sit inside AuthenticationMiddleware to see the
+user_id in scope state, and inside CORS so 429 responses stay readable by the
+extension.
+
+Per-IP buckets are keyed by scope["client"]. Behind Cloud Run or another load
+balancer that is the proxy's address unless X-Forwarded-For is applied first,
+so set FORWARDED_ALLOW_IPS (main.py then adds uvicorn's ProxyHeadersMiddleware
+around this one) or run uvicorn with --forwarded-allow-ips. Otherwise every
+client shares one IP bucket.
+"""
+class RateLimitMiddleware:
+
+    def __init__(self, app: ASGIApp, store=None, policies: dict | None = None, default: RateLimitPolicy | None = None):
+        self.app = app
+        self.store = store or create_bucket_store()
+        self.policies = ROUTE_POLICIES if policies is None else policies
+        self.default = default or DEFAULT_POLICY
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not settings.rate_limit_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        route = (scope["method"], scope["path"])
+        policy = self.policies.get(route)
+        if policy is None:
+            policy, route = self.default, None
+
+        retry_after = 0.0
+        if policy.per_ip is not None:
+            client = scope.get("client")
+            ip_key = (route, "ip", client[0] if client else None)
+            retry_after = await self._call(self.store.acquire, ip_key, policy.per_ip)
+        if not retry_after and policy.per_user is not None:
+            user_id = scope.get("state", {}).get("user_id")
+            if user_id is not None:
+                retry_after = await self._call(self.store.acquire, (route, "user", user_id), policy.per_user)
+                # Rejected by the user's budget, so the request must not cost the IP budget too
+                if retry_after and policy.per_ip is not None:
+                    await self._call(self.store.refund, ip_key, policy.per_ip)
+
+        if retry_after:
+            response = JSONResponse(
+                {"detail": "Too Many Requests"},
+                status_code=429,
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+    async def _call(self, method, key: tuple, limit: RateLimit):
+        """Shared stores are awaited, the local one answers without a suspension point."""
+        if self.store.shared:
+            return await method(key, limit)
+        return method(key, limit)
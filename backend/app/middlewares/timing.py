@@ -0,0 +1,66 @@
+"""Middleware that reports request processing time and writes the access log line."""
+import time
+import random
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+"""
+Pure ASGI middleware that injects X-Process-Time into the response start
+message by wrapping send, instead of buffering the response like
+BaseHTTPMiddleware does.
+
+Only ``sample_rate`` of the 2xx responses get an access line; every other status
+is always logged. The message args are merged lazily by the log handler, and
+the same values are attached as fields for the JSON formatter.
+"""
+class ProcessTimeMiddleware:
+
+    def __init__(self, app: ASGIApp, sample_rate: float | None = None):
+        self.app = app
+        self.sample_rate = settings.log_access_sample_rate if sample_rate is None else sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        # For routes that time their own milestones against request arrival, e.g. the first hint chunk
+        scope.setdefault("state", {})["request_start"] = start_time
+        status_code = 500
+
+        async def send_with_process_time(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Process-Time", str(time.perf_counter() - start_time))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_process_time)
+        finally:
+            process_time = time.perf_counter() - start_time
+            if not 200 <= status_code < 300 or self.sample_rate >= 1 or random.random() < self.sample_rate:
+                self._log_access(scope, status_code, process_time)
+
+    def _log_access(self, scope: Scope, status_code: int, process_time: float):
+        client = scope.get("client")
+        client_host = client[0] if client else "-"
+        logger.info(
+            "%s - %s %s - %s - %.4fs",
+            client_host, scope["method"], scope["path"], status_code, process_time,
+            extra={
+                "client": client_host,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status_code": status_code,
+                "duration": process_time,
+            },
+        )
@@ -0,0 +1,65 @@
+"""
+Explicit schema migration step, run once per deploy before the app starts:
+
+    python -m app.migrate
+
+The app no longer creates tables on boot unless DB_MIGRATE_ON_STARTUP is set.
+Columns added to an existing model are added to its table here as well; they
+need a server default so the rows already there get a value.
+"""
+import asyncio
+import logging
+
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn
+from starlette.concurrency import run_in_threadpool
+
+import app.auth.user  # noqa: F401  Registers the tables on Base.metadata
+import app.problems.problem  # noqa: F401
+from app.config.database import Base, dispose_engines, get_async_engine, get_engine
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def add_missing_columns(connection):
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                definition = CreateColumn(column).compile(dialect=connection.dialect)
+                connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {definition}")
+                logger.info(f"Added column {table.name}.{column.name}")
+
+
+def migrate(connection):
+    Base.metadata.create_all(connection)
+    add_missing_columns(connection)
+
+
+def _migrate_sync():
+    with get_engine().begin() as connection:
+        migrate(connection)
+
+
+async def create_schema():
+    """Create missing tables and columns on the engine selected by DB_ASYNC. Nothing is altered or dropped."""
+    if settings.db_async:
+        async with get_async_engine().begin() as connection:
+            await connection.run_sync(migrate)
+    else:
+        await run_in_threadpool(_migrate_sync)
+    logger.info("📊 Database tables created/verified")
+
+
+async def main():
+    try:
+        await create_schema()
+    finally:
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    asyncio.run(main())
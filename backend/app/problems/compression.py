@@ -0,0 +1,85 @@
+"""Compression codecs for problem blobs and console deltas."""
+import zlib
+
+from app.config.settings import settings
+
+
+class Codec:
+    """
+    Compresses bytes, optionally against a dictionary. Compressing a console
+    snapshot with its problem text as dictionary stores only what differs from
+    the problem, which is what makes the snapshot a delta.
+    """
+
+    name: str
+
+    def compress(self, data: bytes, dictionary: bytes | None = None) -> bytes:
+        raise NotImplementedError
+
+    def decompress(self, data: bytes, dictionary: bytes | None = None) -> bytes:
+        raise NotImplementedError
+
+
+class ZlibCodec(Codec):
+    """
+    Deflate from the standard library, gzip's format without its header. A
+    preset dictionary only reaches back 32 KiB, so of a longer problem only
+    the tail helps the delta.
+    """
+
+    name = "zlib"
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def compress(self, data: bytes, dictionary: bytes | None = None) -> bytes:
+        if dictionary is None:
+            return zlib.compress(data, self.level)
+        compressor = zlib.compressobj(self.level, zdict=dictionary)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, data: bytes, dictionary: bytes | None = None) -> bytes:
+        if dictionary is None:
+            return zlib.decompress(data)
+        decompressor = zlib.decompressobj(zdict=dictionary)
+        return decompressor.decompress(data) + decompressor.flush()
+
+
+class ZstdCodec(Codec):
+    """Zstandard, with the whole problem text usable as a raw-content dictionary."""
+
+    name = "zstd"
+
+    def __init__(self, level: int = 3):
+        try:
+            import zstandard
+        except ImportError as e:
+            raise RuntimeError("PROBLEM_COMPRESSION=zstd requires the 'zstandard' package") from e
+        self.zstandard = zstandard
+        self.level = level
+
+    def compress(self, data: bytes, dictionary: bytes | None = None) -> bytes:
+        return self.zstandard.ZstdCompressor(level=self.level, dict_data=self._dictionary(dictionary)).compress(data)
+
+    def decompress(self, data: bytes, dictionary: bytes | None = None) -> bytes:
+        return self.zstandard.ZstdDecompressor(dict_data=self._dictionary(dictionary)).decompress(data)
+
+    def _dictionary(self, dictionary: bytes | None):
+        if dictionary is None:
+            return None
+        return self.zstandard.ZstdCompressionDict(dictionary, dict_type=self.zstandard.DICT_TYPE_RAWCONTENT)
+
+
+CODECS = {"zlib": ZlibCodec, "zstd": ZstdCodec}
+
+_codecs: dict[str, Codec] = {}
+
+def get_codec(name: str | None = None) -> Codec:
+    """
+    The codec named on a stored row, or the configured one for new writes. Rows
+    remember their codec, so changing PROBLEM_COMPRESSION leaves them readable.
+    """
+    name = name or settings.problem_compression
+    if name not in _codecs:
+        _codecs[name] = CODECS[name]()
+    return _codecs[name]
@@ -0,0 +1,48 @@
+"""Process-wide state of the problem services: the blob store and caches of immutable problems."""
+from collections import OrderedDict
+
+from app.config.settings import settings
+from app.problems.storage import BlobStore, create_blob_store
+
+
+class LRU:
+    """
+    Bounded mapping for values that never go stale, here everything keyed by
+    content id. Only touched from the event loop, so it needs no lock.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class ProblemContainer:
+
+    def __init__(self, blob_store: BlobStore | None = None, cache_size: int | None = None):
+        self.blob_store = blob_store if blob_store is not None else create_blob_store()
+        cache_size = settings.problem_cache_size if cache_size is None else cache_size
+        # Metadata of problems known to be stored, answers exists checks without a query
+        self.records = LRU(cache_size * 16)
+        # Decompressed problem texts, the dictionary of every snapshot delta
+        self.texts = LRU(cache_size)
+
+
+_container: ProblemContainer | None = None
+
+def get_problem_container() -> ProblemContainer:
+    global _container
+    if _container is None:
+        _container = ProblemContainer()
+    return _container
@@ -0,0 +1,14 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.container import get_container
+from app.auth.dependency import get_routed_db
+from app.problems.container import get_problem_container
+from app.problems.service import ProblemService
+
+def get_problem_service(db: AsyncSession = Depends(get_routed_db)) -> ProblemService:
+    """
+    ProblemService bound to the request's session, sharing the process-wide blob
+    store and caches. Writes are recorded in the user cache that get_routed_db reads.
+    """
+    return ProblemService(db, get_problem_container(), get_container().user_cache)
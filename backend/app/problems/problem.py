@@ -0,0 +1,50 @@
+"""Model definitions for ingested problems and console snapshots."""
+from dataclasses import dataclass
+
+from sqlalchemy import BigInteger, ForeignKey, Index, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.config.database import Base
+
+class Problem(Base):
+    __tablename__ = "problems"
+
+    # SHA-256 of the UTF-8 problem text, so clients can compute it before uploading
+    content_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    size: Mapped[int] = mapped_column(Integer)  # Uncompressed bytes
+    stored_size: Mapped[int] = mapped_column(Integer)
+    codec: Mapped[str] = mapped_column(String(8))
+    # The compressed text with PROBLEM_STORAGE=database, otherwise it lives in the blob store
+    data: Mapped[bytes | None] = mapped_column(LargeBinary, deferred=True)
+    created_at: Mapped[int] = mapped_column(BigInteger)  # Unix seconds
+
+    def __repr__(self) -> str:
+        return f"<Problem(content_id={self.content_id}, size={self.size}, stored_size={self.stored_size})>"
+
+class ConsoleSnapshot(Base):
+    __tablename__ = "console_snapshots"
+    __table_args__ = (Index("ix_console_snapshots_user_problem", "user_id", "content_id", "id"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    content_id: Mapped[str] = mapped_column(ForeignKey("problems.content_id"))
+    size: Mapped[int] = mapped_column(Integer)  # Uncompressed bytes
+    # Compressed with the problem text as dictionary, i.e. a delta against the problem
+    delta: Mapped[bytes] = mapped_column(LargeBinary)
+    codec: Mapped[str] = mapped_column(String(8))
+    created_at: Mapped[int] = mapped_column(BigInteger)
+
+    def __repr__(self) -> str:
+        return f"<ConsoleSnapshot(id={self.id}, user_id={self.user_id}, content_id={self.content_id})>"
+
+
+"""
+Detached snapshot of a problem row's metadata, safe to cache and share.
+"""
+@dataclass(frozen=True, slots=True)
+class ProblemRecord:
+    content_id: str
+    size: int
+    stored_size: int
+    codec: str
+    created_at: int
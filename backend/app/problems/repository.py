@@ -0,0 +1,86 @@
+"""Repository for problem and console snapshot database operations."""
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.auth.cache import UserCache
+from app.problems.problem import ConsoleSnapshot, Problem, ProblemRecord
+
+METADATA_COLUMNS = (Problem.content_id, Problem.size, Problem.stored_size, Problem.codec, Problem.created_at)
+
+# Dialects whose insert() supports ON CONFLICT DO NOTHING
+INSERT_BY_DIALECT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+class ProblemRepository:
+    """
+    Works on the same sessions as AuthRepository. Problems are immutable once
+    stored. Writes made for a user are recorded in the user cache like
+    AuthRepository's, so that user's next GETs skip a lagging replica.
+    """
+
+    def __init__(self, db, cache: UserCache | None = None):
+        self.db = db
+        self.cache = cache
+
+    async def exists(self, content_id: str) -> bool:
+        return (await self.db.execute(select(Problem.content_id).where(Problem.content_id == content_id))).first() is not None
+
+    async def get_problem(self, content_id: str) -> ProblemRecord | None:
+        row = (await self.db.execute(select(*METADATA_COLUMNS).where(Problem.content_id == content_id))).first()
+        return ProblemRecord(**row._mapping) if row is not None else None
+
+    async def get_problem_data(self, content_id: str) -> bytes | None:
+        """The compressed text stored in the row, None when it lives in the blob store."""
+        return (await self.db.execute(select(Problem.data).where(Problem.content_id == content_id))).scalar()
+
+    async def create_problem(self, record: ProblemRecord, data: bytes | None, user_id: int | None = None) -> bool:
+        """Insert unless the content id is already stored. Returns whether this call inserted it."""
+        values = dict(
+            content_id=record.content_id,
+            size=record.size,
+            stored_size=record.stored_size,
+            codec=record.codec,
+            created_at=record.created_at,
+            data=data,
+        )
+        insert_with_conflicts = INSERT_BY_DIALECT.get(self.db.get_bind().dialect.name)
+        if insert_with_conflicts is None:
+            if await self.exists(record.content_id):
+                return False
+            await self.db.execute(insert(Problem).values(**values))
+            await self.db.commit()
+            await self._record_write(user_id)
+            return True
+
+        row = (await self.db.execute(
+            insert_with_conflicts(Problem).values(**values).on_conflict_do_nothing().returning(Problem.content_id)
+        )).first()
+        await self.db.commit()
+        # Also on a conflict: the concurrent insert is just as new to the replica
+        await self._record_write(user_id)
+        return row is not None
+
+    async def create_snapshot(self, user_id: int, content_id: str, size: int, delta: bytes, codec: str, created_at: int) -> int:
+        snapshot_id = (await self.db.execute(
+            insert(ConsoleSnapshot)
+            .values(user_id=user_id, content_id=content_id, size=size, delta=delta, codec=codec, created_at=created_at)
+            .returning(ConsoleSnapshot.id)
+        )).scalar_one()
+        await self.db.commit()
+        await self._record_write(user_id)
+        return snapshot_id
+
+    async def get_latest_snapshot(self, user_id: int, content_id: str):
+        """Newest snapshot of the user for the problem, as a row of id, size, delta, codec and created_at."""
+        return (await self.db.execute(
+            select(ConsoleSnapshot.id, ConsoleSnapshot.size, ConsoleSnapshot.delta, ConsoleSnapshot.codec, ConsoleSnapshot.created_at)
+            .where(ConsoleSnapshot.user_id == user_id, ConsoleSnapshot.content_id == content_id)
+            .order_by(ConsoleSnapshot.id.desc())
+            .limit(1)
+        )).first()
+
+    """
+    Helper Functions
+    """
+    async def _record_write(self, user_id: int | None):
+        if self.cache is not None and user_id is not None:
+            await self.cache.record_write(user_id)
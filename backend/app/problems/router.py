@@ -0,0 +1,88 @@
+"""Router definitions for problem ingest endpoints."""
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, Path, Response, status
+from fastapi.responses import ORJSONResponse
+
+from app.auth.dependency import get_current_user_id
+from app.auth.permissions import Permission, requires
+from app.problems.dependency import get_problem_service
+from app.problems.schemas import (
+    ProblemIngestRequestSchema,
+    SnapshotCreateRequestSchema,
+    ProblemResponseSchema,
+    ProblemTextResponseSchema,
+    SnapshotResponseSchema,
+    SnapshotTextResponseSchema,
+)
+from app.problems.service import ProblemService
+from app.utils.etag import etag_matches
+from app.utils.exceptions import NotFoundException
+
+router = APIRouter(
+    prefix="/problems",
+    tags=["problems"],
+    default_response_class=ORJSONResponse,
+)
+
+# Lowercase hex SHA-256 of the UTF-8 problem text
+ContentId = Annotated[str, Path(pattern="^[0-9a-f]{64}$")]
+
+# A content id names exactly one text, so a fetched problem never needs revalidating
+IMMUTABLE = "private, max-age=31536000, immutable"
+
+@router.post("", response_model=ProblemResponseSchema, status_code=status.HTTP_201_CREATED, dependencies=[requires(Permission.WRITE_PROBLEMS)])
+async def ingest_problem(
+    problem_data: ProblemIngestRequestSchema,
+    response: Response,
+    user_id: Annotated[int, Depends(get_current_user_id)],
+    problem_service: Annotated[ProblemService, Depends(get_problem_service)],
+):
+    """Store a problem text once and return its content id. Answers 200 when it was already stored."""
+    problem, created = await problem_service.ingest_problem(problem_data.text, user_id)
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    return ProblemResponseSchema(content_id=problem.content_id, size=problem.size, stored_size=problem.stored_size, created=created)
+
+@router.head("/{content_id}", response_model=None, status_code=status.HTTP_200_OK, dependencies=[requires(Permission.READ_PROBLEMS)])
+async def problem_exists(
+    content_id: ContentId,
+    problem_service: Annotated[ProblemService, Depends(get_problem_service)],
+):
+    """200 when the problem is stored, so clients can skip uploading it again, 404 otherwise."""
+    if await problem_service.get_problem(content_id) is None:
+        raise NotFoundException("Problem not found")
+    return Response(status_code=status.HTTP_200_OK, headers={"ETag": f'"{content_id}"'})
+
+@router.get("/{content_id}", response_model=ProblemTextResponseSchema, status_code=status.HTTP_200_OK, dependencies=[requires(Permission.READ_PROBLEMS)])
+async def get_problem(
+    content_id: ContentId,
+    response: Response,
+    problem_service: Annotated[ProblemService, Depends(get_problem_service)],
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    etag = f'"{content_id}"'
+    if etag_matches(if_none_match, etag) and await problem_service.get_problem(content_id) is not None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": IMMUTABLE})
+    text = await problem_service.get_problem_text(content_id)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = IMMUTABLE
+    return ProblemTextResponseSchema(content_id=content_id, text=text)
+
+@router.post("/{content_id}/snapshots", response_model=SnapshotResponseSchema, status_code=status.HTTP_201_CREATED, dependencies=[requires(Permission.WRITE_PROBLEMS)])
+async def add_console_snapshot(
+    content_id: ContentId,
+    snapshot_data: SnapshotCreateRequestSchema,
+    user_id: Annotated[int, Depends(get_current_user_id)],
+    problem_service: Annotated[ProblemService, Depends(get_problem_service)],
+):
+    """Store the user's console output for a problem, as a delta against the problem text."""
+    return await problem_service.add_snapshot(user_id, content_id, snapshot_data.console)
+
+@router.get("/{content_id}/snapshots/latest", response_model=SnapshotTextResponseSchema, status_code=status.HTTP_200_OK, dependencies=[requires(Permission.READ_PROBLEMS)])
+async def get_latest_console_snapshot(
+    content_id: ContentId,
+    user_id: Annotated[int, Depends(get_current_user_id)],
+    problem_service: Annotated[ProblemService, Depends(get_problem_service)],
+):
+    return await problem_service.get_latest_snapshot(user_id, content_id)
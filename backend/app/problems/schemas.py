@@ -0,0 +1,35 @@
+"""Request and response schemas for problem ingest routes."""
+from pydantic import BaseModel, ConfigDict, Field
+
+class ProblemIngestRequestSchema(BaseModel):
+    text: str = Field(min_length=1)
+
+class SnapshotCreateRequestSchema(BaseModel):
+    console: str = Field(min_length=1)
+
+"""
+Response schemas, declared as response_model on the routes like the auth ones.
+"""
+class ProblemResponseSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    content_id: str
+    size: int
+    stored_size: int
+    created: bool = False
+
+class ProblemTextResponseSchema(BaseModel):
+    content_id: str
+    text: str
+
+class SnapshotResponseSchema(BaseModel):
+    id: int
+    content_id: str
+    size: int
+    delta_size: int
+
+class SnapshotTextResponseSchema(BaseModel):
+    id: int
+    content_id: str
+    console: str
+    created_at: int
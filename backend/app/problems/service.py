@@ -0,0 +1,123 @@
+"""Service layer for content-addressed problem ingest and console snapshots."""
+import time
+import hashlib
+
+from starlette.concurrency import run_in_threadpool
+
+from app.auth.cache import UserCache
+from app.config.settings import settings
+from app.problems.compression import get_codec
+from app.problems.container import ProblemContainer, get_problem_container
+from app.problems.problem import ProblemRecord
+from app.problems.repository import ProblemRepository
+from app.utils.exceptions import NotFoundException, PayloadTooLargeException
+
+
+def content_id_of(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ProblemService:
+    """
+    Thousands of users send the same problem text, so problems are stored once
+    under the SHA-256 of their UTF-8 text. A known problem is answered from the
+    records cache or one primary-key lookup, and is never compressed again.
+    """
+
+    def __init__(self, db, container: ProblemContainer | None = None, user_cache: UserCache | None = None):
+        container = container or get_problem_container()
+        self.problemRepository = ProblemRepository(db, user_cache)
+        self.blob_store = container.blob_store
+        self.records = container.records
+        self.texts = container.texts
+
+    async def ingest_problem(self, text: str, user_id: int | None = None) -> tuple[ProblemRecord, bool]:
+        """
+        Store the problem unless it is known. Returns its record and whether
+        this call stored it. ``user_id`` is who uploaded it, for read-your-writes.
+        """
+        data = self._encode(text)
+        content_id = content_id_of(data)
+        record = await self.get_problem(content_id)
+        if record is not None:
+            return record, False
+
+        codec = get_codec()
+        compressed = await run_in_threadpool(codec.compress, data)
+        record = ProblemRecord(
+            content_id=content_id,
+            size=len(data),
+            stored_size=len(compressed),
+            codec=codec.name,
+            created_at=int(time.time()),
+        )
+        # The blob goes first, so a row never points at a missing blob
+        if self.blob_store is not None:
+            await run_in_threadpool(self.blob_store.put, content_id, compressed)
+        created = await self.problemRepository.create_problem(record, None if self.blob_store is not None else compressed, user_id)
+        if not created:
+            # Stored by a concurrent request in the meantime
+            record = await self.problemRepository.get_problem(content_id)
+        self.records.set(content_id, record)
+        self.texts.set(content_id, data)
+        return record, created
+
+    async def get_problem(self, content_id: str) -> ProblemRecord | None:
+        record = self.records.get(content_id)
+        if record is None:
+            record = await self.problemRepository.get_problem(content_id)
+            if record is not None:
+                self.records.set(content_id, record)
+        return record
+
+    async def get_problem_text(self, content_id: str) -> str:
+        return (await self._problem_bytes(content_id)).decode()
+
+    async def add_snapshot(self, user_id: int, content_id: str, console: str) -> dict:
+        """Store the console text as a delta against its problem."""
+        data = self._encode(console)
+        problem = await self._problem_bytes(content_id)
+        codec = get_codec()
+        delta = await run_in_threadpool(codec.compress, data, problem)
+        snapshot_id = await self.problemRepository.create_snapshot(
+            user_id, content_id, size=len(data), delta=delta, codec=codec.name, created_at=int(time.time()),
+        )
+        return {"id": snapshot_id, "content_id": content_id, "size": len(data), "delta_size": len(delta)}
+
+    async def get_latest_snapshot(self, user_id: int, content_id: str) -> dict:
+        snapshot = await self.problemRepository.get_latest_snapshot(user_id, content_id)
+        if snapshot is None:
+            raise NotFoundException("No console snapshot for this problem")
+        problem = await self._problem_bytes(content_id)
+        console = await run_in_threadpool(get_codec(snapshot.codec).decompress, snapshot.delta, problem)
+        return {"id": snapshot.id, "content_id": content_id, "console": console.decode(), "created_at": snapshot.created_at}
+
+    """
+    Helper Functions
+    """
+    def _encode(self, text: str) -> bytes:
+        data = text.encode()
+        if len(data) > settings.problem_max_bytes:
+            raise PayloadTooLargeException(f"Text is larger than {settings.problem_max_bytes} bytes")
+        return data
+
+    async def _problem_bytes(self, content_id: str) -> bytes:
+        """The decompressed problem text, cached since it can never change."""
+        data = self.texts.get(content_id)
+        if data is not None:
+            return data
+
+        record = await self.get_problem(content_id)
+        if record is None:
+            raise NotFoundException("Problem not found")
+        compressed = None
+        if self.blob_store is not None:
+            compressed = await run_in_threadpool(self.blob_store.get, content_id)
+        if compressed is None:
+            # Also covers problems stored in the table before PROBLEM_STORAGE changed
+            compressed = await self.problemRepository.get_problem_data(content_id)
+        if compressed is None:
+            raise NotFoundException("Problem content is missing from storage")
+        data = await run_in_threadpool(get_codec(record.codec).decompress, compressed)
+        self.texts.set(content_id, data)
+        return data
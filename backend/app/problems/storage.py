@@ -0,0 +1,92 @@
+"""Blob stores for compressed problem texts kept outside the database."""
+import os
+import tempfile
+
+from app.config.settings import settings
+
+
+class BlobStore:
+    """
+    Write-once storage keyed by content id. Keys name their content, so a put
+    racing another put of the same key writes the same bytes and either may win.
+    Calls block, the service runs them in the thread pool.
+    """
+
+    def put(self, key: str, data: bytes):
+        raise NotImplementedError
+
+    def get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Files under a directory, fanned out by the first two characters of the key.
+    Stands in for the bucket in development and tests.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written aside and renamed, so readers never see a partial blob
+        fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+
+class GCSBlobStore(BlobStore):
+    """Objects in a Cloud Storage bucket, named problems/<content id>."""
+
+    def __init__(self, bucket: str, prefix: str = "problems/"):
+        from google.cloud import storage
+
+        self.bucket = storage.Client().bucket(bucket)
+        self.prefix = prefix
+
+    def put(self, key: str, data: bytes):
+        from google.api_core.exceptions import PreconditionFailed
+
+        try:
+            # if_generation_match=0 only creates, an existing object is left alone
+            self.bucket.blob(self.prefix + key).upload_from_string(data, if_generation_match=0)
+        except PreconditionFailed:
+            pass
+
+    def get(self, key: str) -> bytes | None:
+        from google.api_core.exceptions import NotFound
+
+        try:
+            return self.bucket.blob(self.prefix + key).download_as_bytes()
+        except NotFound:
+            return None
+
+
+def create_blob_store() -> BlobStore | None:
+    """Build the store selected by settings; None keeps blobs in the problems table."""
+    if settings.problem_storage == "local":
+        return LocalBlobStore(settings.problem_storage_dir)
+    if settings.problem_storage == "gcs":
+        if not settings.problem_storage_bucket:
+            raise RuntimeError("PROBLEM_STORAGE=gcs requires PROBLEM_STORAGE_BUCKET")
+        return GCSBlobStore(settings.problem_storage_bucket)
+    return None
@@ -0,0 +1,126 @@
+"""
+Bulk-load synthetic users into the configured database:
+
+    python -m app.seed --users 1000000 --workers 8
+
+Rows are generated in batches on worker processes and loaded by the main
+process, through COPY on Postgres and multi-row INSERTs elsewhere, one
+transaction per batch. Run `python -m app.migrate` first; the seeder does not
+create tables.
+
+Seed user N is named seed_0000000N with password seed-password-(N mod
+--passwords), so load tests can log in as any of them. The pooled passwords
+are hashed once with the configured Argon2 profile and can be kept in a
+--hash-cache file between runs. --unique-passwords hashes every user instead,
+which is realistic but costs one Argon2 hash per row.
+
+Usernames are unique, so a rerun over existing rows fails; continue with
+--start past the last seeded index or use another --prefix.
+"""
+import os
+import time
+import logging
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from app.auth.hashing import resolve_profile
+from app.config.database import get_engine
+from app.seed.users import HashCache, copy_payload, generate_rows, load_copy, load_insert, supports_copy
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-load synthetic users")
+    parser.add_argument("--users", type=int, required=True, help="Number of users to create")
+    parser.add_argument("--start", type=int, default=0, help="Index of the first user")
+    parser.add_argument("--prefix", default="seed_", help="Username prefix")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Rows per batch and per transaction")
+    parser.add_argument("--workers", type=int, default=None, help="Generating processes, defaults to the CPU count")
+    parser.add_argument("--passwords", type=int, default=16, help="Distinct passwords shared by the seed users")
+    parser.add_argument("--unique-passwords", action="store_true", help="Hash a password of its own for every user")
+    parser.add_argument("--hash-cache", help="JSON file keeping the pooled password hashes between runs")
+    args = parser.parse_args(argv)
+    if len(f"{args.prefix}{args.start + args.users:08d}") > 30:
+        parser.error("usernames would exceed 30 characters, use a shorter --prefix")
+    return args
+
+
+def build_batch(start: int, count: int, prefix: str, hashes, profile, copy: bool):
+    """Runs on a worker process: the batch ready for loading, as COPY text or as rows."""
+    rows = generate_rows(start, count, prefix, hashes, profile)
+    return copy_payload(rows) if copy else list(rows)
+
+
+class Progress:
+    """Logs rows loaded, throughput and ETA at most every ``interval`` seconds."""
+
+    def __init__(self, total: int, interval: float = 2.0):
+        self.total = total
+        self.interval = interval
+        self.loaded = 0
+        self.started_at = time.perf_counter()
+        self._logged_at = self.started_at
+
+    def advance(self, rows: int):
+        self.loaded += rows
+        now = time.perf_counter()
+        if now - self._logged_at >= self.interval or self.loaded == self.total:
+            self._logged_at = now
+            rate = self.loaded / (now - self.started_at)
+            eta = (self.total - self.loaded) / rate if rate else 0.0
+            logger.info(f"{self.loaded}/{self.total} users ({self.loaded / self.total:.0%}), {rate:,.0f} rows/s, ETA {eta:.0f}s")
+
+
+def seed_users(args) -> float:
+    """Load the users and return the rows per second achieved."""
+    profile = resolve_profile()
+    engine = get_engine()
+    with engine.connect() as connection:
+        copy = supports_copy(connection)
+    logger.info(f"Seeding {args.users} users with {'COPY' if copy else 'multi-row INSERT'} on {engine.dialect.name}")
+
+    workers = args.workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        hashes = None
+        if not args.unique_passwords:
+            hashes = HashCache(profile, args.hash_cache).hashes(args.passwords, executor.map)
+
+        progress = Progress(args.users)
+        batches = iter(range(args.start, args.start + args.users, args.batch_size))
+        end = args.start + args.users
+
+        def submit(start):
+            count = min(args.batch_size, end - start)
+            return count, executor.submit(build_batch, start, count, args.prefix, hashes, profile, copy)
+
+        # A bounded window of batches in flight keeps memory flat when the database is the bottleneck
+        window = deque(submit(start) for _, start in zip(range(2 * workers), batches))
+        while window:
+            count, future = window.popleft()
+            batch = future.result()
+            with engine.begin() as connection:
+                if copy:
+                    load_copy(connection, batch)
+                else:
+                    load_insert(connection, batch)
+            progress.advance(count)
+            next_start = next(batches, None)
+            if next_start is not None:
+                window.append(submit(next_start))
+
+    return progress.loaded / (time.perf_counter() - progress.started_at)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        seed_users(args)
+    finally:
+        get_engine().dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    main()
@@ -0,0 +1,124 @@
+"""Generate synthetic users in batches and bulk-load them into the users table."""
+import io
+import os
+import json
+from functools import lru_cache
+from itertools import chain
+
+from app.auth.hashing import Argon2Profile
+from app.auth.user import User
+
+COLUMNS = ("username", "email", "password", "is_active", "role")
+
+# SQLite caps bound parameters per statement at 32766, so multi-row INSERTs stay well below it
+INSERT_ROWS_PER_STATEMENT = 1000
+
+
+def seed_username(prefix: str, index: int) -> str:
+    return f"{prefix}{index:08d}"
+
+
+def seed_password(index: int, distinct_passwords: int | None) -> str:
+    """
+    The plaintext of seed user ``index``, so load tests can log in as any of
+    them. With ``distinct_passwords`` users share a small pool of passwords,
+    otherwise every user has their own.
+    """
+    if distinct_passwords:
+        index %= distinct_passwords
+    return f"seed-password-{index}"
+
+
+class HashCache:
+    """
+    Argon2 hashes of the shared seed passwords, optionally kept in a JSON file.
+    Hashes are keyed by the profile that made them, so changing the cost
+    parameters rehashes instead of seeding users with stale hashes.
+    """
+
+    def __init__(self, profile: Argon2Profile, path: str | None = None):
+        self.profile = profile
+        self.path = path
+        self._key = f"{profile.memory_cost}:{profile.time_cost}:{profile.parallelism}"
+        self._stored: dict[str, dict[str, str]] = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self._stored = json.load(f)
+
+    def hashes(self, distinct_passwords: int, map_fn=map) -> list[str]:
+        """Hash of every pooled password by pool index. ``map_fn`` may spread missing hashes over processes."""
+        cached = self._stored.setdefault(self._key, {})
+        passwords = [seed_password(index, distinct_passwords) for index in range(distinct_passwords)]
+        missing = [password for password in passwords if password not in cached]
+        if missing:
+            cached.update(zip(missing, map_fn(_hash_with_profile, [self.profile] * len(missing), missing)))
+            if self.path:
+                with open(self.path, "w") as f:
+                    json.dump(self._stored, f)
+        return [cached[password] for password in passwords]
+
+
+def _hash_with_profile(profile: Argon2Profile, password: str) -> str:
+    return profile.password_hash().hash(password)
+
+
+def generate_rows(start: int, count: int, prefix: str, hashes: list[str] | None, profile: Argon2Profile | None = None):
+    """
+    Rows ``start`` .. ``start + count`` in COLUMNS order. Passwords come from
+    the precomputed ``hashes`` by pool index, or, without them, are hashed
+    one by one with ``profile``.
+    """
+    password_hash = profile.password_hash() if hashes is None else None
+    for index in range(start, start + count):
+        username = seed_username(prefix, index)
+        if hashes is not None:
+            hashed = hashes[index % len(hashes)]
+        else:
+            hashed = password_hash.hash(seed_password(index, None))
+        yield username, f"{username}@example.com", hashed, True, "user"
+
+
+def copy_payload(rows) -> bytes:
+    """
+    Rows in COPY's text format. Generated values never contain tabs, newlines
+    or backslashes, so nothing needs escaping.
+    """
+    buffer = io.StringIO()
+    for username, email, hashed, is_active, role in rows:
+        buffer.write(f"{username}\t{email}\t{hashed}\t{'t' if is_active else 'f'}\t{role}\n")
+    return buffer.getvalue().encode()
+
+
+def supports_copy(connection) -> bool:
+    return connection.dialect.name == "postgresql" and connection.dialect.driver in ("psycopg2", "pg8000")
+
+
+def load_copy(connection, payload: bytes):
+    """Stream one batch through COPY FROM STDIN on the raw DBAPI connection."""
+    statement = f"COPY {User.__tablename__} ({', '.join(COLUMNS)}) FROM STDIN"
+    cursor = connection.connection.cursor()
+    try:
+        if connection.dialect.driver == "psycopg2":
+            cursor.copy_expert(statement, io.BytesIO(payload))
+        else:
+            cursor.execute(statement, stream=io.BytesIO(payload))
+    finally:
+        cursor.close()
+
+
+@lru_cache(maxsize=8)
+def _insert_statement(paramstyle: str, rows: int) -> str:
+    # Written out directly: compiling insert().values() of a thousand rows costs more than executing it
+    marker = "?" if paramstyle == "qmark" else "%s"
+    values = f"({', '.join([marker] * len(COLUMNS))})"
+    return f"INSERT INTO {User.__tablename__} ({', '.join(COLUMNS)}) VALUES {', '.join([values] * rows)}"
+
+
+def load_insert(connection, rows: list[tuple]):
+    """Multi-row INSERT ... VALUES fallback for SQLite and drivers without COPY."""
+    paramstyle = connection.dialect.paramstyle
+    if paramstyle not in ("qmark", "format", "pyformat"):
+        raise ValueError(f"Seeding does not support the {paramstyle} parameter style of {connection.dialect.driver}")
+    for offset in range(0, len(rows), INSERT_ROWS_PER_STATEMENT):
+        chunk = rows[offset:offset + INSERT_ROWS_PER_STATEMENT]
+        connection.exec_driver_sql(_insert_statement(paramstyle, len(chunk)), tuple(chain.from_iterable(chunk)))
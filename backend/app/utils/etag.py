@@ -0,0 +1,19 @@
+"""Entity tags and If-None-Match handling for conditional GETs."""
+
+
+def version_etag(kind: str, id, version: int) -> str:
+    """Strong ETag of a versioned row, e.g. ``"user-42-v3"``."""
+    return f'"{kind}-{id}-v{version}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Whether an If-None-Match header lists ``etag``. As RFC 9110 requires for
+    this header the comparison is weak, so a W/ prefix added by a proxy still
+    matches.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
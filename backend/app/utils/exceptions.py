@@ -14,4 +14,16 @@ class NotFoundException(HTTPException):
         
 class AlreadyExistsException(HTTPException):
     def __init__(self, detail: str = "Resource Already Exists"):
-        super().__init__(status_code=409, detail=detail)
\ No newline at end of file
+        super().__init__(status_code=409, detail=detail)
+        
+class PayloadTooLargeException(HTTPException):
+    def __init__(self, detail: str = "Payload Too Large"):
+        super().__init__(status_code=413, detail=detail)
+        
+class TooManyRequestsException(HTTPException):
+    def __init__(self, detail: str = "Too Many Requests", retry_after: int = 1):
+        super().__init__(status_code=429, detail=detail, headers={"Retry-After": str(retry_after)})
+        
+class ServiceUnavailableException(HTTPException):
+    def __init__(self, detail: str = "Service Unavailable", retry_after: int = 1):
+        super().__init__(status_code=503, detail=detail, headers={"Retry-After": str(retry_after)})
\ No newline at end of file
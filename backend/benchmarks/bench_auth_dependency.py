@@ -0,0 +1,87 @@
+"""
+Compare per-request AuthService construction before and after the shared
+AuthContainer, both in isolation and end-to-end through /users/me.
+"""
+import time
+import tracemalloc
+
+from fastapi import FastAPI
+from fastapi.security import OAuth2PasswordBearer
+from fastapi.testclient import TestClient
+from pwdlib import PasswordHash
+
+from app.auth.dependency import get_auth_service, get_current_user_id, get_routed_db
+from app.auth.repository import AuthRepository
+from app.auth.router import router as auth_router
+from app.auth.service import AuthService
+
+ITERATIONS = 2000
+
+
+class StubRow:
+    _mapping = {"id": 1, "username": "bench", "email": "bench@example.com", "is_active": True, "role": "user"}
+
+
+class StubResult:
+    def first(self):
+        return StubRow()
+
+
+class StubSession:
+    """Answers every query with the same user, so only the framework cost is measured."""
+
+    async def execute(self, statement):
+        return StubResult()
+
+
+def legacy_auth_service(db):
+    """Reproduces the per-request construction this benchmark replaced."""
+    service = AuthService.__new__(AuthService)
+    service.authRepository = AuthRepository(db)
+    service.password_hash = PasswordHash.recommended()
+    service.oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+    service.token_codec = get_auth_service(db).token_codec
+    return service
+
+
+def measure_construction(factory):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        factory(None)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    kept = [factory(None) for _ in range(100)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return elapsed / ITERATIONS * 1e6, (after - before) / 100
+
+
+def measure_me_endpoint(factory):
+    app = FastAPI()
+    app.include_router(auth_router)
+    app.dependency_overrides[get_routed_db] = lambda: StubSession()
+    app.dependency_overrides[get_current_user_id] = lambda: 1
+    app.dependency_overrides[get_auth_service] = lambda: factory(StubSession())
+
+    with TestClient(app) as client:
+        for _ in range(100):
+            client.get("/users/me")
+        start = time.perf_counter()
+        for _ in range(ITERATIONS):
+            client.get("/users/me")
+        return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+def main():
+    print(f"{'variant':<12}{'construct us':>14}{'bytes/request':>16}{'/users/me us':>15}")
+    for name, factory in (("legacy", legacy_auth_service), ("container", get_auth_service)):
+        construct_us, allocated = measure_construction(factory)
+        me_us = measure_me_endpoint(factory)
+        print(f"{name:<12}{construct_us:>14.2f}{allocated:>16.0f}{me_us:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Bursts of concurrent lookups of the same user, each on its own session as
+separate requests would be, with and without single-flight coalescing. The
+user cache is left out so every burst is a cold miss.
+
+    python -m benchmarks.bench_coalescing
+    python -m benchmarks.bench_coalescing --database-url postgresql+asyncpg://postgres@localhost/algosensei
+"""
+import time
+import asyncio
+import argparse
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.auth.repository import AuthRepository
+from app.auth.singleflight import SingleFlight
+from app.auth.user import User
+from app.config.database import Base
+
+USERS = 200
+BURST = 8
+
+
+async def run_bursts(engine, flights: SingleFlight | None, user_ids: list[int]) -> tuple[float, int]:
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    queries = 0
+
+    def count(*args):
+        nonlocal queries
+        queries += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    start = time.perf_counter()
+    for user_id in user_ids:
+        sessions = [sessionmaker() for _ in range(BURST)]
+        await asyncio.gather(*(AuthRepository(session, flights=flights).get_user_by_id(user_id) for session in sessions))
+        for session in sessions:
+            await session.close()
+    elapsed = time.perf_counter() - start
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+    return elapsed, queries
+
+
+async def main(database_url: str):
+    engine = create_async_engine(database_url)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        result = await connection.execute(
+            insert(User).returning(User.id),
+            [{"username": f"bench_sf_{i}", "email": f"bench_sf_{i}@example.com", "password": "x"} for i in range(USERS)],
+        )
+        user_ids = list(result.scalars())
+    try:
+        print(f"{USERS} bursts of {BURST} concurrent lookups of one user")
+        for _ in range(2):
+            for label, flights in (("per-request queries", None), ("single-flight", SingleFlight(timeout=5))):
+                elapsed, queries = await run_bursts(engine, flights, user_ids)
+                print(f"{label:<22} {queries:6} queries  {elapsed / USERS * 1000:7.2f} ms/burst")
+    finally:
+        async with engine.begin() as connection:
+            await connection.execute(User.__table__.delete().where(User.id.in_(user_ids)))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Single-flight user lookups")
+    parser.add_argument("--database-url", default="sqlite+aiosqlite://")
+    asyncio.run(main(parser.parse_args().database_url))
@@ -0,0 +1,89 @@
+"""
+Connection establishment latency per database backend: a new connection plus
+SELECT 1 (pool disposed before each attempt), against a pooled checkout plus
+SELECT 1 for reference. Backends run with the database settings from the
+environment / .env; the connector backend is skipped without an
+INSTANCE_CONNECTION_NAME.
+
+    DB_HOST=127.0.0.1 DB_USER=postgres DB_NAME=algosensei DB_SOCKET_DIR=/var/run/postgresql \\
+        python -m benchmarks.bench_connect --backends dsn unix_socket
+"""
+import time
+import asyncio
+import argparse
+import statistics
+
+from sqlalchemy import text
+
+from app.config import database
+from app.config.settings import settings
+
+ATTEMPTS = 30
+
+
+def summarize(samples: list[float]) -> str:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, round(0.95 * len(samples)))]
+    return f"median {statistics.median(samples) * 1000:7.2f} ms  p95 {p95 * 1000:7.2f} ms"
+
+
+async def measure_async(attempts: int) -> tuple[list[float], list[float]]:
+    engine = database.get_async_engine()
+    fresh, pooled = [], []
+    for _ in range(attempts):
+        await engine.dispose()
+        start = time.perf_counter()
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        fresh.append(time.perf_counter() - start)
+    for _ in range(attempts):
+        start = time.perf_counter()
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        pooled.append(time.perf_counter() - start)
+    return fresh, pooled
+
+
+def measure_sync(attempts: int) -> tuple[list[float], list[float]]:
+    engine = database.get_engine()
+    fresh, pooled = [], []
+    for _ in range(attempts):
+        engine.dispose()
+        start = time.perf_counter()
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        fresh.append(time.perf_counter() - start)
+    for _ in range(attempts):
+        start = time.perf_counter()
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        pooled.append(time.perf_counter() - start)
+    return fresh, pooled
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Connection establishment latency per backend")
+    parser.add_argument("--backends", nargs="+", choices=database.BACKENDS, default=list(database.BACKENDS))
+    parser.add_argument("--attempts", type=int, default=ATTEMPTS)
+    args = parser.parse_args()
+
+    settings.database_url = None
+    for backend in args.backends:
+        if backend == "connector" and not settings.instance_connection_name:
+            print(f"{backend:<12} skipped, INSTANCE_CONNECTION_NAME is not set")
+            continue
+        settings.db_backend = backend
+        try:
+            async_fresh, async_pooled = await measure_async(args.attempts)
+            sync_fresh, sync_pooled = await asyncio.to_thread(measure_sync, args.attempts)
+        except Exception as e:
+            print(f"{backend:<12} failed: {e}")
+            continue
+        finally:
+            await database.dispose_engines()
+        print(f"{backend:<12} async new connection  {summarize(async_fresh)}   pooled {summarize(async_pooled)}")
+        print(f"{'':<12} sync  new connection  {summarize(sync_fresh)}   pooled {summarize(sync_pooled)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""
+Concurrent hint streams through EventStreamResponse with the stub generator.
+Half of the clients disconnect after the first chunk. Prints time to first
+chunk and total time kept apart, how long a disconnect takes to close its
+generator, and how many chunks were generated after a client left.
+
+    python -m benchmarks.bench_hint_stream
+    python -m benchmarks.bench_hint_stream --streams 1000 --chunk-delay-ms 5
+"""
+import time
+import asyncio
+import argparse
+
+from app.hints.generator import HintRequest, StubHintGenerator
+from app.hints.stream import EventStreamResponse, HintMetrics, HintStream
+from benchmarks.load_test import percentile
+
+PROBLEM = "Two Sum: given an array of integers nums and an integer target, return indices of the two numbers such that they add up to target."
+
+
+class CountingGenerator(StubHintGenerator):
+    def __init__(self, chunk_delay: float):
+        super().__init__(chunk_delay=chunk_delay)
+        self.generated = 0
+        self.closed_at: dict[int, float] = {}
+
+    async def stream(self, request: HintRequest):
+        try:
+            async for chunk in super().stream(request):
+                self.generated += 1
+                yield chunk
+        finally:
+            self.closed_at[id(request)] = time.perf_counter()
+
+
+async def client(generator: CountingGenerator, metrics: HintMetrics, disconnect: bool) -> tuple[float, float, float | None, int]:
+    request = HintRequest(problem=PROBLEM, level=3)
+    start = time.perf_counter()
+    stream = HintStream(generator, request, metrics, lambda: None, max_seconds=60, started=start)
+    response = EventStreamResponse(stream.events(), on_close=stream.close)
+    first = None
+    left = asyncio.Event()
+    generated_when_left = 0
+
+    async def receive():
+        await left.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal first, generated_when_left
+        if message.get("body") and first is None:
+            first = time.perf_counter() - start
+            if disconnect:
+                generated_when_left = generator.generated
+                left.set()
+
+    await response({"type": "http"}, receive, send)
+    total = time.perf_counter() - start
+    close_delay = generator.closed_at[id(request)] - (start + first) if disconnect else None
+    return first, total, close_delay, generator.generated - generated_when_left if disconnect else 0
+
+
+async def main(streams: int, chunk_delay: float):
+    metrics = HintMetrics()
+    results = []
+    # One generator per client, so "generated after leaving" counts only its own chunks
+    for batch in range(0, streams, 100):
+        results += await asyncio.gather(*(
+            client(CountingGenerator(chunk_delay), metrics, disconnect=i % 2 == 0) for i in range(batch, min(batch + 100, streams))
+        ))
+
+    finished = [r for i, r in enumerate(results) if i % 2]
+    left = [r for i, r in enumerate(results) if i % 2 == 0]
+    ttfb = sorted(r[0] for r in results)
+    total = sorted(r[1] for r in finished)
+    close = sorted(r[2] for r in left)
+    print(f"streams: {streams} ({len(left)} disconnect after the first chunk), chunk delay {chunk_delay * 1000:.0f} ms")
+    print(f"time to first chunk    p50 {percentile(ttfb, 50) * 1000:7.1f} ms   p99 {percentile(ttfb, 99) * 1000:7.1f} ms")
+    print(f"total, completed       p50 {percentile(total, 50) * 1000:7.1f} ms   p99 {percentile(total, 99) * 1000:7.1f} ms")
+    print(f"disconnect to close    p50 {percentile(close, 50) * 1000:7.1f} ms   p99 {percentile(close, 99) * 1000:7.1f} ms")
+    print(f"chunks generated after a disconnect: {sum(r[3] for r in left)}")
+    print(f"metrics: {metrics.snapshot()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hint streaming")
+    parser.add_argument("--streams", type=int, default=400)
+    parser.add_argument("--chunk-delay-ms", type=float, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.streams, args.chunk_delay_ms / 1000))
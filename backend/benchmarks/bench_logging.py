@@ -0,0 +1,68 @@
+"""
+Time an access log call spends on the calling thread: a JSON StreamHandler
+written inline against the same handler behind QueuedLogging. The second stream
+stalls for 2 ms every 64 writes, like stdout piped to a collector that is
+falling behind.
+"""
+import logging
+import os
+import time
+
+from app.config.log import JsonFormatter, QueuedLogging
+
+RECORDS = 50000
+
+
+def burst(logger: logging.Logger) -> float:
+    start = time.perf_counter()
+    for i in range(RECORDS):
+        logger.info(
+            "%s - %s %s - %s - %.4fs", "127.0.0.1", "GET", "/users/me", 200, 0.0012,
+            extra={"client": "127.0.0.1", "method": "GET", "path": "/users/me", "status_code": 200, "duration": 0.0012},
+        )
+    return (time.perf_counter() - start) / RECORDS * 1e6
+
+
+class StallingStream:
+    def __init__(self, stream):
+        self.stream = stream
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        if self.writes % 64 == 0:
+            time.sleep(0.002)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def compare(label: str, stream):
+    logger = logging.getLogger("bench.access")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    logger.handlers = [handler]
+
+    inline = burst(logger)
+
+    queued = QueuedLogging(max_size=RECORDS)
+    queued.start()
+    per_call = burst(logger)
+    start = time.perf_counter()
+    queued.stop()
+    drain = time.perf_counter() - start
+    print(f"{label:<16} inline {inline:6.2f} us/call   queued {per_call:6.2f} us/call "
+          f"(drained {drain * 1000:.0f} ms after the burst, dropped {queued.dropped})")
+
+
+def main():
+    with open(os.devnull, "w") as devnull:
+        compare("devnull", devnull)
+        compare("stalling pipe", StallingStream(devnull))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Requests/sec on /health through the BaseHTTPMiddleware stack this replaced
+versus the pure ASGI AuthenticationMiddleware and ProcessTimeMiddleware.
+Requests are driven straight through the ASGI interface, so no network or
+client overhead is included.
+"""
+import time
+import asyncio
+
+import jwt
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.auth.container import get_container
+from app.config.settings import settings
+from app.middlewares.authentication import AuthenticationMiddleware
+from app.middlewares.timing import ProcessTimeMiddleware
+
+REQUESTS = 20000
+
+
+class LegacyAuthenticationMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        auth_header = request.headers.get("Authorization")
+        if auth_header and auth_header.startswith("Bearer "):
+            token = auth_header.replace("Bearer ", "")
+            try:
+                payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+                request.state.user_id = int(payload.get("sub"))
+            except Exception:
+                request.state.user_id = None
+        else:
+            request.state.user_id = None
+        return await call_next(request)
+
+
+async def legacy_process_time(request: Request, call_next):
+    start_time = time.perf_counter()
+    response = await call_next(request)
+    response.headers["X-Process-Time"] = str(time.perf_counter() - start_time)
+    return response
+
+
+def build_app(legacy: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    if legacy:
+        app.add_middleware(LegacyAuthenticationMiddleware)
+        app.add_middleware(BaseHTTPMiddleware, dispatch=legacy_process_time)
+    else:
+        app.add_middleware(AuthenticationMiddleware)
+        app.add_middleware(ProcessTimeMiddleware)
+    return app
+
+
+async def drive(app: FastAPI, headers: list) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/health", "raw_path": b"/health",
+        "root_path": "", "query_string": b"", "headers": headers,
+        "client": ("127.0.0.1", 1234), "server": ("test", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(500):
+        await app(dict(scope, state={}), receive, send)
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await app(dict(scope, state={}), receive, send)
+    return REQUESTS / (time.perf_counter() - start)
+
+
+def main():
+    token = get_container().token_codec.encode({"sub": "1"})
+    cases = (("anonymous", []), ("bearer", [(b"authorization", f"Bearer {token}".encode())]))
+    print(f"{'stack':<10}{'request':<12}{'req/s':>10}")
+    for name, headers in cases:
+        for legacy in (True, False):
+            rps = asyncio.run(drive(build_app(legacy), headers))
+            print(f"{'legacy' if legacy else 'asgi':<10}{name:<12}{rps:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Problem ingest: storing distinct problems, re-sending known ones (the common
+case, thousands of users on the same problem) and console snapshots stored
+as deltas. Prints per-call latency and bytes stored per byte received.
+
+    python -m benchmarks.bench_problem_ingest
+    python -m benchmarks.bench_problem_ingest --database-url postgresql+asyncpg://postgres@localhost/algosensei
+"""
+import time
+import random
+import asyncio
+import argparse
+
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.config.database import Base
+from app.problems.container import ProblemContainer
+from app.problems.problem import Problem
+from app.problems.service import ProblemService
+import app.auth.user  # noqa: F401  The snapshot table references users
+
+PROBLEMS = 200
+REPEATS = 2000
+
+WORDS = (
+    "given array integer nums target return indices two numbers such that they add up you may assume each input "
+    "would have exactly one solution and not use same element twice answer any order example constraints"
+).split()
+
+
+def problem_text(rng: random.Random) -> str:
+    """About 3 KB of description, examples and starter code, the size getProblem() sends."""
+    description = " ".join(rng.choice(WORDS) for _ in range(350))
+    examples = "\n".join(f"Example {i}: Input: nums = {rng.sample(range(100), 6)}, target = {rng.randrange(200)}" for i in range(3))
+    code = "class Solution:\n    def twoSum(self, nums: List[int], target: int) -> List[int]:\n        "
+    return f"\nHeres the description, examples, and constraints for the problem\n{description}\n{examples}\n--- Function Definition and Current Code ---\n{code}"
+
+
+async def timed(label: str, count: int, fn):
+    start = time.perf_counter()
+    for i in range(count):
+        await fn(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed / count * 1e6:8.0f} us/call")
+
+
+async def main(database_url: str):
+    engine = create_async_engine(database_url)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(text("INSERT INTO users (id, username, email, password, is_active, role, version) VALUES (-1, 'bench_problems', 'bench_problems@example.com', 'x', true, 'user', 1)"))
+    session = async_sessionmaker(engine, expire_on_commit=False)()
+    rng = random.Random(1)
+    texts = [problem_text(rng) for _ in range(PROBLEMS)]
+    records = []
+    try:
+        service = ProblemService(session, ProblemContainer(blob_store=None))
+
+        async def ingest_new(i):
+            records.append((await service.ingest_problem(texts[i]))[0])
+
+        await timed("ingest new problem", PROBLEMS, ingest_new)
+        await timed("ingest known problem (cached)", REPEATS, lambda i: service.ingest_problem(texts[i % PROBLEMS]))
+
+        cold = ProblemService(session, ProblemContainer(blob_store=None))
+        await timed("ingest known problem (cold)", PROBLEMS, lambda i: cold.ingest_problem(texts[i]))
+
+        received = sum(record.size for record in records)
+        stored = sum(record.stored_size for record in records)
+        print(f"problem bytes stored per byte received: {stored / received:.2f} once, {stored / (received * (1 + REPEATS / PROBLEMS)):.3f} with repeats")
+
+        consoles = [texts[i] + f"\n--- Test Cases and Results ---\nnums = {rng.sample(range(100), 4)}\nCurrent Output: [0,0]\nExpected Output: [1,2]" for i in range(PROBLEMS)]
+        deltas = []
+
+        async def snapshot(i):
+            deltas.append((await service.add_snapshot(-1, records[i].content_id, consoles[i]))["delta_size"])
+
+        await timed("console snapshot", PROBLEMS, snapshot)
+        print(f"console bytes stored per byte received: {sum(deltas) / sum(len(c.encode()) for c in consoles):.3f}")
+    finally:
+        await session.rollback()
+        async with engine.begin() as connection:
+            await connection.execute(text("DELETE FROM console_snapshots WHERE user_id = -1"))
+            await connection.execute(delete(Problem).where(Problem.content_id.in_([record.content_id for record in records])))
+            await connection.execute(text("DELETE FROM users WHERE id = -1"))
+        await session.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Problem ingest")
+    parser.add_argument("--database-url", default="sqlite+aiosqlite://")
+    asyncio.run(main(parser.parse_args().database_url))
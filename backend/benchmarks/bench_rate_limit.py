@@ -0,0 +1,57 @@
+"""
+Per-request overhead of RateLimitMiddleware with the in-process bucket store:
+the bare bucket acquire, and a full ASGI request with and without the middleware.
+"""
+import time
+import asyncio
+
+from app.middlewares.rate_limit import LocalBucketStore, RateLimit, RateLimitMiddleware, RateLimitPolicy
+
+REQUESTS = 100000
+CLIENTS = 5000
+
+
+async def endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def drive(app) -> float:
+    scopes = [
+        {"type": "http", "method": "GET", "path": "/users/me", "headers": [],
+         "client": (f"10.0.{i // 256}.{i % 256}", 1234), "state": {"user_id": i}}
+        for i in range(CLIENTS)
+    ]
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for i in range(REQUESTS):
+        await app(scopes[i % CLIENTS], receive, send)
+    return (time.perf_counter() - start) / REQUESTS * 1e6
+
+
+def main():
+    store = LocalBucketStore()
+    limit = RateLimit(rate=1000, burst=1000)
+    keys = [(None, "ip", f"10.0.0.{i}") for i in range(CLIENTS)]
+    start = time.perf_counter()
+    for i in range(REQUESTS):
+        store.acquire(keys[i % CLIENTS], limit)
+    acquire_us = (time.perf_counter() - start) / REQUESTS * 1e6
+
+    generous = RateLimitPolicy(per_ip=RateLimit(1e6, 10**6), per_user=RateLimit(1e6, 10**6))
+    bare_us = asyncio.run(drive(endpoint))
+    limited_us = asyncio.run(drive(RateLimitMiddleware(endpoint, store=LocalBucketStore(), policies={}, default=generous)))
+
+    print(f"bucket acquire:           {acquire_us:.2f} us")
+    print(f"request without limiter:  {bare_us:.2f} us")
+    print(f"request with limiter:     {limited_us:.2f} us (+{limited_us - bare_us:.2f} us, ip + user buckets)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Per-endpoint cost of turning a handler result into a response body: the old
+path (no response_model, jsonable_encoder + JSONResponse) against the declared
+response_model dumped by pydantic-core and rendered with ORJSONResponse.
+"""
+import asyncio
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from app.auth.router import router
+from app.auth.user import UserRecord
+
+ITERATIONS = 20000
+
+USER = UserRecord(id=42, username="sensei", email="sensei@example.com", is_active=True, role="user")
+PAYLOADS = {
+    "/users/me": USER,
+    "/users/login": {"access_token": "eyJhbGciOiJIUzI1NiJ9." + "x" * 180, "token_type": "bearer"},
+    "/users/register": USER,
+    "/users/change-password": USER,
+    "/users/delete": UserRecord(id=42, username="sensei", email="sensei@example.com", is_active=False),
+}
+
+
+async def old_path(route, payload):
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+async def new_path(route, payload):
+    return ORJSONResponse(await serialize_response(field=route.response_field, response_content=payload)).body
+
+
+async def timed(render, route, payload) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await render(route, payload)
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+async def main():
+    routes = {route.path: route for route in router.routes if isinstance(route, APIRoute)}
+    print(f"{'endpoint':<24} {'jsonable_encoder':>17} {'response_model':>15}")
+    for path, payload in PAYLOADS.items():
+        route = routes[path]
+        old = await timed(old_path, route, payload)
+        new = await timed(new_path, route, payload)
+        print(f"{path:<24} {old:>14.2f} us {new:>12.2f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
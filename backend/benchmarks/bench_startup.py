@@ -0,0 +1,88 @@
+"""
+Cold-start cost in fresh interpreters: time to import app.main, and time from
+the start of that import to the first /health response (lifespan included),
+against a temporary SQLite database. Exits 1 when a median exceeds its budget
+or when importing the app pulled in the Cloud SQL connector.
+
+    python -m benchmarks.bench_startup --import-budget-ms 1500 --first-request-budget-ms 2500
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+RUNS = 5
+
+CHILD = """
+import sys, time, json, asyncio
+start = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+import httpx
+
+async def first_request():
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            resp = await client.get("/health")
+            assert resp.status_code == 200, resp.text
+            return time.perf_counter()
+
+answered = asyncio.run(first_request())
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_request_ms": (answered - start) * 1000,
+    "connector_imported": "google.cloud.sql.connector" in sys.modules,
+}))
+"""
+
+
+def child_env(database_url: str) -> dict:
+    env = dict(os.environ)
+    env.pop("GOOGLE_APPLICATION_CREDENTIALS", None)
+    env["DATABASE_URL"] = database_url
+    env.setdefault("SECRET_KEY", "startup-bench-secret-key-with-at-least-32-bytes")
+    return env
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import and time-to-first-request benchmark")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--import-budget-ms", type=float, default=1500.0)
+    parser.add_argument("--first-request-budget-ms", type=float, default=2500.0)
+    args = parser.parse_args(argv)
+
+    database_url = f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='algosensei-startup-')}/startup.db"
+    env = child_env(database_url)
+    # Schema creation is a deploy step, not part of the measured start
+    subprocess.run([sys.executable, "-m", "app.migrate"], env=env, check=True, capture_output=True)
+
+    runs = []
+    for _ in range(args.runs):
+        out = subprocess.run([sys.executable, "-c", CHILD], env=env, check=True, capture_output=True, text=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    import_ms = statistics.median(run["import_ms"] for run in runs)
+    first_request_ms = statistics.median(run["first_request_ms"] for run in runs)
+    print(f"import app.main:       median {import_ms:7.0f} ms  (budget {args.import_budget_ms:.0f} ms)")
+    print(f"first /health answer:  median {first_request_ms:7.0f} ms  (budget {args.first_request_budget_ms:.0f} ms)")
+
+    failures = []
+    if import_ms > args.import_budget_ms:
+        failures.append("import time over budget")
+    if first_request_ms > args.first_request_budget_ms:
+        failures.append("time to first request over budget")
+    if any(run["connector_imported"] for run in runs):
+        failures.append("the Cloud SQL connector was imported without being used")
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Reading users as ORM entities vs projecting the public columns into UserRecord,
+over 100k rows in an in-memory SQLite database.
+"""
+import time
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session, undefer
+
+from app.auth.repository import PUBLIC_COLUMNS
+from app.auth.user import User, UserRecord
+from app.config.database import Base
+
+ROWS = 100000
+PASSWORD = "$argon2id$v=19$m=65536,t=3,p=4$" + "x" * 64
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:8.0f} ms  {elapsed / count * 1e6:6.2f} us/row")
+
+
+def main():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[User.__table__])
+    with Session(engine) as db:
+        db.execute(insert(User), [
+            {"username": f"user{i}", "email": f"user{i}@example.com", "password": PASSWORD}
+            for i in range(ROWS)
+        ])
+        db.commit()
+
+    def entities():
+        # The deferred password is left out here too; this measures the identity map
+        with Session(engine) as db:
+            return len(db.scalars(select(User)).all())
+
+    def entities_with_password():
+        with Session(engine) as db:
+            return len(db.scalars(select(User).options(undefer(User.password))).all())
+
+    def projected():
+        with Session(engine) as db:
+            return len([UserRecord(*row) for row in db.execute(select(*PUBLIC_COLUMNS))])
+
+    for _ in range(2):
+        timed("ORM entities + password", entities_with_password)
+        timed("ORM entities", entities)
+        timed("projected UserRecord", projected)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Load test for the auth API at fixed concurrency.
+
+By default the app is booted in-process against a throwaway SQLite database
+(DATABASE_URL), so no Cloud SQL connector or credentials are involved. Point
+``--database-url`` at a local Postgres (postgresql+asyncpg://...) for numbers
+closer to production, or ``--base-url`` at a running server to load it over
+the network instead.
+
+Each worker owns a slice of pre-registered users and loops over a weighted mix
+of register / login / me / change-password requests. Latencies are written to a
+JSON report; ``--compare`` checks a run against a saved baseline and exits 1
+when a percentile exceeds its budget.
+
+    python -m benchmarks.load_test --output benchmarks/results/baseline.json
+    python -m benchmarks.load_test --compare benchmarks/results/baseline.json
+"""
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import platform
+import tempfile
+from collections import defaultdict
+
+MIX = {"me": 0.65, "login": 0.25, "register": 0.05, "change_password": 0.05}
+PERCENTILES = (50, 95, 99)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of measured load")
+    parser.add_argument("--users", type=int, default=64, help="Users registered before the run")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--base-url", help="Load a running server instead of booting the app in-process")
+    parser.add_argument("--database-url", help="Async SQLAlchemy URL for the in-process app, defaults to a temporary SQLite file")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Baseline report to check this run against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown per percentile, as a fraction of the baseline")
+    args = parser.parse_args(argv)
+    if args.users < args.concurrency:
+        parser.error("--users must be at least --concurrency, every worker needs users of its own")
+    return args
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    # The smallest value with at least p% of the values at or below it
+    rank = max(1, math.ceil(p * len(sorted_values) / 100))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    def record(self, op: str, seconds: float, ok: bool):
+        self.latencies[op].append(seconds)
+        if not ok:
+            self.errors[op] += 1
+
+    def report(self, elapsed: float, args) -> dict:
+        operations = {}
+        everything = []
+        for op, values in sorted(self.latencies.items()):
+            values.sort()
+            everything.extend(values)
+            operations[op] = self.summarize(values, self.errors[op], elapsed)
+        everything.sort()
+        return {
+            "config": {
+                "concurrency": args.concurrency,
+                "duration": args.duration,
+                "users": args.users,
+                "mix": MIX,
+                "target": args.base_url or "in-process",
+                "python": platform.python_version(),
+            },
+            "total": self.summarize(everything, sum(self.errors.values()), elapsed),
+            "operations": operations,
+        }
+
+    @staticmethod
+    def summarize(values: list[float], errors: int, elapsed: float) -> dict:
+        summary = {"requests": len(values), "errors": errors, "throughput": len(values) / elapsed if elapsed else 0.0}
+        for p in PERCENTILES:
+            summary[f"p{p}_ms"] = percentile(values, p) * 1000
+        return summary
+
+
+class User:
+    __slots__ = ("username", "email", "password", "token")
+
+    def __init__(self):
+        name = uuid.uuid4().hex[:12]
+        self.username = f"load_{name}"
+        self.email = f"{name}@example.com"
+        self.password = "load-test-password-1"
+        self.token = None
+
+
+async def register(client, user: User):
+    return await client.post("/users/register", json={"username": user.username, "email": user.email, "password": user.password})
+
+
+async def login(client, user: User):
+    resp = await client.post("/users/login", json={"email": user.email, "password": user.password})
+    if resp.status_code == 200:
+        user.token = resp.json()["access_token"]
+    return resp
+
+
+async def me(client, user: User):
+    return await client.get("/users/me", headers={"Authorization": f"Bearer {user.token}"})
+
+
+async def change_password(client, user: User):
+    new_password = "load-test-password-2" if user.password.endswith("1") else "load-test-password-1"
+    resp = await client.put(
+        "/users/change-password",
+        json={"old_password": user.password, "new_password": new_password},
+        headers={"Authorization": f"Bearer {user.token}"},
+    )
+    if resp.status_code == 200:
+        user.password = new_password
+    return resp
+
+
+async def worker(client, users: list[User], recorder: Recorder, rng: random.Random, deadline: float):
+    ops = list(MIX)
+    weights = list(MIX.values())
+    while time.perf_counter() < deadline:
+        op = rng.choices(ops, weights)[0]
+        user = rng.choice(users)
+        start = time.perf_counter()
+        try:
+            if op == "register":
+                resp = await register(client, User())
+            else:
+                resp = await {"me": me, "login": login, "change_password": change_password}[op](client, user)
+            ok = resp.status_code < 400
+        except Exception:
+            ok = False
+        recorder.record(op, time.perf_counter() - start, ok)
+
+
+async def run_load(client, args) -> dict:
+    users = [User() for _ in range(args.users)]
+    # Registration and login are Argon2-bound; keep setup within the hashing pool
+    setup = asyncio.Semaphore(max(1, os.cpu_count() or 1))
+
+    async def prepare(user: User):
+        async with setup:
+            resp = await register(client, user)
+            if resp.status_code != 201:
+                raise RuntimeError(f"Registering {user.username} failed: {resp.status_code} {resp.text}")
+            await login(client, user)
+
+    await asyncio.gather(*(prepare(user) for user in users))
+
+    rng = random.Random(args.seed)
+    recorder = Recorder()
+    # Workers own disjoint users, so change-password never races a login of the same user
+    slices = [users[i::args.concurrency] for i in range(args.concurrency)]
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(
+        worker(client, slices[i], recorder, random.Random(rng.random()), deadline)
+        for i in range(args.concurrency)
+    ))
+    return recorder.report(time.perf_counter() - start, args)
+
+
+async def run(args) -> dict:
+    import httpx
+
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=30) as client:
+            return await run_load(client, args)
+
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=30) as client:
+            return await run_load(client, args)
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return one line per budget exceeded: a slower percentile or a higher error rate."""
+    failures = []
+    rows = [("total", report["total"], baseline["total"])] + [
+        (op, summary, baseline["operations"][op])
+        for op, summary in report["operations"].items()
+        if op in baseline["operations"]
+    ]
+    print(f"{'operation':<16} {'percentile':>10} {'baseline':>10} {'budget':>10} {'current':>10}")
+    for op, current, base in rows:
+        for p in PERCENTILES:
+            key = f"p{p}_ms"
+            budget = base[key] * (1 + tolerance)
+            exceeded = current[key] > budget
+            print(f"{op:<16} {key:>10} {base[key]:>10.1f} {budget:>10.1f} {current[key]:>10.1f}{'  FAIL' if exceeded else ''}")
+            if exceeded:
+                failures.append(f"{op} {key} {current[key]:.1f} ms > budget {budget:.1f} ms")
+        error_rate = current["errors"] / current["requests"] if current["requests"] else 0.0
+        base_rate = base["errors"] / base["requests"] if base["requests"] else 0.0
+        if error_rate > base_rate + 0.001:
+            failures.append(f"{op} error rate {error_rate:.2%} > baseline {base_rate:.2%}")
+    return failures
+
+
+def print_report(report: dict):
+    print(f"{'operation':<16} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for op, summary in list(report["operations"].items()) + [("total", report["total"])]:
+        print(
+            f"{op:<16} {summary['requests']:>9} {summary['errors']:>7} {summary['throughput']:>9.1f} "
+            f"{summary['p50_ms']:>8.1f} {summary['p95_ms']:>8.1f} {summary['p99_ms']:>8.1f}"
+        )
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if not args.base_url:
+        # Settings are read on import, so the environment is prepared before app is imported
+        database_url = args.database_url or f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='algosensei-load-')}/load.db?timeout=30"
+        os.environ["DATABASE_URL"] = database_url
+        os.environ.setdefault("SECRET_KEY", "load-test-secret-key-with-at-least-32-bytes")
+        os.environ["RATE_LIMIT_ENABLED"] = "false"
+        os.environ["DB_MIGRATE_ON_STARTUP"] = "true"
+
+    report = asyncio.run(run(args))
+    print_report(report)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        failures = compare(report, baseline, args.tolerance)
+        if failures:
+            print("Latency budgets exceeded:\n  " + "\n  ".join(failures))
+            return 1
+        print("Within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,12 +11,18 @@ from fastapi.testclient import TestClient
 import pytest
 
 from app.auth.router import router as auth_router
-from app.auth.dependency import get_auth_service, get_current_user_id
+from app.auth.dependency import get_auth_service, get_current_user_id, get_current_token_claims
+from app.auth.user import UserRecord
 
 
 class FakeAuthService:
+    version = 3
+
     async def get_user_by_id(self, user_id: int):
-        return {"id": user_id, "username": "testuser", "email": "test@example.com"}
+        return UserRecord(id=user_id, username="testuser", email="test@example.com", is_active=True, version=self.version)
+
+    async def get_user_version(self, user_id: int):
+        return self.version
 
     async def login_with_email_and_password(self, user_data):
         # Simulate successful login
@@ -24,16 +30,16 @@ class FakeAuthService:
 
     async def register_user(self, user_data):
         # Simulate successful registration
-        return {"id": 1, "username": user_data.username, "email": user_data.email}
+        return {"id": 1, "username": user_data.username, "email": user_data.email, "is_active": True}
 
-    async def logout_user(self, user_id: int):
+    async def logout_user(self, user_id: int, token_claims: dict):
         return None
 
     async def change_password(self, user_id: int, change_password_data):
-        return {"id": user_id, "username": "testuser"}
+        return {"id": user_id, "username": "testuser", "email": "test@example.com", "is_active": True}
 
     async def delete_user(self, user_id: int):
-        return {"id": user_id, "deleted": True}
+        return {"id": user_id, "username": "testuser", "email": "test@example.com", "is_active": False}
 
 
 def create_test_app():
@@ -44,6 +50,7 @@ def create_test_app():
     # Override dependencies with test fakes
     app.dependency_overrides[get_auth_service] = lambda: FakeAuthService()
     app.dependency_overrides[get_current_user_id] = lambda: 1
+    app.dependency_overrides[get_current_token_claims] = lambda: {"sub": "1", "jti": "test-jti", "exp": 0}
 
     return app
 
@@ -0,0 +1,37 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from starlette.requests import Request
+
+from app.auth import dependency
+from app.auth.container import get_container
+
+
+def make_request(method: str, user_id=None) -> Request:
+    return Request({"type": "http", "method": method, "path": "/users/me", "headers": [], "state": {"user_id": user_id}})
+
+
+async def routed(monkeypatch, request: Request) -> bool:
+    chosen = []
+
+    @asynccontextmanager
+    async def session_scope(use_replica=False):
+        chosen.append(use_replica)
+        yield None
+
+    monkeypatch.setattr(dependency, "replica_configured", lambda: True)
+    monkeypatch.setattr(dependency, "session_scope", session_scope)
+    async for _ in dependency.get_routed_db(request):
+        pass
+    return chosen[0]
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_the_replica_except_right_after_a_write(monkeypatch):
+    assert await routed(monkeypatch, make_request("GET"))
+    assert await routed(monkeypatch, make_request("GET", user_id=501))
+    assert not await routed(monkeypatch, make_request("PUT", user_id=501))
+
+    await get_container().user_cache.record_write(501)
+    assert not await routed(monkeypatch, make_request("GET", user_id=501))
+    assert await routed(monkeypatch, make_request("GET", user_id=502))
@@ -0,0 +1,107 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.auth.repository import AuthRepository
+from app.config.database import Base, ThreadedSession
+
+
+async def make_async_repository():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    session = async_sessionmaker(engine, expire_on_commit=False)()
+    return engine, session, AuthRepository(session)
+
+
+@pytest.mark.asyncio
+async def test_async_repository_create_and_lookup():
+    engine, session, repo = await make_async_repository()
+    try:
+        user = await repo.create_user("alice", "alice@example.com", "hashed")
+        assert user.id is not None
+
+        assert (await repo.get_user_by_id(user.id)).username == "alice"
+        assert (await repo.get_user_by_username("alice")).id == user.id
+        assert (await repo.get_user_by_email("alice@example.com")).id == user.id
+        assert await repo.get_user_by_email("missing@example.com") is None
+    finally:
+        await session.close()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_async_repository_duplicate_returns_none_and_delete_deactivates():
+    engine, session, repo = await make_async_repository()
+    try:
+        user_id = (await repo.create_user("bob", "bob@example.com", "hashed")).id
+        assert await repo.create_user("bob", "other@example.com", "hashed") is None
+
+        assert await repo.get_user_version(user_id) == 1
+        updated = await repo.update_user(user_id, password="new-hash")
+        assert updated.username == "bob"
+        assert updated.version == 2
+        assert await repo.get_user_version(user_id) == 2
+        assert not hasattr(updated, "password")
+        assert (await repo.get_credentials_by_id(user_id)).password == "new-hash"
+
+        await repo.delete_user(user_id)
+        assert await repo.get_user_by_id(user_id) is None
+    finally:
+        await session.close()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_replace_password_hash_only_swaps_the_expected_hash():
+    engine, session, repo = await make_async_repository()
+    try:
+        user_id = (await repo.create_user("carol", "carol@example.com", "old-hash")).id
+
+        assert not await repo.replace_password_hash(user_id, "changed-meanwhile", "rehashed")
+        assert (await repo.get_credentials_by_id(user_id)).password == "old-hash"
+
+        assert await repo.replace_password_hash(user_id, "old-hash", "rehashed")
+        assert (await repo.get_credentials_by_id(user_id)).password == "rehashed"
+    finally:
+        await session.close()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_sync_session_through_threaded_adapter():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = ThreadedSession(sessionmaker(bind=engine)())
+    repo = AuthRepository(session)
+    try:
+        user = await repo.create_user("carol", "carol@example.com", "hashed")
+        assert (await repo.get_user_by_username("carol")).id == user.id
+    finally:
+        await session.close()
+        engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_login_lookup_and_registration_take_one_statement_each():
+    engine, session, repo = await make_async_repository()
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    try:
+        alice = await repo.create_user("alice", "alice@example.com", "hashed")
+        bob = await repo.create_user("bob", "bob@example.com", "hashed")
+        assert [s.split()[0] for s in statements] == ["INSERT", "INSERT"]
+        assert await repo.create_user("alice", "new@example.com", "hashed") is None
+
+        statements.clear()
+        users = await repo.get_users_by_email_or_username("alice@example.com", "bob")
+        assert sorted(user.id for user in users) == [alice.id, bob.id]
+        assert len(statements) == 1
+
+        assert [user.id for user in await repo.get_users_by_email_or_username(None, "alice")] == [alice.id]
+        assert await repo.get_users_by_email_or_username(None, None) == []
+    finally:
+        await session.close()
+        await engine.dispose()
@@ -1,5 +1,6 @@
 from app.utils.exceptions import AlreadyExistsException, UnauthorizedException
 from app.auth.dependency import get_auth_service, get_current_user_id
+from app.auth.user import UserCredentials, UserRecord
 from fastapi.testclient import TestClient
 
 
@@ -8,22 +9,22 @@ class FakeAuthServiceOverride:
         self._login_response = {"access_token": "override-token", "token_type": "bearer"}
 
     async def get_user_by_id(self, user_id: int):
-        return {"id": user_id, "username": "overridden"}
+        return UserRecord(id=user_id, username="overridden", email="test@example.com", is_active=True)
 
     async def login_with_email_and_password(self, user_data):
         return self._login_response
 
     async def register_user(self, user_data):
-        return {"id": 99, "username": user_data.username, "email": user_data.email}
+        return {"id": 99, "username": user_data.username, "email": user_data.email, "is_active": True}
 
-    async def logout_user(self, user_id: int):
+    async def logout_user(self, user_id: int, token_claims: dict):
         return None
 
     async def change_password(self, user_id: int, change_password_data):
-        return {"id": user_id, "username": "overridden"}
+        return {"id": user_id, "username": "overridden", "email": "test@example.com", "is_active": True}
 
     async def delete_user(self, user_id: int):
-        return {"id": user_id, "deleted": True}
+        return {"id": user_id, "username": "testuser", "email": "test@example.com", "is_active": False}
 
 
 def test_me_success(make_client):
@@ -78,4 +79,52 @@ def test_delete_account_success(make_client):
     assert resp.status_code == 200
     body = resp.json()
     assert body["id"] == 3
-    assert body.get("deleted") is True
+    assert body["is_active"] is False
+
+
+def test_responses_are_filtered_through_the_response_model(make_client):
+    class LeakyService:
+        async def get_user_by_id(self, user_id: int):
+            return UserCredentials(id=user_id, username="u", email="u@example.com", is_active=True, password="hash")
+
+    client = make_client({get_auth_service: lambda: LeakyService()})
+
+    resp = client.get("/users/me")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/json"
+    assert resp.json() == {"id": 1, "username": "u", "email": "u@example.com", "is_active": True, "role": "user"}
+
+
+def test_me_answers_matching_if_none_match_with_304(make_client):
+    client = make_client({get_current_user_id: lambda: 42})
+
+    first = client.get("/users/me")
+    etag = first.headers["ETag"]
+    assert etag == '"user-42-v3"'
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    revalidated = client.get("/users/me", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["ETag"] == etag
+
+    class UpdatedService(FakeAuthServiceOverride):
+        version = 4
+
+        async def get_user_version(self, user_id: int):
+            return self.version
+
+        async def get_user_by_id(self, user_id: int):
+            return UserRecord(id=user_id, username="renamed", email="test@example.com", version=self.version)
+
+    client = make_client({get_current_user_id: lambda: 42, get_auth_service: lambda: UpdatedService()})
+    changed = client.get("/users/me", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["username"] == "renamed"
+    assert changed.headers["ETag"] == '"user-42-v4"'
+
+
+def test_logout_returns_no_content(make_client):
+    resp = make_client().post("/users/logout")
+    assert resp.status_code == 204
+    assert resp.content == b""
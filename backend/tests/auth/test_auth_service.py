@@ -1,9 +1,15 @@
 import jwt
 import pytest
 
+from contextlib import asynccontextmanager
+from dataclasses import replace
 from types import SimpleNamespace
 
+from app.auth import service as service_module
+from app.auth.hashing import PROFILES
+from app.auth.revocation import TokenRevocation
 from app.auth.service import AuthService
+from app.auth.user import UserCredentials
 from app.utils.exceptions import UnauthorizedException
 from app.config.settings import settings
 
@@ -13,26 +19,37 @@ class FakeRepo:
         self._user = user
         self._user2 = user2
 
-    def get_user_by_email(self, email: str):
+    async def get_user_by_email(self, email: str):
         return self._user
 
-    def get_user_by_username(self, username: str):
+    async def get_user_by_username(self, username: str):
         # Return second user to simulate mismatch when both provided
         return self._user2
 
-    def get_user_by_id(self, user_id: int):
+    async def get_user_by_id(self, user_id: int):
         return self._user
 
-    def update_user(self, user_id: int, **kwargs):
+    async def get_credentials_by_id(self, user_id: int):
+        return self._user
+
+    async def get_users_by_email_or_username(self, email, username):
+        return [user for user in (self._user, self._user2) if user is not None]
+
+    async def update_user(self, user_id: int, **kwargs):
         # Return object with potentially updated password
         if self._user:
-            for k, v in kwargs.items():
-                setattr(self._user, k, v)
+            self._user = replace(self._user, **kwargs)
         return self._user
 
-    def delete_user(self, user_id: int):
+    async def delete_user(self, user_id: int):
         return SimpleNamespace(id=user_id, deleted=True)
 
+    async def replace_password_hash(self, user_id: int, old_hash: str, new_hash: str):
+        if self._user is None or self._user.password != old_hash:
+            return False
+        self._user = replace(self._user, password=new_hash)
+        return True
+
 
 def test_create_access_token_contains_sub_and_decodes():
     svc = AuthService(db=None)
@@ -46,8 +63,8 @@ def test_create_access_token_contains_sub_and_decodes():
 async def test_login_with_email_success_verifies_password():
     svc = AuthService(db=None)
     # Prepare a user with hashed password
-    hashed = svc.get_password_hash("secret")
-    user = SimpleNamespace(id=10, email="u@example.com", username="user", password=hashed)
+    hashed = await svc.get_password_hash("secret")
+    user = UserCredentials(id=10, email="u@example.com", username="user", password=hashed)
 
     # Inject fake repo into service
     svc.authRepository = FakeRepo(user=user)
@@ -63,8 +80,8 @@ async def test_login_with_email_success_verifies_password():
 @pytest.mark.asyncio
 async def test_login_with_both_mismatch_raises_unauthorized():
     svc = AuthService(db=None)
-    user1 = SimpleNamespace(id=1, email="a@example.com", username="a", password=svc.get_password_hash("p1"))
-    user2 = SimpleNamespace(id=2, email="b@example.com", username="b", password=svc.get_password_hash("p2"))
+    user1 = SimpleNamespace(id=1, email="a@example.com", username="a", password=await svc.get_password_hash("p1"))
+    user2 = SimpleNamespace(id=2, email="b@example.com", username="b", password=await svc.get_password_hash("p2"))
 
     svc.authRepository = FakeRepo(user=user1, user2=user2)
 
@@ -84,8 +101,8 @@ async def test_get_current_user_invalid_token_raises():
 @pytest.mark.asyncio
 async def test_change_password_updates_hash_and_hides_password():
     svc = AuthService(db=None)
-    old_hashed = svc.get_password_hash("old")
-    user = SimpleNamespace(id=5, password=old_hashed)
+    old_hashed = await svc.get_password_hash("old")
+    user = UserCredentials(id=5, username="user", email="u@example.com", password=old_hashed)
 
     svc.authRepository = FakeRepo(user=user)
 
@@ -94,3 +111,68 @@ async def test_change_password_updates_hash_and_hides_password():
     updated = await svc.change_password(5, change_req)
     # Service deletes password attribute before returning
     assert not hasattr(updated, "password")
+
+
+@pytest.mark.asyncio
+async def test_login_with_stale_hash_upgrades_it_in_background(monkeypatch):
+    svc = AuthService(db=None)
+    stale = PROFILES["minimum"].password_hash().hash("secret")
+    repo = FakeRepo(user=UserCredentials(id=7, username="user", email="u@example.com", password=stale))
+    svc.authRepository = repo
+
+    spawned = []
+    svc.spawn = spawned.append
+
+    @asynccontextmanager
+    async def fake_session_scope():
+        yield None
+
+    monkeypatch.setattr(service_module, "session_scope", fake_session_scope)
+    monkeypatch.setattr(service_module, "AuthRepository", lambda db, cache, flights: repo)
+
+    req = SimpleNamespace(email="u@example.com", username=None, password="secret")
+    assert (await svc.login_with_email_and_password(req))["token_type"] == "bearer"
+    assert len(spawned) == 1
+
+    await spawned[0]
+    upgraded = repo._user.password
+    assert upgraded != stale
+    assert not svc.password_hash.needs_rehash(upgraded)
+    assert await svc.verify_password("secret", upgraded)
+
+    # The upgraded hash is current, so the next login schedules nothing
+    await svc.login_with_email_and_password(req)
+    assert len(spawned) == 1
+
+
+def test_auth_services_share_container_collaborators():
+    from app.auth.dependency import get_auth_service
+
+    first = get_auth_service(db=None)
+    second = get_auth_service(db=None)
+    assert first is not second
+    assert first.password_hash is second.password_hash
+    assert first.token_codec is second.token_codec
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_token():
+    svc = AuthService(db=None)
+    token = svc.create_access_token({"sub": "5"})
+    claims = svc.token_codec.decode(token)
+
+    revoked = []
+
+    class FakeRevocationStore:
+        async def revoke(self, jti, expires_at):
+            revoked.append(jti)
+
+        async def is_revoked(self, jti):
+            return jti in revoked
+
+    svc.token_revocation = TokenRevocation(FakeRevocationStore(), capacity=100, sync_seconds=1, sweep_seconds=60)
+
+    await svc.logout_user(5, claims)
+    assert revoked == [claims["jti"]]
+    with pytest.raises(UnauthorizedException):
+        await svc.get_current_user(token)
@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+
+from app.auth.cache import InMemoryUserCache
+from app.auth.container import AuthContainer
+from app.auth.hashing import PasswordHasher
+
+
+@pytest.mark.asyncio
+async def test_shutdown_waits_for_short_tasks_and_cancels_the_rest():
+    hasher = PasswordHasher(max_workers=1, max_queue=0)
+    container = AuthContainer(password_hasher=hasher, user_cache=InMemoryUserCache(10, 60))
+    finished = []
+
+    async def rehash(delay):
+        await asyncio.sleep(delay)
+        finished.append(delay)
+
+    quick = container.spawn(rehash(0))
+    stuck = container.spawn(rehash(60))
+    await container.shutdown(timeout=0.05)
+
+    assert quick.done() and finished == [0]
+    assert stuck.cancelled()
+    assert not container._tasks
+    assert hasher._executor is None
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+
+import pytest
+
+from pwdlib import PasswordHash
+
+from app.auth.hashing import PROFILES, Argon2Profile, PasswordHasher, calibrate_profile
+from app.utils.exceptions import ServiceUnavailableException
+
+
+class BlockingPasswordHash:
+    """Stand-in for pwdlib that blocks until released, to hold pool slots."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def hash(self, password):
+        self.release.wait(timeout=5)
+        return f"hashed:{password}"
+
+    def verify(self, password, hashed_password):
+        return hashed_password == f"hashed:{password}"
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_round_trip_off_loop():
+    hasher = PasswordHasher(max_workers=2, max_queue=2)
+    try:
+        hashed = await hasher.hash("secret")
+        assert await hasher.verify("secret", hashed)
+        assert not await hasher.verify("wrong", hashed)
+
+        snapshot = hasher.metrics.snapshot()
+        assert snapshot["completed"] == 3
+        assert snapshot["queue_depth"] == 0
+        assert snapshot["avg_hash_seconds"] > 0
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_saturated_pool_rejects_with_503():
+    backend = BlockingPasswordHash()
+    hasher = PasswordHasher(password_hash=backend, max_workers=1, max_queue=1)
+    try:
+        first = asyncio.create_task(hasher.hash("a"))
+        second = asyncio.create_task(hasher.hash("b"))
+        await asyncio.sleep(0.05)
+
+        assert hasher.metrics.snapshot()["queue_depth"] == 1
+        with pytest.raises(ServiceUnavailableException) as exc_info:
+            await hasher.hash("c")
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers["Retry-After"] == "1"
+
+        backend.release.set()
+        assert await first == "hashed:a"
+        assert await second == "hashed:b"
+        assert hasher.metrics.snapshot()["rejected"] == 1
+    finally:
+        backend.release.set()
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_keeps_its_slot_until_the_hash_finishes():
+    backend = BlockingPasswordHash()
+    hasher = PasswordHasher(password_hash=backend, max_workers=1, max_queue=0)
+    try:
+        caller = asyncio.create_task(hasher.hash("a"))
+        await asyncio.sleep(0.05)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+
+        # The hash still runs in its thread, so the pool is still full
+        assert hasher.metrics.pending == 1
+        with pytest.raises(ServiceUnavailableException):
+            await hasher.hash("b")
+
+        backend.release.set()
+        for _ in range(100):
+            if hasher.metrics.pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert hasher.metrics.snapshot()["completed"] == 1
+        assert hasher.metrics.pending == 0
+    finally:
+        backend.release.set()
+        hasher.shutdown()
+
+
+def test_needs_rehash_only_for_other_parameters():
+    hasher = PasswordHasher(profile=PROFILES["minimum"])
+    current = PROFILES["minimum"].password_hash().hash("secret")
+    legacy = PasswordHash.recommended().hash("secret")
+
+    assert not hasher.needs_rehash(current)
+    assert hasher.needs_rehash(legacy)
+    assert hasher.needs_rehash("$2b$12$not-an-argon2-hash")
+    # The default profile matches what recommended() produced so far
+    assert not PasswordHasher(profile=PROFILES["default"]).needs_rehash(legacy)
+
+
+def test_calibration_fits_target_and_keeps_memory_floor():
+    profile = calibrate_profile(target_seconds=2.0, memory_cost=1024, parallelism=1, max_time_cost=3)
+
+    assert profile.memory_cost == PROFILES["minimum"].memory_cost
+    assert 1 <= profile.time_cost <= 3
+    assert profile.parallelism == 1
+
+    # A budget no hash can meet still yields a usable single-pass profile
+    assert calibrate_profile(target_seconds=0.0, memory_cost=1024, parallelism=1).time_cost == 1
+    assert isinstance(profile, Argon2Profile)
+
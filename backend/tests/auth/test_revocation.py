@@ -0,0 +1,63 @@
+import time
+import uuid
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.auth.revocation import BloomFilter, DatabaseRevocationStore, TokenRevocation
+from app.config.database import Base
+
+
+async def make_store():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    return engine, DatabaseRevocationStore(async_sessionmaker(engine, expire_on_commit=False))
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    added = [uuid.uuid4().hex for _ in range(1000)]
+    for jti in added:
+        bloom.add(jti)
+
+    assert all(jti in bloom for jti in added)
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10000))
+    assert false_positives < 300
+
+
+@pytest.mark.asyncio
+async def test_revocation_reaches_other_workers_after_sync():
+    engine, store = await make_store()
+    try:
+        worker_a = TokenRevocation(store, capacity=1000, sync_seconds=1, sweep_seconds=60)
+        worker_b = TokenRevocation(store, capacity=1000, sync_seconds=1, sweep_seconds=60)
+        claims = {"sub": "1", "jti": uuid.uuid4().hex, "exp": int(time.time()) + 60}
+
+        await worker_a.revoke(claims)
+        assert await worker_a.is_revoked(claims)
+        assert not worker_b.might_be_revoked(claims)
+
+        await worker_b.sync()
+        assert await worker_b.is_revoked(claims)
+        assert not await worker_b.is_revoked({"sub": "1", "jti": uuid.uuid4().hex, "exp": claims["exp"]})
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_rebuild_sweeps_expired_revocations():
+    engine, store = await make_store()
+    try:
+        revocation = TokenRevocation(store, capacity=1000, sync_seconds=1, sweep_seconds=60)
+        expired = {"jti": uuid.uuid4().hex, "exp": int(time.time()) - 1}
+        live = {"jti": uuid.uuid4().hex, "exp": int(time.time()) + 60}
+        await revocation.revoke(expired)
+        await revocation.revoke(live)
+        await revocation.revoke(live)
+
+        await revocation.rebuild()
+        assert not revocation.might_be_revoked(expired)
+        assert await revocation.is_revoked(live)
+    finally:
+        await engine.dispose()
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.auth.repository import AuthRepository
+from app.auth.singleflight import SingleFlight
+from app.config.database import Base
+from app.utils.exceptions import ServiceUnavailableException
+
+
+class SlowLookup:
+    """Counts calls and holds each one until released."""
+
+    def __init__(self, result="row", error=None):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.result = result
+        self.error = error
+
+    async def __call__(self, key):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return f"{self.result}:{key}"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_for_a_key_share_one_lookup():
+    flights = SingleFlight(timeout=1)
+    lookup = SlowLookup()
+    same = [asyncio.create_task(flights.do("a", lookup, "a")) for _ in range(5)]
+    other = asyncio.create_task(flights.do("b", lookup, "b"))
+    await asyncio.sleep(0)
+
+    lookup.release.set()
+    assert await asyncio.gather(*same) == ["row:a"] * 5
+    assert await other == "row:b"
+    assert lookup.calls == 2
+    assert flights.stats() == {"leaders": 2, "coalesced": 4, "timeouts": 0, "errors": 0, "in_flight": 0}
+
+    # Finished flights are not cached
+    assert await flights.do("a", lookup, "a") == "row:a"
+    assert lookup.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter():
+    flights = SingleFlight(timeout=1)
+    lookup = SlowLookup(error=RuntimeError("database down"))
+    waiters = [asyncio.create_task(flights.do("a", lookup, "a")) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    lookup.release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert lookup.calls == 1
+    assert flights.stats()["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_timeout_raises_503_and_clears_the_flight():
+    flights = SingleFlight(timeout=0.05)
+    lookup = SlowLookup()
+    waiters = [asyncio.create_task(flights.do("a", lookup, "a")) for _ in range(2)]
+
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(result, ServiceUnavailableException) for result in results)
+    stats = flights.stats()
+    assert (stats["in_flight"], stats["errors"]) == (0, 0)
+    assert stats["timeouts"] >= 1
+
+    lookup.release.set()
+    assert await flights.do("a", lookup, "a") == "row:a"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_hands_over_to_a_follower():
+    flights = SingleFlight(timeout=1)
+    lookup = SlowLookup()
+    leader = asyncio.create_task(flights.do("a", lookup, "a"))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flights.do("a", lookup, "a"))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    lookup.release.set()
+    assert await follower == "row:a"
+    assert leader.cancelled()
+    assert lookup.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_repository_coalesces_overlapping_misses_and_forgets_on_write():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    flights = SingleFlight(timeout=1)
+    sessions = [async_sessionmaker(engine, expire_on_commit=False)() for _ in range(4)]
+    try:
+        user = await AuthRepository(sessions[0], flights=flights).create_user("dave", "dave@example.com", "hashed")
+
+        # One repository per request, like get_auth_service builds them
+        users = await asyncio.gather(*(AuthRepository(session, flights=flights).get_user_by_id(user.id) for session in sessions))
+        assert {found.username for found in users} == {"dave"}
+        assert flights.stats()["coalesced"] == 3
+
+        flights.flights[("id", user.id, False)] = asyncio.get_running_loop().create_future()
+        await AuthRepository(sessions[0], flights=flights).update_user(user.id, username="david")
+        assert ("id", user.id, False) not in flights.flights
+    finally:
+        for session in sessions:
+            await session.close()
+        await engine.dispose()
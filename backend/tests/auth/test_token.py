@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+import jwt
+import pytest
+
+from app.auth import token as token_module
+from app.auth.token import TokenCache, TokenCodec
+
+
+@pytest.fixture
+def count_decodes(monkeypatch):
+    calls = []
+    real_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(token_module.jwt, "decode", counting_decode)
+    return calls
+
+
+def test_repeated_token_skips_reverification(count_decodes):
+    codec = TokenCodec(cache=TokenCache(max_size=10))
+    token = codec.encode({"sub": "1"})
+
+    assert codec.decode(token)["sub"] == "1"
+    assert codec.decode(token)["sub"] == "1"
+    assert len(count_decodes) == 1
+    assert codec.cache.stats()["hits"] == 1
+    assert codec.cache.stats()["misses"] == 1
+
+
+def test_tampered_token_is_not_served_from_cache(count_decodes):
+    codec = TokenCodec(cache=TokenCache(max_size=10))
+    token = codec.encode({"sub": "1"})
+    codec.decode(token)
+
+    with pytest.raises(jwt.InvalidTokenError):
+        codec.decode(token[:-2] + ("AA" if not token.endswith("AA") else "BB"))
+
+
+def test_entry_expires_at_token_exp():
+    codec = TokenCodec(cache=TokenCache(max_size=10))
+    token = codec.encode({"sub": "1"}, expire_delta=timedelta(seconds=-1))
+
+    with pytest.raises(jwt.ExpiredSignatureError):
+        codec.decode(token)
+    assert codec.cache.stats()["size"] == 0
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TokenCache(max_size=2)
+    claims = {"sub": "1", "exp": 2**40}
+
+    cache.put(b"a", claims)
+    cache.put(b"b", claims)
+    cache.get(b"a")
+    cache.put(b"c", claims)
+
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") is claims
+    assert cache.stats()["evictions"] == 1
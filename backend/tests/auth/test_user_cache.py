@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.auth.cache import InMemoryUserCache, RedisUserCache
+from app.auth.repository import AuthRepository
+from app.auth.user import User, UserCredentials
+from app.config.database import Base
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio client calls the cache uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+async def make_repository(cache):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    session = async_sessionmaker(engine, expire_on_commit=False)()
+    return engine, session, AuthRepository(session, cache)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cache", [InMemoryUserCache(100, 60), RedisUserCache(FakeRedis(), 60)])
+async def test_lookups_read_through_and_writes_invalidate(cache):
+    engine, session, repo = await make_repository(cache)
+    try:
+        user_id = (await repo.create_user("alice", "alice@example.com", "hash")).id
+        await repo.get_user_by_id(user_id)
+
+        # Changed behind the repository's back: cached lookups still see the old row
+        await session.execute(update(User).where(User.id == user_id).values(role="admin"))
+        await session.commit()
+        assert (await repo.get_user_by_id(user_id)).role == "user"
+
+        await repo.update_user(user_id, email="alice@example.org")
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert (await repo.get_user_by_id(user_id)).email == "alice@example.org"
+        assert await repo.get_user_by_email("alice@example.com") is None
+
+        await repo.delete_user(user_id)
+        assert await repo.get_user_by_id(user_id) is None
+        assert (cache.hits, cache.misses) == (1, 3)
+    finally:
+        await session.close()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cache", [InMemoryUserCache(100, 60), RedisUserCache(FakeRedis(), 60)])
+async def test_password_hashes_are_never_cached(cache):
+    engine, session, repo = await make_repository(cache)
+    try:
+        user_id = (await repo.create_user("bob", "bob@example.com", "hash")).id
+        assert (await repo.get_user_by_email("bob@example.com")).password == "hash"
+        public = await repo.get_user_by_id(user_id)
+        assert not hasattr(public, "password")
+
+        # Credential lookups always read the database, so they see this at once
+        await session.execute(update(User).where(User.id == user_id).values(password="out-of-band"))
+        await session.commit()
+        assert (await repo.get_user_by_username("bob")).password == "out-of-band"
+        assert (await repo.get_credentials_by_id(user_id)).password == "out-of-band"
+
+        stored = cache.client.data.values() if isinstance(cache, RedisUserCache) else [value for _, value in cache._entries.values()]
+        assert not any("password" in str(value) for value in stored)
+        # The credential lookup filled the public entry, /users/me hits
+        assert cache.stats() == {"hits": 1, "misses": 0, "hit_ratio": 1.0}
+    finally:
+        await session.close()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cache", [
+    InMemoryUserCache(1, 60, write_window_seconds=5),
+    RedisUserCache(FakeRedis(), 60, write_window_seconds=5),
+])
+async def test_writes_are_recorded_for_read_your_writes(cache):
+    engine, session, repo = await make_repository(cache)
+    try:
+        carol = (await repo.create_user("carol", "carol@example.com", "hash")).id
+        dave = (await repo.create_user("dave", "dave@example.com", "hash")).id
+        # Filling the user entries does not push the markers out
+        await repo.get_user_by_id(carol)
+        await repo.get_user_by_id(dave)
+        assert await cache.written_within_window(carol)
+        assert await cache.written_within_window(dave)
+        assert not await cache.written_within_window(dave + 1)
+    finally:
+        await session.close()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_write_markers_expire_with_the_window():
+    cache = InMemoryUserCache(100, 60, write_window_seconds=0.05)
+    await cache.record_write(1)
+    assert await cache.written_within_window(1)
+    await asyncio.sleep(0.05)
+    assert not await cache.written_within_window(1)
+
+    # The next write drops markers that already ran out
+    await cache.record_write(2)
+    assert list(cache._writes) == [2]
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_expires_and_evicts():
+    user = UserCredentials(id=1, username="a", email="a@example.com", password="h")
+
+    expired = InMemoryUserCache(max_size=10, ttl_seconds=0)
+    await expired.set(user)
+    assert await expired.get(1) is None
+
+    # One key per user, so max_size is the number of users kept
+    small = InMemoryUserCache(max_size=1, ttl_seconds=60)
+    await small.set(user)
+    await small.set(UserCredentials(id=2, username="b", email="b@example.com"))
+    assert list(small._entries) == ["user:id:2"]
+    assert await small.get(1) is None
+    assert await small.get(2) is not None
+    assert small.stats()["hit_ratio"] == 0.5
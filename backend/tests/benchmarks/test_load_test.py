@@ -0,0 +1,18 @@
+from benchmarks.load_test import percentile
+
+
+def test_percentile_is_the_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile(values, 100) == 100.0
+    assert percentile(values, 0) == 1.0
+
+
+def test_percentile_of_small_samples():
+    assert percentile([], 99) == 0.0
+    assert percentile([3.0], 50) == 3.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 51) == 3.0
@@ -0,0 +1,228 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+import subprocess
+
+import pytest
+from sqlalchemy import column, create_engine, func, insert, select, table, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.config import database
+from app.config.database import LazySession
+from app.config.settings import settings
+from app.config.pool import InstrumentedQueuePool, PoolMetrics, instrument_pool
+
+
+class RecordingSession:
+    def __init__(self):
+        self.closed = False
+
+    async def scalar(self, statement):
+        return 1
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeAsyncConnector:
+    def __init__(self):
+        self.closed = False
+
+    async def connect_async(self, *args, **kwargs):
+        return object()
+
+    async def close_async(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_lazy_session_is_only_created_on_use():
+    created = []
+
+    def factory():
+        created.append(RecordingSession())
+        return created[-1]
+
+    unused = LazySession(factory)
+    await unused.close()
+    assert created == []
+
+    used = LazySession(factory)
+    assert await used.scalar("SELECT 1") == 1
+    assert used.started
+    await used.close()
+    assert len(created) == 1 and created[0].closed
+
+
+def test_average_wait_counts_timed_out_waits():
+    metrics = PoolMetrics("test")
+    metrics.checkouts = 1
+    metrics.record_wait(0.01)
+    metrics.record_wait(0.05, timed_out=True)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["timeouts"] == 1
+    assert snapshot["avg_wait_seconds"] == pytest.approx(0.03)
+    assert snapshot["max_wait_seconds"] == 0.05
+
+
+def test_pool_metrics_track_checkouts_overflow_and_timeouts():
+    engine = create_engine("sqlite://", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=1, pool_timeout=0.05)
+    metrics = instrument_pool(engine, "test")
+    try:
+        first = engine.connect()
+        first.execute(text("SELECT 1"))
+        second = engine.connect()
+
+        snapshot = metrics.snapshot()
+        assert snapshot["checked_out"] == 2
+        assert snapshot["overflow"] == 1
+        assert snapshot["connections_created"] == 2
+
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        snapshot = metrics.snapshot()
+        assert snapshot["timeouts"] == 1
+        assert snapshot["max_wait_seconds"] >= 0.05
+
+        first.close()
+        second.close()
+        assert metrics.snapshot()["checked_out"] == 0
+        assert metrics.snapshot()["checkouts"] == 2
+    finally:
+        engine.dispose()
+    assert engine.pool.metrics is metrics
+
+
+def test_importing_the_app_builds_no_engine_or_connector():
+    code = (
+        "import sys\n"
+        "import app.main\n"
+        "from app.config import database\n"
+        "assert database._engine is None and database._async_engine is None\n"
+        "assert database.connector is None and database.async_connector is None\n"
+        "assert 'google.cloud.sql.connector' not in sys.modules\n"
+    )
+    env = {key: value for key, value in os.environ.items() if key != "GOOGLE_APPLICATION_CREDENTIALS"}
+    env.setdefault("SECRET_KEY", "test-secret-key-with-at-least-32-bytes")
+    result = subprocess.run([sys.executable, "-c", code], cwd=os.path.join(os.path.dirname(__file__), "..", ".."), env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+@pytest.mark.asyncio
+async def test_engines_are_created_on_first_use_and_disposed(monkeypatch):
+    monkeypatch.setattr(settings, "database_url", "sqlite+aiosqlite://")
+    async_engine = database.get_async_engine()
+    assert database.get_async_engine() is async_engine
+    assert database.get_engine().url.drivername == "sqlite+pysqlite"
+    assert set(database.pool_metrics) >= {"sync", "async"}
+
+    async with async_engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+    checkouts = database.pool_metrics["async"].checkouts
+    assert checkouts >= 1
+
+    await database.dispose_engines()
+    assert database._engine is None and database._async_engine is None
+
+    # A rebuilt engine keeps counting on the same metrics, so counters never go back
+    metrics = database.pool_metrics["async"]
+    async with database.get_async_engine().connect() as connection:
+        await connection.execute(text("SELECT 1"))
+    assert database.pool_metrics["async"] is metrics
+    assert metrics.checkouts == checkouts + 1
+    await database.dispose_engines()
+
+
+def test_backend_urls(monkeypatch):
+    monkeypatch.setattr(settings, "database_url", None)
+    monkeypatch.setattr(settings, "db_user", "sensei")
+    monkeypatch.setattr(settings, "db_pass", "p@ss")
+    monkeypatch.setattr(settings, "db_name", "algosensei")
+    monkeypatch.setattr(settings, "db_host", "10.0.0.5")
+    monkeypatch.setattr(settings, "db_port", "6432")
+    monkeypatch.setattr(settings, "instance_connection_name", "project:region:instance")
+
+    monkeypatch.setattr(settings, "db_backend", "dsn")
+    url = database.database_url(async_driver=False)
+    assert url.drivername == "postgresql+psycopg2"
+    assert (url.host, url.port, url.password) == ("10.0.0.5", 6432, "p@ss")
+
+    monkeypatch.setattr(settings, "db_backend", "unix_socket")
+    url = database.database_url(async_driver=True)
+    assert url.drivername == "postgresql+asyncpg"
+    assert url.host is None
+    assert url.query["host"] == "/cloudsql/project:region:instance"
+
+    monkeypatch.setattr(settings, "db_backend", None)
+    assert database.database_backend() == "connector"
+    monkeypatch.setattr(settings, "database_url", "postgresql+asyncpg://u@localhost/db")
+    assert database.database_backend() == "dsn"
+    assert database.database_url(async_driver=False).drivername == "postgresql+psycopg2"
+
+
+def test_replica_routing_session_reads_replica_until_it_writes():
+    primary, replica = create_engine("sqlite://"), create_engine("sqlite://")
+    for engine, name in ((primary, "primary"), (replica, "replica")):
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE source (name TEXT)"))
+            connection.execute(text("INSERT INTO source VALUES (:name)"), {"name": name})
+    source = table("source", column("name"))
+
+    with database.ReplicaRoutingSession(bind=primary, replica=replica) as session:
+        assert session.scalar(select(source.c.name)) == "replica"
+        session.execute(insert(source).values(name="written"))
+        assert not session.scalar(select(func.count()).select_from(source).where(source.c.name == "replica"))
+
+    with database.ReplicaRoutingSession(bind=primary) as session:
+        assert session.scalar(select(source.c.name)) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_connections_share_one_async_connector(monkeypatch):
+    import google.cloud.sql.connector as cloud_sql
+
+    created = []
+
+    async def create_async_connector():
+        await asyncio.sleep(0.01)
+        created.append(FakeAsyncConnector())
+        return created[-1]
+
+    monkeypatch.setattr(cloud_sql, "create_async_connector", create_async_connector)
+    monkeypatch.setattr(database, "async_connector", None)
+
+    await asyncio.gather(*(database.getconn_async() for _ in range(5)))
+    assert len(created) == 1
+
+    await database.close_connectors()
+    assert created[0].closed and database.async_connector is None
+
+
+def test_concurrent_first_connections_share_one_sync_connector(monkeypatch):
+    import google.cloud.sql.connector as cloud_sql
+
+    created = []
+
+    class FakeConnector:
+        def __init__(self):
+            time.sleep(0.01)
+            created.append(self)
+
+        def connect(self, *args, **kwargs):
+            return object()
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(cloud_sql, "Connector", FakeConnector)
+    monkeypatch.setattr(database, "connector", None)
+
+    threads = [threading.Thread(target=database.getconn) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
@@ -0,0 +1,84 @@
+import json
+import logging
+
+from app.config.log import JsonFormatter, QueuedLogging
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def make_record(msg="user %s logged in", args=("42",), **extra):
+    record = logging.LogRecord("app.test", logging.INFO, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_merges_args_and_extra_fields():
+    line = JsonFormatter().format(make_record(status_code=200, path="/users/me"))
+    entry = json.loads(line)
+
+    assert entry["message"] == "user 42 logged in"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "app.test"
+    assert entry["status_code"] == 200
+    assert entry["path"] == "/users/me"
+    assert "args" not in entry and "msg" not in entry
+
+
+def test_json_formatter_includes_exceptions():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord("app.test", logging.ERROR, __file__, 1, "failed", (), __import__("sys").exc_info())
+
+    entry = json.loads(JsonFormatter().format(record))
+    assert "ValueError: boom" in entry["exc_info"]
+
+
+def test_queued_logging_keeps_each_logger_on_its_own_handlers():
+    parent, child = logging.getLogger("queued_test"), logging.getLogger("queued_test.access")
+    parent_handler, child_handler = ListHandler(), ListHandler()
+    parent.handlers, child.handlers = [parent_handler], [child_handler]
+    parent.setLevel(logging.INFO)
+    child.propagate = False
+
+    queued = QueuedLogging(max_size=100)
+    queued.start()
+    try:
+        assert not isinstance(parent.handlers[0], ListHandler)
+        parent.info("app %s", 1)
+        child.info("access %s", 2)
+    finally:
+        queued.stop()
+
+    assert parent.handlers == [parent_handler] and child.handlers == [child_handler]
+    assert [r.getMessage() for r in parent_handler.records] == ["app 1"]
+    assert [r.getMessage() for r in child_handler.records] == ["access 2"]
+
+
+def test_full_queue_drops_records_instead_of_blocking():
+    logger = logging.getLogger("queued_test.full")
+    handler = ListHandler()
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    queued = QueuedLogging(max_size=1)
+    queued.start()
+    # Hold the listener on the first record so the queue stays full
+    handler.acquire()
+    try:
+        for i in range(50):
+            logger.info("burst %s", i)
+    finally:
+        handler.release()
+        queued.stop()
+
+    assert queued.dropped > 0
+    assert len(handler.records) + queued.dropped == 50
@@ -0,0 +1,40 @@
+from app.auth.hashing import HashingMetrics
+from app.auth.singleflight import SingleFlight
+from app.config.metrics import Histogram, RequestMetrics, render_metrics
+from app.hints.stream import HintMetrics
+
+
+def test_histogram_buckets_are_upper_inclusive_and_cumulative():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    assert list(histogram.cumulative()) == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+    assert histogram.count == 4
+    assert histogram.sum == 3.65
+
+
+def test_render_metrics_exposes_routes_and_hashing():
+    requests = RequestMetrics()
+    requests.unmatched.latency.observe(0.002)
+    requests.unmatched.statuses[3] += 1
+    hashing = HashingMetrics()
+    hashing.record(0.2, 0.0)
+
+    flights = SingleFlight(timeout=1)
+    flights.coalesced = 3
+    hints = HintMetrics()
+    hints.ttfb_seconds.observe(0.2)
+    hints.cancelled = 2
+
+    text = render_metrics(requests, hashing=hashing, coalescing=flights, hints=hints)
+
+    assert '# TYPE http_request_duration_seconds histogram' in text
+    assert 'http_request_duration_seconds_bucket{method="",route="unmatched",le="0.005"} 1' in text
+    assert 'http_requests_total{method="",route="unmatched",status="4xx"} 1' in text
+    assert 'password_hash_duration_seconds_bucket{le="0.25"} 1' in text
+    assert 'password_hash_duration_seconds_count 1' in text
+    assert 'password_hash_completed_total 1' in text
+    assert 'user_lookup_coalesced_total 3' in text
+    assert 'hint_first_chunk_seconds_bucket{le="0.25"} 1' in text
+    assert 'hint_streams_cancelled_total 2' in text
@@ -0,0 +1,24 @@
+from sqlalchemy import create_engine, inspect, text
+
+from app.migrate import migrate
+
+
+def test_migrate_adds_columns_missing_from_existing_tables():
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        # The users table as it was before the version column
+        connection.execute(text(
+            "CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR(30), email VARCHAR(100), "
+            "password VARCHAR(255), is_active BOOLEAN, role VARCHAR(20) DEFAULT 'user')"
+        ))
+        connection.execute(text("INSERT INTO users (username, email, password, is_active) VALUES ('a', 'a@example.com', 'h', 1)"))
+
+    with engine.begin() as connection:
+        migrate(connection)
+        # Running it again changes nothing
+        migrate(connection)
+
+    with engine.connect() as connection:
+        assert "version" in {column["name"] for column in inspect(connection).get_columns("users")}
+        assert "revoked_tokens" in inspect(connection).get_table_names()
+        assert connection.execute(text("SELECT version FROM users")).scalar() == 1
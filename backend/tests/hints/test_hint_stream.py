@@ -0,0 +1,179 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+import orjson
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.auth.dependency import get_current_user_id
+from app.config.database import Base
+from app.hints.container import HintContainer
+from app.hints.dependency import get_hint_service
+from app.hints.generator import HintGenerator, HintRequest, StubHintGenerator
+from app.hints.router import router as hints_router
+from app.hints.service import HintService
+from app.hints.stream import EventStreamResponse, HintMetrics, HintStream, StreamSlots
+from app.problems.container import ProblemContainer
+from app.problems.service import ProblemService
+
+PROBLEM = "Two Sum: return the indices of the two numbers that add up to target."
+
+
+def parse_events(body: bytes) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.decode().strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event.removeprefix("event: "), orjson.loads(data.removeprefix("data: "))))
+    return events
+
+
+class BlockingGenerator(HintGenerator):
+    """Sends one chunk, then waits for a next one that never comes."""
+
+    name = "blocking"
+
+    def __init__(self):
+        self.closed = asyncio.Event()
+
+    async def stream(self, request: HintRequest):
+        try:
+            yield "first"
+            await asyncio.Event().wait()
+            yield "never"
+        finally:
+            self.closed.set()
+
+
+@pytest_asyncio.fixture
+async def hint_app():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    session = async_sessionmaker(engine, expire_on_commit=False)()
+    problems = ProblemContainer(blob_store=None, cache_size=8)
+    record, _ = await ProblemService(session, problems).ingest_problem(PROBLEM)
+    await ProblemService(session, problems).add_snapshot(1, record.content_id, "Current Output: [0,0]\nExpected Output: [0,1]")
+
+    @asynccontextmanager
+    async def session_factory():
+        yield session
+
+    container = HintContainer(generator=StubHintGenerator(chunk_delay=0), slots=StreamSlots(per_user=1, total=10))
+    app = FastAPI()
+    app.include_router(hints_router)
+    app.dependency_overrides[get_hint_service] = lambda: HintService(container, problems, session_factory)
+    app.dependency_overrides[get_current_user_id] = lambda: 1
+    try:
+        yield app, container, record.content_id
+    finally:
+        await session.close()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_hint_streams_chunks_then_done_and_records_first_chunk_time(hint_app):
+    app, container, content_id = hint_app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/hints/stream", json={"content_id": content_id, "level": 2})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    events = parse_events(response.content)
+    hints = [data["text"] for event, data in events if event == "hint"]
+    assert len(hints) > 1
+    assert "".join(hints).startswith("Your output was [0,0] where [0,1] was expected.")
+    assert events[-1] == ("done", {"chunks": len(hints)})
+
+    metrics = container.metrics
+    assert (metrics.completed, metrics.cancelled, metrics.active, metrics.chunks) == (1, 0, 0, len(hints))
+    assert metrics.ttfb_seconds.count == 1
+    assert metrics.duration_seconds.count == 1
+    assert metrics.ttfb_seconds.sum <= metrics.duration_seconds.sum
+    assert container.slots.active == {}
+
+
+@pytest.mark.asyncio
+async def test_first_chunk_time_counts_from_the_request_not_the_stream(hint_app, monkeypatch):
+    app, container, content_id = hint_app
+    load_request = HintService._load_request
+
+    async def slow_load_request(self, *args):
+        await asyncio.sleep(0.05)
+        return await load_request(self, *args)
+
+    monkeypatch.setattr(HintService, "_load_request", slow_load_request)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/hints/stream", json={"content_id": content_id})
+
+    assert response.status_code == 200
+    assert container.metrics.ttfb_seconds.sum >= 0.05
+    assert container.metrics.duration_seconds.sum >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_streams_over_the_user_cap_are_refused(hint_app):
+    app, container, content_id = hint_app
+    container.slots.acquire(1)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        refused = await client.post("/hints/stream", json={"content_id": content_id})
+        assert refused.status_code == 429
+        assert refused.headers["Retry-After"] == "1"
+        assert container.metrics.rejected == 1
+
+        container.slots.release(1)
+        unknown = await client.post("/hints/stream", json={"content_id": "0" * 64})
+        assert unknown.status_code == 404
+        # The slot taken for the unknown problem was given back
+        assert container.slots.active == {}
+        assert (await client.post("/hints/stream", json={"content_id": content_id})).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_disconnect_stops_the_generator_and_frees_the_slot():
+    generator = BlockingGenerator()
+    metrics = HintMetrics()
+    slots = StreamSlots(per_user=1, total=1)
+    assert slots.acquire(7)
+    stream = HintStream(generator, HintRequest(problem=PROBLEM), metrics, lambda: slots.release(7), max_seconds=60)
+    response = EventStreamResponse(stream.events(), on_close=stream.close)
+
+    sent = []
+    first_chunk = asyncio.Event()
+
+    async def receive():
+        await first_chunk.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+        if message.get("body"):
+            first_chunk.set()
+
+    await asyncio.wait_for(response({"type": "http"}, receive, send), timeout=1)
+
+    assert generator.closed.is_set()
+    assert sent[1]["body"] == b'event: hint\ndata: {"text":"first"}\n\n'
+    assert (metrics.cancelled, metrics.completed, metrics.active) == (1, 0, 0)
+    assert metrics.ttfb_seconds.count == 1
+    assert slots.open == 0 and slots.acquire(7)
+
+
+@pytest.mark.asyncio
+async def test_generation_past_the_time_limit_ends_with_an_error_event():
+    generator = BlockingGenerator()
+    metrics = HintMetrics()
+    stream = HintStream(generator, HintRequest(problem=PROBLEM), metrics, lambda: None, max_seconds=0.05)
+
+    events = [event async for event in stream.events()]
+    stream.close()
+
+    assert parse_events(b"".join(events)) == [("hint", {"text": "first"}), ("error", {"detail": "Hint generation timed out"})]
+    assert generator.closed.is_set()
+    assert (metrics.timeouts, metrics.cancelled) == (1, 0)
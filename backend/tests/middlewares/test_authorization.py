@@ -0,0 +1,73 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.auth.permissions import Permission, requires
+from app.middlewares.authorization import AuthorizationMiddleware, compile_route_policies
+
+
+def create_test_app(claims, opened_sessions):
+    def get_db():
+        opened_sessions.append(True)
+        yield None
+
+    router = APIRouter(prefix="/users")
+
+    @router.get("/me", dependencies=[requires(Permission.READ_OWN_ACCOUNT)])
+    async def me(db: Annotated[None, Depends(get_db)]):
+        return {"ok": True}
+
+    @router.get("/items/{item_id}", dependencies=[requires(Permission.UPDATE_OWN_ACCOUNT)])
+    async def item(item_id: int):
+        return {"item_id": item_id}
+
+    @router.get("/public")
+    async def public():
+        return {"ok": True}
+
+    class SetClaimsMiddleware:
+        def __init__(self, app):
+            self.app = app
+
+        async def __call__(self, scope, receive, send):
+            scope.setdefault("state", {})["token_claims"] = claims
+            await self.app(scope, receive, send)
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(AuthorizationMiddleware, routes=app.routes)
+    app.add_middleware(SetClaimsMiddleware)
+    return app
+
+
+def test_policies_compile_to_static_and_templated_tables():
+    app = create_test_app(None, [])
+    static, templated = compile_route_policies(app.routes)
+
+    assert static[("GET", "/users/me")] == frozenset({"user", "admin"})
+    assert ("GET", "/users/public") not in static
+    assert [route.path for route, _ in templated] == ["/users/items/{item_id}"]
+
+
+def test_unauthenticated_request_rejected_before_db_session():
+    opened_sessions = []
+    client = TestClient(create_test_app(None, opened_sessions))
+
+    resp = client.get("/users/me")
+    assert resp.status_code == 401
+    assert opened_sessions == []
+    assert client.get("/users/items/3").status_code == 401
+    assert client.get("/users/public").status_code == 200
+
+
+def test_role_claim_is_checked_without_db():
+    opened_sessions = []
+    client = TestClient(create_test_app({"sub": "1", "role": "guest"}, opened_sessions))
+    assert client.get("/users/me").status_code == 403
+    assert opened_sessions == []
+
+    client = TestClient(create_test_app({"sub": "1", "role": "user"}, opened_sessions))
+    assert client.get("/users/me").status_code == 200
+    assert client.get("/users/items/3").json() == {"item_id": 3}
+    assert opened_sessions == [True]
@@ -0,0 +1,47 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config.metrics import RequestMetrics
+from app.middlewares.metrics import MetricsMiddleware
+
+
+def create_test_app(metrics: RequestMetrics):
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, metrics=metrics, routes=app.routes)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    @app.post("/echo")
+    async def echo(body: dict):
+        return body
+
+    return app
+
+
+def test_requests_are_recorded_under_their_route_template():
+    metrics = RequestMetrics()
+    client = TestClient(create_test_app(metrics))
+
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/nowhere")
+
+    by_route = {(m.method, m.route): m for m in metrics.series}
+    item = by_route[("GET", "/items/{item_id}")]
+    assert item.latency.count == 2
+    assert item.statuses[1] == 2
+    assert item.in_flight == 0
+    assert metrics.unmatched.statuses[3] == 1
+
+
+def test_request_and_response_bytes_are_counted():
+    metrics = RequestMetrics()
+    client = TestClient(create_test_app(metrics))
+
+    resp = client.post("/echo", json={"hello": "world"})
+
+    echo = next(m for m in metrics.series if m.route == "/echo")
+    assert echo.request_bytes == len(resp.request.content)
+    assert echo.response_bytes == len(resp.content)
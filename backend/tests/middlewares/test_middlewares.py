@@ -0,0 +1,79 @@
+import logging
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.auth.container import get_container
+from app.middlewares.authentication import AuthenticationMiddleware
+from app.middlewares.timing import ProcessTimeMiddleware
+
+
+def create_test_app():
+    app = FastAPI()
+    app.add_middleware(AuthenticationMiddleware)
+    app.add_middleware(ProcessTimeMiddleware)
+
+    @app.get("/whoami")
+    async def whoami(request: Request):
+        return {"user_id": request.state.user_id}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk-{i}\n"
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    return app
+
+
+def test_valid_bearer_token_sets_user_id():
+    client = TestClient(create_test_app())
+    token = get_container().token_codec.encode({"sub": "42"})
+
+    resp = client.get("/whoami", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 200
+    assert resp.json() == {"user_id": 42}
+    assert float(resp.headers["X-Process-Time"]) >= 0
+
+
+def test_missing_or_invalid_token_leaves_user_id_none():
+    client = TestClient(create_test_app())
+
+    assert client.get("/whoami").json() == {"user_id": None}
+    resp = client.get("/whoami", headers={"Authorization": "Bearer not-a-jwt"})
+    assert resp.json() == {"user_id": None}
+
+    # Validly signed, but the subject is not a user id
+    for claims in ({"sub": "alice"}, {"role": "user"}):
+        token = get_container().token_codec.encode(claims)
+        resp = client.get("/whoami", headers={"Authorization": f"Bearer {token}"})
+        assert resp.status_code == 200
+        assert resp.json() == {"user_id": None}
+
+
+def test_streaming_response_passes_through_with_process_time():
+    client = TestClient(create_test_app())
+
+    resp = client.get("/stream")
+    assert resp.text == "chunk-0\nchunk-1\nchunk-2\n"
+    assert "X-Process-Time" in resp.headers
+
+
+def test_access_log_samples_successes_but_keeps_errors(caplog):
+    app = FastAPI()
+    app.add_middleware(ProcessTimeMiddleware, sample_rate=0)
+
+    @app.get("/ok")
+    async def ok():
+        return {}
+
+    client = TestClient(app)
+    with caplog.at_level(logging.INFO, logger="app.middlewares.timing"):
+        client.get("/ok")
+        client.get("/missing")
+
+    records = [r for r in caplog.records if r.name == "app.middlewares.timing"]
+    assert [r.status_code for r in records] == [404]
+    assert "\033[" not in records[0].getMessage()
@@ -0,0 +1,145 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+from app.middlewares.rate_limit import LocalBucketStore, RateLimit, RateLimitMiddleware, RateLimitPolicy, RedisBucketStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class SetUserMiddleware:
+    """Plays the part of AuthenticationMiddleware for the per-user buckets."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        user = dict(scope["headers"]).get(b"x-user")
+        scope.setdefault("state", {})["user_id"] = int(user) if user else None
+        await self.app(scope, receive, send)
+
+
+class FakeRedis:
+    """Records eval calls and answers with queued results."""
+
+    def __init__(self, *results):
+        self.calls = []
+        self.results = list(results)
+
+    async def eval(self, script, numkeys, *args):
+        self.calls.append((script, numkeys, args))
+        return self.results.pop(0) if self.results else 0
+
+
+def create_test_app(store, trusted_proxies=None):
+    app = FastAPI()
+    app.add_middleware(
+        RateLimitMiddleware,
+        store=store,
+        policies={
+            ("POST", "/users/login"): RateLimitPolicy(per_ip=RateLimit(rate=1, burst=2)),
+            ("PUT", "/users/change-password"): RateLimitPolicy(per_ip=RateLimit(rate=1, burst=2), per_user=RateLimit(rate=0.1, burst=1)),
+        },
+        default=RateLimitPolicy(per_user=RateLimit(rate=0.5, burst=1)),
+    )
+    app.add_middleware(SetUserMiddleware)
+    if trusted_proxies:
+        app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=trusted_proxies)
+
+    @app.post("/users/login")
+    async def login():
+        return {"ok": True}
+
+    @app.get("/users/me")
+    async def me():
+        return {"ok": True}
+
+    @app.put("/users/change-password")
+    async def change_password():
+        return {"ok": True}
+
+    return app
+
+
+def test_token_bucket_refills_over_time():
+    clock = FakeClock()
+    store = LocalBucketStore(clock=clock)
+    limit = RateLimit(rate=2, burst=2)
+
+    assert store.acquire(("k",), limit) == 0
+    assert store.acquire(("k",), limit) == 0
+    assert store.acquire(("k",), limit) == 0.5
+
+    clock.now += 0.5
+    assert store.acquire(("k",), limit) == 0
+    assert store.acquire(("other",), limit) == 0
+
+
+def test_route_policy_returns_429_with_retry_after():
+    clock = FakeClock()
+    client = TestClient(create_test_app(LocalBucketStore(clock=clock)))
+
+    assert client.post("/users/login").status_code == 200
+    assert client.post("/users/login").status_code == 200
+    resp = client.post("/users/login")
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "1"
+
+    clock.now += 1
+    assert client.post("/users/login").status_code == 200
+
+
+def test_default_policy_limits_each_user_separately():
+    client = TestClient(create_test_app(LocalBucketStore(clock=FakeClock())))
+
+    assert client.get("/users/me", headers={"X-User": "1"}).status_code == 200
+    resp = client.get("/users/me", headers={"X-User": "1"})
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "2"
+    assert client.get("/users/me", headers={"X-User": "2"}).status_code == 200
+    # Anonymous requests have no per-user bucket under this policy
+    assert client.get("/users/me").status_code == 200
+
+
+def test_requests_rejected_per_user_do_not_spend_the_ip_budget():
+    client = TestClient(create_test_app(LocalBucketStore(clock=FakeClock())))
+
+    assert client.put("/users/change-password", headers={"X-User": "1"}).status_code == 200
+    for _ in range(3):
+        assert client.put("/users/change-password", headers={"X-User": "1"}).status_code == 429
+    # One of the two IP tokens is left for another user behind the same address
+    assert client.put("/users/change-password", headers={"X-User": "2"}).status_code == 200
+    assert client.put("/users/change-password", headers={"X-User": "3"}).status_code == 429
+
+
+def test_forwarded_client_addresses_get_their_own_ip_buckets():
+    client = TestClient(create_test_app(LocalBucketStore(clock=FakeClock()), trusted_proxies="*"))
+
+    for _ in range(2):
+        assert client.post("/users/login", headers={"X-Forwarded-For": "203.0.113.1"}).status_code == 200
+    assert client.post("/users/login", headers={"X-Forwarded-For": "203.0.113.1"}).status_code == 429
+    assert client.post("/users/login", headers={"X-Forwarded-For": "203.0.113.2"}).status_code == 200
+
+
+def test_redis_store_runs_the_scripts_on_the_bucket_key():
+    redis = FakeRedis(b"0", b"1.5")
+    store = RedisBucketStore(redis, prefix="test:")
+    limit = RateLimit(rate=2, burst=5)
+    key = (("POST", "/users/login"), "ip", "203.0.113.1")
+
+    assert asyncio.run(store.acquire(key, limit)) == 0.0
+    assert asyncio.run(store.acquire(key, limit)) == 1.5
+    asyncio.run(store.refund(key, limit))
+
+    redis_key = "test:('POST', '/users/login'):ip:203.0.113.1"
+    assert [call[1:] for call in redis.calls] == [(1, (redis_key, 2, 5)), (1, (redis_key, 2, 5)), (1, (redis_key, 5))]
+    assert redis.calls[0][0] == RedisBucketStore.SCRIPT
+    assert redis.calls[2][0] == RedisBucketStore.REFUND_SCRIPT
@@ -0,0 +1,122 @@
+import hashlib
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.auth.cache import InMemoryUserCache
+from app.config.database import Base
+from app.problems.compression import ZlibCodec, ZstdCodec
+from app.problems.container import ProblemContainer
+from app.problems.problem import Problem
+from app.problems.service import ProblemService
+from app.problems.storage import LocalBlobStore
+from app.utils.exceptions import NotFoundException, PayloadTooLargeException
+
+PROBLEM = (
+    "Heres the description, examples, and constraints for the problem\n"
+    "Given an array of integers nums and an integer target, return indices of the two numbers such that they add up to target.\n"
+    "Example 1: Input: nums = [2,7,11,15], target = 9 Output: [0,1]\n"
+    "Constraints: 2 <= nums.length <= 10^4\n"
+) * 4
+
+
+async def make_session():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, expire_on_commit=False)()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", ["database", "local"])
+async def test_identical_problems_are_stored_once(storage, tmp_path):
+    engine, session = await make_session()
+    blob_store = LocalBlobStore(str(tmp_path)) if storage == "local" else None
+    try:
+        service = ProblemService(session, ProblemContainer(blob_store=blob_store, cache_size=8))
+        first, created = await service.ingest_problem(PROBLEM)
+        again, created_again = await service.ingest_problem(PROBLEM)
+
+        assert created and not created_again
+        assert first == again
+        assert first.content_id == hashlib.sha256(PROBLEM.encode()).hexdigest()
+        assert first.stored_size < first.size
+        assert (await session.execute(select(func.count()).select_from(Problem))).scalar() == 1
+        if blob_store is not None:
+            assert (tmp_path / first.content_id[:2] / first.content_id).exists()
+            assert await session.scalar(select(Problem.data)) is None
+
+        # A fresh container has nothing cached, the text comes back from storage
+        cold = ProblemService(session, ProblemContainer(blob_store=blob_store, cache_size=8))
+        assert await cold.get_problem_text(first.content_id) == PROBLEM
+        assert await cold.get_problem("0" * 64) is None
+    finally:
+        await session.close()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_console_snapshots_are_deltas_against_the_problem():
+    engine, session = await make_session()
+    try:
+        service = ProblemService(session, ProblemContainer(blob_store=None, cache_size=8))
+        problem, _ = await service.ingest_problem(PROBLEM)
+        console = PROBLEM + "\n--- Test Cases and Results ---\nnums = [3,2,4]\nCurrent Output: [0,0]\nExpected Output: [1,2]"
+
+        snapshot = await service.add_snapshot(7, problem.content_id, console)
+        assert snapshot["size"] == len(console.encode())
+        # Most of the console repeats the problem, which the delta leaves out
+        assert snapshot["delta_size"] < len(ZlibCodec().compress(console.encode())) / 2
+
+        latest = await service.get_latest_snapshot(7, problem.content_id)
+        assert latest["id"] == snapshot["id"]
+        assert latest["console"] == console
+
+        with pytest.raises(NotFoundException):
+            await service.get_latest_snapshot(8, problem.content_id)
+        with pytest.raises(NotFoundException):
+            await service.add_snapshot(7, "f" * 64, console)
+    finally:
+        await session.close()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_oversized_text_is_rejected(monkeypatch):
+    monkeypatch.setattr("app.problems.service.settings.problem_max_bytes", 16)
+    service = ProblemService(None, ProblemContainer(blob_store=None, cache_size=8))
+    with pytest.raises(PayloadTooLargeException) as exc_info:
+        await service.ingest_problem("x" * 17)
+    assert exc_info.value.status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_uploads_and_snapshots_are_recorded_for_read_your_writes():
+    engine, session = await make_session()
+    cache = InMemoryUserCache(100, 60, write_window_seconds=5)
+    try:
+        service = ProblemService(session, ProblemContainer(blob_store=None, cache_size=8), cache)
+        record, _ = await service.ingest_problem(PROBLEM, user_id=5)
+        assert await cache.written_within_window(5)
+
+        assert not await cache.written_within_window(6)
+        await service.add_snapshot(6, record.content_id, PROBLEM + "Output: [0,1]")
+        assert await cache.written_within_window(6)
+    finally:
+        await session.close()
+        await engine.dispose()
+
+
+@pytest.mark.parametrize("codec_class", [ZlibCodec, ZstdCodec])
+def test_codecs_round_trip_with_and_without_dictionary(codec_class):
+    if codec_class is ZstdCodec:
+        pytest.importorskip("zstandard")
+    codec = codec_class()
+    problem = PROBLEM.encode()
+    console = problem + b"Current Output: [0,1]"
+
+    assert codec.decompress(codec.compress(problem)) == problem
+    delta = codec.compress(console, problem)
+    assert codec.decompress(delta, problem) == console
+    assert len(delta) < len(codec.compress(console))
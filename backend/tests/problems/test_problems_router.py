@@ -0,0 +1,60 @@
+import hashlib
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.auth.dependency import get_current_user_id
+from app.config.database import Base
+from app.problems.container import ProblemContainer
+from app.problems.dependency import get_problem_service
+from app.problems.router import router as problems_router
+from app.problems.service import ProblemService
+
+PROBLEM = "Two Sum: return the indices of the two numbers that add up to target."
+
+
+@pytest.mark.asyncio
+async def test_upload_is_skipped_once_the_problem_exists():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    session = async_sessionmaker(engine, expire_on_commit=False)()
+    container = ProblemContainer(blob_store=None, cache_size=8)
+
+    app = FastAPI()
+    app.include_router(problems_router)
+    app.dependency_overrides[get_problem_service] = lambda: ProblemService(session, container)
+    app.dependency_overrides[get_current_user_id] = lambda: 1
+
+    content_id = hashlib.sha256(PROBLEM.encode()).hexdigest()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            assert (await client.head(f"/problems/{content_id}")).status_code == 404
+
+            created = await client.post("/problems", json={"text": PROBLEM})
+            assert created.status_code == 201
+            assert created.json()["content_id"] == content_id
+            assert created.json()["created"] is True
+
+            assert (await client.head(f"/problems/{content_id}")).status_code == 200
+            repeated = await client.post("/problems", json={"text": PROBLEM})
+            assert repeated.status_code == 200
+            assert repeated.json()["created"] is False
+
+            fetched = await client.get(f"/problems/{content_id}")
+            assert fetched.json() == {"content_id": content_id, "text": PROBLEM}
+            assert "immutable" in fetched.headers["Cache-Control"]
+            revalidated = await client.get(f"/problems/{content_id}", headers={"If-None-Match": fetched.headers["ETag"]})
+            assert revalidated.status_code == 304
+
+            snapshot = await client.post(f"/problems/{content_id}/snapshots", json={"console": PROBLEM + " Output: [0,1]"})
+            assert snapshot.status_code == 201
+            latest = await client.get(f"/problems/{content_id}/snapshots/latest")
+            assert latest.json()["console"] == PROBLEM + " Output: [0,1]"
+
+            assert (await client.head("/problems/not-a-content-id")).status_code == 422
+    finally:
+        await session.close()
+        await engine.dispose()
@@ -0,0 +1,57 @@
+import argparse
+
+from pwdlib import PasswordHash
+from sqlalchemy import create_engine, text
+
+from app.auth.hashing import Argon2Profile
+from app.config.database import Base
+from app.seed import __main__ as seed_cli
+from app.seed.users import HashCache, copy_payload, generate_rows, seed_password
+
+# Cheap enough to hash in tests, still a real Argon2id hash
+PROFILE = Argon2Profile(memory_cost=1024, time_cost=1, parallelism=1)
+
+
+def test_rows_reuse_pooled_hashes_that_verify():
+    hashes = HashCache(PROFILE).hashes(distinct_passwords=3)
+    rows = list(generate_rows(5, 4, "seed_", hashes))
+
+    assert [row[0] for row in rows] == ["seed_00000005", "seed_00000006", "seed_00000007", "seed_00000008"]
+    assert rows[0][1] == "seed_00000005@example.com"
+    assert PasswordHash.recommended().verify(seed_password(5, 3), rows[0][2])
+    assert rows[0][2] == rows[3][2]  # Users 5 and 8 share password 2
+    assert copy_payload(rows[:1]) == f"seed_00000005\tseed_00000005@example.com\t{hashes[2]}\tt\tuser\n".encode()
+
+
+def test_hash_cache_file_is_reused(tmp_path, monkeypatch):
+    path = str(tmp_path / "hashes.json")
+    first = HashCache(PROFILE, path).hashes(2)
+
+    def rehash(profile, password):
+        raise AssertionError("cached hashes should not be recomputed")
+
+    monkeypatch.setattr("app.seed.users._hash_with_profile", rehash)
+    assert HashCache(PROFILE, path).hashes(2) == first
+
+
+def test_seed_cli_loads_sqlite_in_batches(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(seed_cli, "get_engine", lambda: engine)
+    monkeypatch.setattr(seed_cli, "resolve_profile", lambda: PROFILE)
+
+    args = argparse.Namespace(
+        users=2500, start=10, prefix="seed_", batch_size=1000, workers=2,
+        passwords=4, unique_passwords=False, hash_cache=None,
+    )
+    try:
+        assert seed_cli.seed_users(args) > 0
+        with engine.connect() as connection:
+            count, passwords, first, last = connection.execute(
+                text("SELECT count(*), count(DISTINCT password), min(username), max(username) FROM users")
+            ).one()
+    finally:
+        engine.dispose()
+
+    assert (count, passwords) == (2500, 4)
+    assert (first, last) == ("seed_00000010", "seed_00002509")